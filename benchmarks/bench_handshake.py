@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Handshake latency microbenchmark for the MCP Your Turn server.
+
+Starts the server over stdio (sound-only mode, no Telegram credentials) and
+measures the round-trip time of initialize and tools/list requests sent one
+at a time, i.e. the latency a client sees during the MCP handshake.
+
+Usage:
+  python3 benchmarks/bench_handshake.py --iterations 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER = os.path.join(REPO_ROOT, "mcp_your_turn_server.py")
+
+
+def _start_server() -> subprocess.Popen:
+    env = os.environ.copy()
+    # Force sound-only mode so the benchmark never touches the network
+    env.pop("TELEGRAM_BOT_TOKEN", None)
+    env.pop("TELEGRAM_CHAT_ID", None)
+    env["TELEGRAM_ENABLED"] = "false"
+    return subprocess.Popen(
+        [sys.executable, SERVER],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        cwd=REPO_ROOT,
+        env=env,
+    )
+
+
+def _round_trip(proc: subprocess.Popen, request: dict) -> float:
+    frame = (json.dumps(request) + "\n").encode("utf-8")
+    start = time.perf_counter()
+    proc.stdin.write(frame)
+    proc.stdin.flush()
+    line = proc.stdout.readline()
+    elapsed = time.perf_counter() - start
+    if not line:
+        raise RuntimeError("server closed stdout")
+    response = json.loads(line)
+    if response.get("id") != request["id"]:
+        raise RuntimeError(f"unexpected response: {response}")
+    return elapsed
+
+
+def _report(name: str, samples: list) -> None:
+    ms = sorted(s * 1000 for s in samples)
+    p50 = statistics.median(ms)
+    p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+    rate = len(samples) / sum(samples)
+    print(f"{name:<12} n={len(ms):<5} p50={p50:8.3f} ms  p99={p99:8.3f} ms  max={ms[-1]:8.3f} ms  ({rate:,.0f} req/s)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure initialize/tools/list round-trip latency over stdio")
+    parser.add_argument("--iterations", type=int, default=200, help="Requests per method (default 200)")
+    args = parser.parse_args()
+
+    proc = _start_server()
+    try:
+        # Warm-up request so interpreter start-up is not counted
+        _round_trip(proc, {"jsonrpc": "2.0", "id": -1, "method": "initialize"})
+
+        results = {"initialize": [], "tools/list": []}
+        next_id = 0
+        for _ in range(args.iterations):
+            for method in results:
+                results[method].append(_round_trip(proc, {"jsonrpc": "2.0", "id": next_id, "method": method}))
+                next_id += 1
+
+        for method, samples in results.items():
+            _report(method, samples)
+    finally:
+        proc.stdin.close()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+JSON codec throughput benchmark.
+
+Compares encode/decode throughput of every importable backend in
+json_codec (orjson, ujson, stdlib json) on realistic MCP payloads:
+a tools/call request for your_turn, and the your_turn response carrying a
+long user reply composed from the prewritten templates plus the
+post_instructions text.
+
+Usage:
+  python3 benchmarks/bench_json_codec.py --seconds 1.0
+"""
+
+import argparse
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import json_codec  # noqa: E402
+
+
+def _build_payloads() -> dict:
+    """Build a tools/call request and a your_turn response like the server sends."""
+    from config import config as cfg
+
+    msgs = cfg.messages.get("messages", {})
+    # messages.yml ships an empty post_instructions; use the long built-in default
+    builtin = cfg._load_messages_yaml("")["messages"]
+    post_instructions = msgs.get("post_instructions") or builtin["post_instructions"]
+    prewritten = msgs.get("prewritten") or []
+    user_response = cfg.resolve_message_item(prewritten[0]) if prewritten else "Please proceed with your plan."
+
+    reason = "Refactored the session manager, all checks green — need a decision on the retention policy 🚦"
+    request = {
+        "jsonrpc": "2.0",
+        "id": 42,
+        "method": "tools/call",
+        "params": {
+            "name": "your_turn",
+            "arguments": {"reason": reason, "timeout_seconds": 600},
+            "_meta": {"progressToken": "agent-7:42"},
+        },
+    }
+    text = (
+        f"{msgs.get('default_prefix', '')}\n\n{msgs.get('default_reason_prefix', '')}{reason}"
+        f"\n\n{msgs.get('response_prefix', '')}\"{user_response}\"{post_instructions or ''}"
+    )
+    response = {"jsonrpc": "2.0", "id": 42, "result": {"content": [{"type": "text", "text": text}]}}
+    return {"tools/call request": request, "your_turn response": response}
+
+
+def _measure(fn, arg, seconds: float) -> float:
+    """Return calls per second of fn(arg) over roughly `seconds`."""
+    calls = 0
+    batch = 200
+    start = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            fn(arg)
+        calls += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls / elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare JSON backend throughput on MCP payloads")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Measurement time per case (default 1.0)")
+    args = parser.parse_args()
+
+    codecs = json_codec.available_codecs()
+    payloads = _build_payloads()
+    print(f"Backends: {', '.join(codecs)} (selected: {json_codec.codec.name})")
+
+    for label, payload in payloads.items():
+        encoded = json_codec.available_codecs()["json"].dumps(payload)
+        print(f"\n{label} ({len(encoded):,} bytes)")
+        baseline = None
+        for name, codec in codecs.items():
+            frame = codec.dumps(payload)
+            assert codec.loads(frame) == payload
+            enc = _measure(codec.dumps, payload, args.seconds)
+            dec = _measure(codec.loads, frame, args.seconds)
+            if name == "json":
+                baseline = (enc, dec)
+            print(f"  {name:<7} encode {enc:>12,.0f}/s ({enc * len(frame) / 1e6:8.1f} MB/s)"
+                  f"   decode {dec:>12,.0f}/s ({dec * len(frame) / 1e6:8.1f} MB/s)")
+        if baseline and len(codecs) > 1:
+            for name, codec in codecs.items():
+                if name == "json":
+                    continue
+                frame = codec.dumps(payload)
+                enc = _measure(codec.dumps, payload, args.seconds / 2)
+                dec = _measure(codec.loads, frame, args.seconds / 2)
+                print(f"  {name} vs json: encode x{enc / baseline[0]:.1f}, decode x{dec / baseline[1]:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
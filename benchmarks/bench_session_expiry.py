@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Session purge cost versus number of retained sessions.
+
+Compares the retention queue of InteractiveSessionManager with the previous
+full sweep (two passes over the sessions dict every 60 s). The queue only
+touches sessions that are due (by age, or evicted by the count limit), so
+its cost stays flat as the number of retained sessions grows; the sweep
+grows linearly.
+
+Usage:
+  python3 benchmarks/bench_session_expiry.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from interactive_session import InteractiveSessionManager  # noqa: E402
+
+# Sessions finished (and evicted) per timed round in the churn measurement
+DUE_BATCH = 100
+
+
+def _legacy_sweep(manager: InteractiveSessionManager) -> None:
+    """The former _cleanup_expired_sessions scan, without its side effects."""
+    expired = [sid for sid, s in manager.sessions.items() if s.is_expired and s.is_active]
+    cutoff = time.time() - 3600
+    old = [sid for sid, s in manager.sessions.items() if s.created_at < cutoff and not s.is_active]
+    assert not expired and not old
+
+
+def _populate(size: int) -> InteractiveSessionManager:
+    """A manager retaining `size` finished sessions (its count limit) far from their age limit."""
+    manager = InteractiveSessionManager(retention_seconds=10 ** 9, max_retained=size)
+    for _ in range(size):
+        session = manager.create_session("question", chat_id="1", timeout_seconds=300)
+        session.mark_completed("answer")
+    return manager
+
+
+def _time_per_call(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def measure(size: int, repeat: int) -> None:
+    manager = _populate(size)
+
+    idle = _time_per_call(manager.purge_finished_sessions, repeat)
+
+    # Steady state at the count limit: every session that finishes evicts the oldest one
+    due_total = 0.0
+    for _ in range(repeat):
+        batch = [manager.create_session("question", chat_id="1") for _ in range(DUE_BATCH)]
+        start = time.perf_counter()
+        for session in batch:
+            session.mark_completed("answer")
+        due_total += time.perf_counter() - start
+        assert len(manager.sessions) == size, len(manager.sessions)
+
+    legacy = _time_per_call(lambda: _legacy_sweep(manager), max(1, repeat // 50))
+
+    print(f"{size:>9,}  {idle * 1e6:10.2f} us  {due_total / repeat / DUE_BATCH * 1e6:12.2f} us  "
+          f"{legacy * 1e3:12.2f} ms")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure session purge cost at different retention sizes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Numbers of retained sessions (default 1000 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=200, help="Purges timed per size (default 200)")
+    args = parser.parse_args()
+
+    # Session creation logs at INFO; keep the output to the table
+    logging.disable(logging.INFO)
+
+    print(f"{'retained':>9}  {'idle purge':>13}  {'finish+evict':>15}  {'legacy sweep':>15}")
+    for size in args.sizes:
+        measure(size, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Memory footprint of retained interactive sessions, measured with tracemalloc.
+
+Runs the session lifecycle the server uses (create, send the question,
+release its text, complete) and asserts:
+  1. bytes per retained session stay under --max-bytes-per-session;
+  2. under continuous churn the footprint stops growing once the retention
+     count limit is reached (steady state).
+
+Usage:
+  python3 benchmarks/bench_session_memory.py --retained 1000 --churn 20000
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from interactive_session import InteractiveSessionManager  # noqa: E402
+
+# A typical your_turn question and reply
+QUESTION = "🔔 Notification: " + "Refactored the session manager, need a decision on the retention policy. " * 4
+ANSWER = "Looks good, go ahead with the count limit."
+
+# Allowed growth between two steady-state samples
+STEADY_STATE_TOLERANCE = 0.02
+
+
+async def _run_sessions(manager: InteractiveSessionManager, count: int, first_message_id: int) -> None:
+    """Create, deliver and answer `count` sessions like a Telegram round trip does."""
+    for i in range(count):
+        # Each round trip yields to the loop, which is when it drops cancelled expiry timers
+        await asyncio.sleep(0)
+        session = manager.create_session(QUESTION, chat_id="123456789", timeout_seconds=300)
+        manager.bind_message(session.session_id, first_message_id + i)
+        session.release_message()
+        manager.submit_response(session.session_id, ANSWER)
+
+
+def _traced_bytes() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+async def measure(retained: int, churn: int) -> tuple:
+    manager = InteractiveSessionManager(retention_seconds=10 ** 9, max_retained=retained)
+    await manager.start()
+
+    tracemalloc.start()
+    baseline = _traced_bytes()
+    await _run_sessions(manager, retained, 0)
+    filled = _traced_bytes()
+    per_session = (filled - baseline) / retained
+
+    # Keep churning at the count limit; sample half way and at the end
+    await _run_sessions(manager, churn // 2, retained)
+    middle = _traced_bytes()
+    await _run_sessions(manager, churn - churn // 2, retained + churn // 2)
+    end = _traced_bytes()
+    tracemalloc.stop()
+    await manager.stop()
+
+    assert len(manager.sessions) == retained, len(manager.sessions)
+    return per_session, filled - baseline, middle - baseline, end - baseline
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure memory per retained session with tracemalloc")
+    parser.add_argument("--retained", type=int, default=1000, help="Retention count limit (default 1000)")
+    parser.add_argument("--churn", type=int, default=20000, help="Sessions run after the limit is reached (default 20000)")
+    parser.add_argument("--max-bytes-per-session", type=int, default=1500,
+                        help="Fail above this many bytes per retained session (default 1500)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    per_session, filled, middle, end = asyncio.run(measure(args.retained, args.churn))
+    print(f"bytes per retained session: {per_session:8.0f}")
+    print(f"footprint at limit ({args.retained:,} sessions): {filled / 1024:8.1f} KiB")
+    print(f"after {args.churn // 2:,} more sessions:        {middle / 1024:8.1f} KiB")
+    print(f"after {args.churn:,} more sessions:        {end / 1024:8.1f} KiB")
+
+    assert per_session <= args.max_bytes_per_session, \
+        f"{per_session:.0f} bytes per session exceeds {args.max_bytes_per_session}"
+    assert end <= middle * (1 + STEADY_STATE_TOLERANCE), \
+        f"footprint still growing at steady state: {middle} -> {end} bytes"
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
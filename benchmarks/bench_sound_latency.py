@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+End-to-end notification latency: in-process PCM output versus subprocess player.
+
+For each output whose library loads (PulseAudio through libpulse-simple, ALSA
+through libasound), times playing a short clip of alert.wav:
+  - in-process: the clip is decoded once and the cached PCM is written to
+    the output (pcm_playback), as SoundManager does;
+  - subprocess: paplay / aplay is spawned on a WAV file holding the same clip,
+    as the fallback chain does.
+
+Both paths include the clip's playback time, so the difference is the
+per-notification overhead (fork/exec, file read, decode). The benchmark
+fails if the in-process median is slower than the subprocess median. Outputs
+that cannot be opened (no library, no player, no audio device) are skipped.
+On a machine without a sound card, `--alsa-device null` exercises the full
+ALSA path without producing sound.
+
+Usage:
+  python3 benchmarks/bench_sound_latency.py --runs 20 --clip-ms 200 --alsa-device null
+"""
+
+import argparse
+import io
+import logging
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from typing import Callable, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from pcm_playback import (  # noqa: E402
+    AlsaOutput, PcmBuffer, PcmError, PcmOutput, PulseOutput, _load_library, load_wav,
+)
+
+
+def _clip(buffer: PcmBuffer, clip_ms: int) -> PcmBuffer:
+    frame_bytes = buffer.channels * buffer.sample_width
+    frames = max(1, buffer.rate * clip_ms // 1000)
+    return PcmBuffer(buffer.rate, buffer.channels, buffer.sample_width, buffer.frames[:frames * frame_bytes])
+
+
+def _write_wav(buffer: PcmBuffer, path: str) -> None:
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(buffer.channels)
+        wav.setsampwidth(buffer.sample_width)
+        wav.setframerate(buffer.rate)
+        wav.writeframes(buffer.frames)
+
+
+def _time_runs(play: Callable[[], None], runs: int) -> List[float]:
+    play()  # warm-up: library/page cache, output setup
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        play()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: List[float]) -> float:
+    median = statistics.median(samples)
+    print(f"  {label:<11} median={median:8.1f} ms  min={min(samples):8.1f} ms  max={max(samples):8.1f} ms")
+    return median
+
+
+def measure(name: str, output: Optional[PcmOutput], command: List[str], clip_path: str,
+            buffer: PcmBuffer, wav_bytes: bytes, runs: int) -> Optional[str]:
+    """Time one output both ways; return a failure message, if any."""
+    print(f"{name}:")
+    if output is None:
+        print("  SKIP: library not found")
+        return None
+
+    def in_process() -> None:
+        # What SoundManager does per notification once the file has been decoded
+        output.play(buffer)
+
+    try:
+        in_process()
+    except PcmError as e:
+        print(f"  SKIP: cannot open output ({e})")
+        return None
+
+    decode_start = time.perf_counter()
+    with wave.open(io.BytesIO(wav_bytes), "rb") as wav:
+        wav.readframes(wav.getnframes())
+    print(f"  one-off decode of alert.wav: {(time.perf_counter() - decode_start) * 1000:.1f} ms")
+
+    in_process_median = _report("in-process", _time_runs(in_process, runs))
+    if not shutil.which(command[0]):
+        print(f"  subprocess: SKIP ({command[0]} not installed)")
+        return None
+
+    def spawn() -> None:
+        subprocess.run(command + [clip_path], check=True, capture_output=True, timeout=10)
+
+    try:
+        subprocess_median = _report("subprocess", _time_runs(spawn, runs))
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        print(f"  subprocess: SKIP ({e})")
+        return None
+    print(f"  saved per notification: {subprocess_median - in_process_median:8.1f} ms")
+    if in_process_median > subprocess_median:
+        return f"{name}: in-process {in_process_median:.1f} ms slower than subprocess {subprocess_median:.1f} ms"
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare in-process PCM playback with subprocess players")
+    parser.add_argument("--runs", type=int, default=20, help="Timed notifications per path (default 20)")
+    parser.add_argument("--clip-ms", type=int, default=200, help="Length of alert.wav to play, in ms (default 200)")
+    parser.add_argument("--alsa-device", default="default", help="ALSA PCM device (default 'default'; 'null' is silent)")
+    parser.add_argument("--sound-file", default=os.path.join(REPO_ROOT, "alert.wav"), help="WAV file to clip")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    with open(args.sound_file, "rb") as f:
+        wav_bytes = f.read()
+    buffer = _clip(load_wav(args.sound_file), args.clip_ms)
+    print(f"clip: {buffer}")
+
+    pulse_lib = _load_library("libpulse-simple.so.0", "pulse-simple")
+    alsa_lib = _load_library("libasound.so.2", "asound")
+
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        clip_path = os.path.join(tmp, "clip.wav")
+        _write_wav(buffer, clip_path)
+        pairs = [
+            ("pulse", PulseOutput(pulse_lib) if pulse_lib else None, ["paplay"]),
+            (f"alsa ({args.alsa_device})", AlsaOutput(alsa_lib, args.alsa_device) if alsa_lib else None,
+             ["aplay", "-q", "-D", args.alsa_device]),
+        ]
+        for name, output, command in pairs:
+            failure = measure(name, output, command, clip_path, buffer, wav_bytes, args.runs)
+            if failure:
+                failures.append(failure)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the MCP Your Turn server.
+
+Measures two things:
+  1. Import cost of mcp_your_turn_server, from `python -X importtime`,
+     with the heaviest modules listed by cumulative time.
+  2. Time from process spawn to the initialize response over stdio, with
+     Telegram credentials configured (the bot is never contacted: nothing
+     is called that needs it).
+
+The Telegram, Deepgram and YAML stacks must not be imported at module
+import time, nor before initialize is answered (Telegram is warmed up in
+the background right after it); the benchmark fails if they are, or if
+the median time to initialize exceeds --budget-ms.
+
+Usage:
+  python3 benchmarks/bench_startup.py --runs 10 --budget-ms 250
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER = os.path.join(REPO_ROOT, "mcp_your_turn_server.py")
+
+# Top-level packages that must not load before initialize is answered
+DEFERRED_PACKAGES = ("telegram", "httpx", "deepgram", "yaml", "telegram_notifier")
+
+# Server log line emitted when the background Telegram warm-up begins
+WARMUP_MARKER = "Warming up Telegram"
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """Return (module, self_us, cumulative_us) for each -X importtime line."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def _deferred_imports(rows: List[Tuple[str, int, int]]) -> List[str]:
+    return sorted({name for name, _, _ in rows if name.split(".")[0] in DEFERRED_PACKAGES})
+
+
+def _env(telegram: bool) -> Dict[str, str]:
+    env = os.environ.copy()
+    if telegram:
+        # Credentials make the server take the Telegram code path without any network traffic
+        env["TELEGRAM_BOT_TOKEN"] = "123456:bench-startup-not-a-real-token"
+        env["TELEGRAM_CHAT_ID"] = "1"
+        env["TELEGRAM_ENABLED"] = "true"
+    return env
+
+
+def measure_import(top: int) -> List[str]:
+    """Report import-time cost and return any deferred modules that were loaded."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import mcp_your_turn_server"],
+        cwd=REPO_ROOT, env=_env(telegram=True), capture_output=True, text=True,
+    )
+    rows = _parse_importtime(proc.stderr)
+    total = next((cumulative for name, _, cumulative in rows if name == "mcp_your_turn_server"), 0)
+    print(f"import mcp_your_turn_server: {total / 1000:8.1f} ms cumulative ({len(rows)} modules)")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda r: r[2], reverse=True)[1:top + 1]:
+        print(f"  {name:<40} self={self_us / 1000:7.1f} ms  cumulative={cumulative_us / 1000:7.1f} ms")
+    return _deferred_imports(rows)
+
+
+def measure_initialize() -> Tuple[float, List[str]]:
+    """Spawn the server, time the initialize response, and list deferred modules it loaded."""
+    # stderr goes to a file so a chatty server can never block on a full pipe
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-X", "importtime", SERVER],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=stderr,
+            cwd=REPO_ROOT, env=_env(telegram=True),
+        )
+        try:
+            proc.stdin.write(b'{"jsonrpc":"2.0","id":1,"method":"initialize"}\n')
+            proc.stdin.flush()
+            line = proc.stdout.readline()
+            elapsed = time.perf_counter() - start
+            if not line or json.loads(line).get("id") != 1:
+                raise RuntimeError(f"unexpected initialize response: {line!r}")
+            proc.stdin.write(b'{"jsonrpc":"2.0","id":2,"method":"tools/list"}\n')
+            proc.stdin.flush()
+            proc.stdout.readline()
+        finally:
+            proc.stdin.close()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+        stderr.seek(0)
+        output = stderr.read().decode("utf-8", "replace")
+    # Imports after the warm-up started are expected; only look at what came before
+    rows = _parse_importtime(output.split(WARMUP_MARKER, 1)[0])
+    return elapsed, _deferred_imports(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure server import time and time to first initialize response")
+    parser.add_argument("--runs", type=int, default=10, help="Cold starts to time (default 10)")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports to list (default 10)")
+    parser.add_argument("--budget-ms", type=float, default=250.0,
+                        help="Fail if the median time to initialize exceeds this (default 250, 0 = report only)")
+    args = parser.parse_args()
+
+    failures = []
+    loaded = measure_import(args.top)
+    if loaded:
+        failures.append(f"import loaded deferred modules: {', '.join(loaded)}")
+
+    samples = []
+    for _ in range(args.runs):
+        elapsed, loaded = measure_initialize()
+        samples.append(elapsed * 1000)
+        if loaded:
+            failures.append(f"initialize loaded deferred modules: {', '.join(loaded)}")
+            break
+
+    samples.sort()
+    median = statistics.median(samples)
+    print(f"spawn -> initialize response: n={len(samples)} median={median:7.1f} ms  "
+          f"min={samples[0]:7.1f} ms  max={samples[-1]:7.1f} ms")
+    if args.budget_ms and median > args.budget_ms:
+        failures.append(f"median time to initialize {median:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
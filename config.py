@@ -1,24 +1,15 @@
 """
 Configuration management for the MCP Your Turn server.
 Handles environment variables and settings.
+
+Nothing is loaded at import time: the .env file is read when the
+configuration is first requested (get_config(), or the module attribute
+`config`), and messages.yml only when a message template is first needed.
 """
 
 import os
 import sys
-from typing import Optional, Dict, Any
-
-# Try to load python-dotenv if available
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    # python-dotenv not installed, continue without it
-    pass
-# Optional YAML support for message configuration
-try:
-    import yaml  # type: ignore
-except Exception:
-    yaml = None
+from typing import Optional, Dict, Any, Tuple
 
 
 
@@ -31,12 +22,20 @@ class Config:
         self.telegram_chat_id: Optional[str] = os.getenv('TELEGRAM_CHAT_ID')
         self.telegram_enabled: bool = self._parse_bool(os.getenv('TELEGRAM_ENABLED', 'true'))
 
-        # Messages config (YAML file)
-        self.messages: Dict[str, Any] = self._load_messages_yaml(os.getenv('MESSAGES_FILE', 'messages.yml'))
+        # Messages config (YAML file), parsed on first access
+        self._messages_path = os.getenv('MESSAGES_FILE', 'messages.yml')
+        self._messages: Optional[Dict[str, Any]] = None
 
         # Validate Telegram configuration
         self.telegram_configured = self._validate_telegram_config()
 
+    @property
+    def messages(self) -> Dict[str, Any]:
+        """Messages configuration, loaded from YAML on first use."""
+        if self._messages is None:
+            self._messages = self._load_messages_yaml(self._messages_path)
+        return self._messages
+
     def _parse_bool(self, value: str) -> bool:
         """Parse a string value to boolean."""
         return value.lower() in ('true', '1', 'yes', 'on', 'enabled')
@@ -78,7 +77,10 @@ class Config:
                 ),
             }
         }
-        if yaml is None:
+        # Optional YAML support for message configuration
+        try:
+            import yaml  # type: ignore
+        except Exception:
             return defaults
         try:
             if os.path.exists(path):
@@ -138,7 +140,7 @@ class Config:
         return str(item)
 
 
-    def get_telegram_config(self) -> tuple[Optional[str], Optional[str]]:
+    def get_telegram_config(self) -> Tuple[Optional[str], Optional[str]]:
         """Get Telegram bot token and chat ID if configured."""
         if self.telegram_configured:
             return self.telegram_bot_token, self.telegram_chat_id
@@ -149,5 +151,31 @@ class Config:
         return self.telegram_configured
 
 
-# Global configuration instance
-config = Config()
+def _load_dotenv() -> None:
+    """Load a .env file into the environment if python-dotenv is installed."""
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        # python-dotenv not installed, continue without it
+        return
+    load_dotenv()
+
+
+# Global configuration instance, created on first use
+_config: Optional[Config] = None
+
+
+def get_config() -> Config:
+    """Return the global configuration, loading .env on the first call."""
+    global _config
+    if _config is None:
+        _load_dotenv()
+        _config = Config()
+    return _config
+
+
+def __getattr__(name: str) -> Any:
+    # PEP 562: `from config import config` keeps working, but loads lazily
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
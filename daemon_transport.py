@@ -0,0 +1,343 @@
+"""
+Shared local daemon for the MCP Your Turn server.
+
+Telegram allows a single getUpdates long-poll per bot token, so several
+agents each running their own stdio server fight over updates and replies
+land in the wrong process. In daemon mode one process owns the
+TelegramNotifier and the InteractiveSessionManager and serves line-delimited
+JSON-RPC over a Unix domain socket. Agents launch a thin stdio shim instead
+of a full server; the shim forwards frames to the daemon and starts it on
+demand, so N agents cost one poller and one HTTP connection pool.
+
+  agent <-stdio-> shim <-unix socket-> daemon (Telegram, sessions, sound)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import json_codec
+from stdio_transport import DEFAULT_MAX_FRAME_BYTES, StdioReader
+
+logger = logging.getLogger(__name__)
+
+# How long a shim waits for an on-demand daemon to accept connections
+DAEMON_START_TIMEOUT = 15.0
+
+# Seconds a shim's requests may still finish after it closes its input; the
+# rest are cancelled (their questions withdrawn) so the shim can exit
+SHIM_CLOSE_GRACE_SECONDS = 5.0
+
+# Idle lifetime of daemons started on demand by a shim (no connected shims)
+ON_DEMAND_IDLE_TIMEOUT = 600
+
+
+def _uid() -> int:
+    return os.getuid() if hasattr(os, "getuid") else 0
+
+
+def default_socket_dir() -> str:
+    """Per-user directory (mode 0700) holding daemon sockets, locks and logs."""
+    base = os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(base, f"your-turn-mcp-{_uid()}")
+
+
+def default_socket_path(bot_token: Optional[str] = None) -> str:
+    """
+    Default daemon socket path for the current user and bot.
+
+    The bot token is hashed into the name so that shims configured for
+    different bots never share a daemon.
+    """
+    suffix = hashlib.sha256((bot_token or "").encode("utf-8")).hexdigest()[:12]
+    return os.path.join(default_socket_dir(), f"{suffix}.sock")
+
+
+def ensure_socket_dir(socket_path: str) -> None:
+    """
+    Create the socket's directory if needed and refuse one another user controls.
+
+    Missing directories are created with mode 0700. The default per-user
+    directory must already be owned by us and closed to group and others,
+    otherwise another local user could take its lock or bind the socket first.
+
+    Raises:
+        PermissionError: If the default directory is not private to this user
+    """
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if directory != os.path.abspath(default_socket_dir()):
+        return
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != _uid() or st.st_mode & 0o077:
+        raise PermissionError(f"{directory} must be a directory owned by uid {_uid()} with mode 0700")
+
+
+def check_socket_owner(socket_path: str) -> None:
+    """
+    Refuse to talk to a socket that is not ours.
+
+    Raises:
+        FileNotFoundError: If nothing is listening on socket_path yet
+        PermissionError: If the path is not a socket owned by us with mode 0600
+    """
+    st = os.lstat(socket_path)
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != _uid() or st.st_mode & 0o077:
+        raise PermissionError(f"{socket_path} is not a private socket owned by uid {_uid()}")
+
+
+class UnixSocketDaemon:
+    """Serves an MCPServer to any number of shims over a Unix domain socket."""
+
+    def __init__(self, server: Any, socket_path: str, idle_timeout: float = 0):
+        """
+        Initialize the daemon.
+
+        Args:
+            server: The MCPServer handling JSON-RPC messages
+            socket_path: Filesystem path of the Unix socket
+            idle_timeout: Exit after this many seconds without connections (0 = never)
+        """
+        self.server = server
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.connections = 0
+        self._connection_counter = 0
+        self._idle_since: Optional[float] = time.monotonic()
+        self._lock_file = None
+
+    async def serve(self) -> None:
+        """Listen on the socket until cancelled or idle for too long."""
+        try:
+            ensure_socket_dir(self.socket_path)
+        except PermissionError as e:
+            logger.error(f"❌ Refusing to serve on {self.socket_path}: {e}")
+            return
+        if not self._acquire_lock():
+            logger.info(f"ℹ️ Another daemon owns {self.socket_path}, exiting")
+            return
+
+        if os.path.exists(self.socket_path):
+            # We hold the lock, so whatever is there is left over from a crash
+            os.unlink(self.socket_path)
+
+        limit = getattr(self.server, "max_frame_bytes", DEFAULT_MAX_FRAME_BYTES) + 2
+        # Bind with a restrictive umask so the socket is never reachable by others
+        old_umask = os.umask(0o177)
+        try:
+            unix_server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path, limit=limit)
+        finally:
+            os.umask(old_umask)
+        logger.info(f"🧩 Daemon listening on {self.socket_path}")
+
+        try:
+            async with unix_server:
+                if self.idle_timeout > 0:
+                    await self._exit_when_idle()
+                else:
+                    await unix_server.serve_forever()
+        finally:
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            self._release_lock()
+            logger.info("🛑 Daemon stopped")
+
+    async def _exit_when_idle(self) -> None:
+        """Return once no shim has been connected for idle_timeout seconds."""
+        while True:
+            await asyncio.sleep(min(30.0, self.idle_timeout))
+            if self._idle_since is not None and time.monotonic() - self._idle_since >= self.idle_timeout:
+                logger.info(f"💤 No connections for {self.idle_timeout:.0f}s, shutting down")
+                return
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one shim: dispatch each frame concurrently, answer on the same socket."""
+        self.connections += 1
+        self._connection_counter += 1
+        self._idle_since = None
+        connection_id = self._connection_counter
+        in_flight: Dict[Any, asyncio.Task] = {}
+        # Each shim gets its own limit, so one agent's waits never block another's handshake
+        slots = self.server.new_request_slots()
+        logger.info(f"🔌 Shim connected (#{connection_id})")
+
+        def notify(notification: Dict[str, Any]) -> None:
+            if not writer.is_closing():
+                writer.write(json_codec.dumps(notification) + b"\n")
+
+        async def answer(message: Any) -> None:
+            response = await self.server.dispatch(message, in_flight, notify, slots)
+            if response is not None and not writer.is_closing():
+                writer.write(json_codec.dumps(response) + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    logger.error("❌ Dropping oversized frame from shim")
+                    continue
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    message = json_codec.loads(line)
+                except json_codec.JSONDecodeError as e:
+                    logger.warning(f"⚠️ Received invalid JSON from shim, ignoring. Error: {e}")
+                    continue
+
+                task = asyncio.create_task(answer(message))
+                key = message.get("id", task) if isinstance(message, dict) else task
+                if key is not task and (not json_codec.is_valid_id(key) or key in in_flight):
+                    key = task
+                in_flight[key] = task
+                task.add_done_callback(lambda _t, k=key: in_flight.pop(k, None))
+
+            # Shim closed its side: briefly let what it asked for finish before hanging up
+            if in_flight:
+                await asyncio.wait(list(in_flight.values()), timeout=SHIM_CLOSE_GRACE_SECONDS)
+        except ConnectionError as e:
+            logger.info(f"🔌 Shim #{connection_id} connection lost: {e}")
+        finally:
+            for task in list(in_flight.values()):
+                task.cancel()
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+            self.connections -= 1
+            if self.connections == 0:
+                self._idle_since = time.monotonic()
+            logger.info(f"🔌 Shim disconnected (#{connection_id})")
+
+    def _acquire_lock(self) -> bool:
+        """Take an exclusive lock next to the socket so only one daemon binds it."""
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        fd = os.open(self.socket_path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        lock_file = os.fdopen(fd, "a+")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _release_lock(self) -> None:
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+
+async def _connect(socket_path: str):
+    check_socket_owner(socket_path)
+    return await asyncio.open_unix_connection(path=socket_path, limit=DEFAULT_MAX_FRAME_BYTES + 2)
+
+
+def _spawn_daemon(daemon_command: List[str], socket_path: str) -> None:
+    """Start a detached daemon process that logs next to its socket."""
+    log_path = socket_path + ".log"
+    logger.info(f"🚀 Starting shared daemon: {' '.join(daemon_command)} (log: {log_path})")
+    # The log may contain credentials from the daemon's stderr: owner-only
+    fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+    with os.fdopen(fd, "ab") as log:
+        subprocess.Popen(
+            daemon_command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=log,
+            start_new_session=True,
+            close_fds=True,
+        )
+
+
+async def run_shim(socket_path: str, daemon_command: List[str]) -> int:
+    """
+    Forward stdio JSON-RPC frames to the daemon, starting it if needed.
+
+    Args:
+        socket_path: Daemon socket to connect to
+        daemon_command: Command line that starts a daemon on socket_path
+
+    Returns:
+        int: Process exit code
+    """
+    try:
+        ensure_socket_dir(socket_path)
+        reader, writer = await _connect(socket_path)
+    except PermissionError as e:
+        logger.error(f"❌ Refusing to use daemon socket: {e}")
+        return 1
+    except (FileNotFoundError, ConnectionRefusedError):
+        _spawn_daemon(daemon_command, socket_path)
+        deadline = time.monotonic() + DAEMON_START_TIMEOUT
+        while True:
+            await asyncio.sleep(0.05)
+            try:
+                reader, writer = await _connect(socket_path)
+                break
+            except PermissionError as e:
+                logger.error(f"❌ Refusing to use daemon socket: {e}")
+                return 1
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() > deadline:
+                    logger.error(f"❌ Daemon did not come up on {socket_path} (see {socket_path}.log)")
+                    return 1
+    logger.info(f"🔗 Shim connected to daemon at {socket_path}")
+
+    stdin = StdioReader()
+    await stdin.start()
+    stdout = sys.stdout.buffer
+
+    async def upstream() -> None:
+        while True:
+            frame = await stdin.read_frame()
+            if frame is None:
+                break
+            if frame.strip():
+                writer.write(frame + b"\n")
+                await writer.drain()
+        # Half-close: the daemon finishes pending requests, then hangs up
+        if writer.can_write_eof():
+            writer.write_eof()
+
+    async def downstream() -> None:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            stdout.write(line)
+            stdout.flush()
+
+    up = asyncio.create_task(upstream())
+    try:
+        await downstream()
+    except ConnectionError as e:
+        logger.error(f"❌ Lost connection to daemon: {e}")
+    finally:
+        # If stdin is still open, the daemon went away underneath us
+        daemon_lost = not up.done()
+        up.cancel()
+        stdin.close()
+        writer.close()
+
+    if daemon_lost:
+        logger.error("❌ Daemon closed the connection while requests could still arrive")
+        return 1
+    return 0
@@ -136,7 +136,7 @@ class DiagnosticTool:
             strategies = [
                 ('System Sound', manager._play_system_sound),
                 ('External Sound', manager._play_external_sound),
-                ('Embedded Sound', manager._play_embedded_sound),
+                ('Synthesized Tone', manager._play_embedded_sound),
                 ('ASCII Bell', manager._play_ascii_bell)
             ]
             
@@ -159,7 +159,8 @@ class DiagnosticTool:
             print(f"  🔊 Testing overall sound notification...")
             overall_success = manager.play_notification_sound()
             print(f"    {'✅' if overall_success else '❌'} Overall sound: {'Working' if overall_success else 'Failed'}")
-            results['overall'] = {'working': overall_success}
+            results['overall'] = {'working': overall_success, 'backend': manager.backend_name}
+            print(f"    🎛️ Selected backend: {manager.backend_name or 'none'}")
             
             self.results['sound_system'] = results
             
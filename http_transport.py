@@ -0,0 +1,405 @@
+"""
+Streamable HTTP transport for the MCP Your Turn server.
+
+Serves the MCP streamable-HTTP transport on a single endpoint (default
+http://127.0.0.1:8765/mcp) so that one long-lived server process, with one
+Telegram poller and one interactive session manager, can serve many agent
+connections at once:
+
+- POST /mcp carries one JSON-RPC message or batch. Requests are answered
+  either as application/json or, when the client accepts it, as a
+  text/event-stream (SSE) stream that stays open with keep-alive comments
+  while a long your_turn wait is pending. Notification-only bodies get 202.
+- DELETE /mcp ends the MCP session named by the Mcp-Session-Id header.
+- GET /mcp returns 405: the server never starts unsolicited streams.
+- GET /health reports liveness, the number of MCP sessions, Telegram readiness
+  and the outcome of the last notification sound, with the sound manager's
+  throttling counters once a sound has been requested.
+
+Only the Python standard library is used; requests are parsed with a small
+HTTP/1.1 reader on top of asyncio streams.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import json_codec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HTTP_HOST = "127.0.0.1"
+DEFAULT_HTTP_PORT = 8765
+MCP_ENDPOINT = "/mcp"
+
+# Seconds between SSE keep-alive comments while a request is pending
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+# MCP sessions idle for longer than this (and with nothing running) are dropped
+SESSION_IDLE_TIMEOUT = 24 * 3600
+
+_MAX_HEADER_LINES = 100
+_LOCAL_ORIGIN_HOSTS = {"localhost", "127.0.0.1", "::1", "[::1]"}
+
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    415: "Unsupported Media Type",
+}
+
+
+class HttpSession:
+    """An MCP session established by an initialize request over HTTP."""
+
+    def __init__(self, session_id: str, slots: asyncio.Semaphore):
+        self.session_id = session_id
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+        # In-flight request tasks keyed by JSON-RPC id
+        self.in_flight: Dict[Any, asyncio.Task] = {}
+        # Concurrency limit of this session: other agents' waits never use it up
+        self.slots = slots
+
+
+class _HttpRequest:
+    """Parsed HTTP request line, headers and body."""
+
+    def __init__(self, method: str, path: str, version: str, headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.version = version
+        self.headers = headers
+        self.body = body
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+class _HttpError(Exception):
+    """Raised while reading a request that must be rejected."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class HttpTransport:
+    """Serves an MCPServer over the MCP streamable-HTTP transport."""
+
+    def __init__(self, server: Any, host: str = DEFAULT_HTTP_HOST, port: int = DEFAULT_HTTP_PORT):
+        """
+        Initialize the transport.
+
+        Args:
+            server: The MCPServer handling JSON-RPC messages
+            host: Interface to bind (keep it local: the endpoint is unauthenticated)
+            port: TCP port to listen on
+        """
+        self.server = server
+        self.host = host
+        self.port = port
+        self.sessions: Dict[str, HttpSession] = {}
+        # Requests from clients that never initialized a session (cancellable by id too)
+        self._sessionless_in_flight: Dict[Any, asyncio.Task] = {}
+        self._sessionless_slots: Optional[asyncio.Semaphore] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def serve(self) -> None:
+        """Listen and serve until cancelled."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        addresses = ", ".join(str(sock.getsockname()[:2]) for sock in self._server.sockets)
+        logger.info(f"🌐 MCP streamable HTTP transport listening on {addresses} (endpoint {MCP_ENDPOINT})")
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            for session in list(self.sessions.values()):
+                self._close_session(session)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve HTTP requests on one connection until it closes."""
+        peer = writer.get_extra_info("peername")
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except _HttpError as e:
+                    await self._send_json(writer, e.status, self._error_body(e.message), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                keep_alive = await self._route(request, writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.debug(f"HTTP connection {peer} closed: {e}")
+        except Exception as e:
+            logger.error(f"❌ HTTP connection {peer} failed: {e}")
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[_HttpRequest]:
+        """Read one HTTP/1.1 request; returns None when the peer closed the connection."""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            raise _HttpError(400, "Malformed request line")
+
+        headers: Dict[str, str] = {}
+        for _ in range(_MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise _HttpError(400, "Too many headers")
+
+        body = b""
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise _HttpError(411, "Chunked request bodies are not supported; send Content-Length")
+        if "content-length" in headers:
+            try:
+                length = int(headers["content-length"])
+            except ValueError:
+                raise _HttpError(400, "Invalid Content-Length")
+            if length > self.server.max_frame_bytes:
+                raise _HttpError(413, f"Body exceeds {self.server.max_frame_bytes} bytes")
+            body = await reader.readexactly(length)
+
+        return _HttpRequest(method.upper(), urlsplit(target).path, version.upper(), headers, body)
+
+    async def _route(self, request: _HttpRequest, writer: asyncio.StreamWriter) -> bool:
+        """Dispatch one HTTP request; returns whether the connection may be reused."""
+        keep_alive = request.keep_alive
+
+        if not self._origin_allowed(request):
+            # Guard against DNS rebinding from browser pages
+            await self._send_json(writer, 403, self._error_body("Origin not allowed"), keep_alive=keep_alive)
+            return keep_alive
+
+        if request.path == "/health" and request.method == "GET":
+            body = {"status": "ok", "transport": "http", "sessions": len(self.sessions)}
+            state = getattr(self.server, "telegram_state", None)
+            if state is not None:
+                body["telegram"] = state.value
+            sound = getattr(self.server, "sound_status", None)
+            if sound is not None:
+                body["sound"] = sound
+            sound_stats = getattr(self.server, "sound_stats", None)
+            if sound_stats is not None:
+                body["sound_stats"] = sound_stats
+            await self._send_json(writer, 200, body, keep_alive=keep_alive)
+            return keep_alive
+
+        if request.path != MCP_ENDPOINT:
+            await self._send_json(writer, 404, self._error_body("Not found"), keep_alive=keep_alive)
+            return keep_alive
+
+        if request.method == "POST":
+            return await self._handle_post(request, writer)
+        if request.method == "DELETE":
+            return await self._handle_delete(request, writer)
+
+        await self._send_json(writer, 405, self._error_body("Method not allowed"), keep_alive=keep_alive,
+                              extra_headers={"Allow": "POST, DELETE"})
+        return keep_alive
+
+    async def _handle_post(self, request: _HttpRequest, writer: asyncio.StreamWriter) -> bool:
+        """Handle a JSON-RPC message or batch sent by the client."""
+        keep_alive = request.keep_alive
+
+        content_type = request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+        if content_type != "application/json":
+            await self._send_json(writer, 415, self._error_body("Content-Type must be application/json"),
+                                  keep_alive=keep_alive)
+            return keep_alive
+
+        try:
+            message = json_codec.loads(request.body)
+        except json_codec.JSONDecodeError as e:
+            body = {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": f"Parse error: {e}"}}
+            await self._send_json(writer, 400, body, keep_alive=keep_alive)
+            return keep_alive
+
+        elements = message if isinstance(message, list) else [message]
+        is_initialize = any(isinstance(m, dict) and m.get("method") == "initialize" for m in elements)
+
+        session, session_error = self._resolve_session(request, is_initialize)
+        if session_error is not None:
+            status, text = session_error
+            await self._send_json(writer, status, self._error_body(text), keep_alive=keep_alive)
+            return keep_alive
+
+        headers = {"Mcp-Session-Id": session.session_id} if session else {}
+
+        has_requests = any(isinstance(m, dict) and "id" in m and "method" in m for m in elements)
+        if not has_requests:
+            # Notifications and client responses: acknowledge and process in the background
+            self._track(session, message)
+            await self._send_json(writer, 202, None, keep_alive=keep_alive, extra_headers=headers)
+            return keep_alive
+
+        accept = request.headers.get("accept", "")
+        if "text/event-stream" in accept:
+            await self._stream_response(session, message, writer, headers)
+            return False
+
+        task = self._track(session, message)
+        await asyncio.wait({task})
+        response = None if task.cancelled() else task.result()
+        if response is None:
+            # Notification-only results, or the request was cancelled via notifications/cancelled
+            await self._send_json(writer, 202, None, keep_alive=keep_alive, extra_headers=headers)
+        else:
+            await self._send_json(writer, 200, response, keep_alive=keep_alive, extra_headers=headers)
+        return keep_alive
+
+    async def _stream_response(self, session: Optional[HttpSession], message: Any,
+                               writer: asyncio.StreamWriter, headers: Dict[str, str]) -> None:
+        """Answer a POST with an SSE stream carrying the response(s)."""
+        head = self._status_head(200, {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Connection": "close",
+            **headers,
+        })
+        writer.write(head)
+        await writer.drain()
+
+        def notify(notification: Dict[str, Any]) -> None:
+            # Server notifications (progress) related to this request travel on its stream
+            if not writer.is_closing():
+                writer.write(b"event: message\ndata: " + json_codec.dumps(notification) + b"\n\n")
+
+        task = self._track(session, message, notify)
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=SSE_KEEPALIVE_INTERVAL)
+            if done:
+                break
+            # Keep intermediaries and client read timeouts from dropping the stream.
+            # A dropped stream is not a cancellation: the request keeps running.
+            writer.write(b": keep-alive\n\n")
+            await writer.drain()
+
+        # A request cancelled via notifications/cancelled ends its stream without a message
+        response = None if task.cancelled() else task.result()
+        if response is not None:
+            writer.write(b"event: message\ndata: " + json_codec.dumps(response) + b"\n\n")
+            await writer.drain()
+
+    async def _handle_delete(self, request: _HttpRequest, writer: asyncio.StreamWriter) -> bool:
+        """Terminate the MCP session named by the Mcp-Session-Id header."""
+        keep_alive = request.keep_alive
+        session_id = request.headers.get("mcp-session-id")
+        session = self.sessions.get(session_id) if session_id else None
+        if session is None:
+            await self._send_json(writer, 404, self._error_body("Unknown session"), keep_alive=keep_alive)
+            return keep_alive
+        self._close_session(session)
+        await self._send_json(writer, 200, None, keep_alive=keep_alive)
+        return keep_alive
+
+    def _resolve_session(self, request: _HttpRequest,
+                         is_initialize: bool) -> Tuple[Optional[HttpSession], Optional[Tuple[int, str]]]:
+        """Find or create the MCP session for a POST; returns (session, (status, error))."""
+        session_id = request.headers.get("mcp-session-id")
+        if is_initialize and not session_id:
+            self._prune_idle_sessions()
+            session = HttpSession(uuid.uuid4().hex, self.server.new_request_slots())
+            self.sessions[session.session_id] = session
+            logger.info(f"🆕 MCP HTTP session {session.session_id} created ({len(self.sessions)} active)")
+            return session, None
+        if not session_id:
+            # Session-less clients are accepted; their requests are simply not grouped
+            return None, None
+        session = self.sessions.get(session_id)
+        if session is None:
+            return None, (404, "Unknown or expired session; re-initialize")
+        session.last_seen = time.time()
+        return session, None
+
+    def _track(self, session: Optional[HttpSession], message: Any,
+               notify: Optional[Callable[[Dict[str, Any]], Any]] = None) -> "asyncio.Task":
+        """Run a message through the server in a task registered with its session."""
+        if session is not None:
+            in_flight, slots = session.in_flight, session.slots
+        else:
+            if self._sessionless_slots is None:
+                self._sessionless_slots = self.server.new_request_slots()
+            in_flight, slots = self._sessionless_in_flight, self._sessionless_slots
+        task = asyncio.create_task(self.server.dispatch(message, in_flight, notify, slots))
+        if (isinstance(message, dict) and "id" in message and json_codec.is_valid_id(message["id"])
+                and message["id"] not in in_flight):
+            key = message["id"]
+            in_flight[key] = task
+            task.add_done_callback(lambda _t, m=in_flight, k=key: m.pop(k, None))
+        return task
+
+    def _prune_idle_sessions(self) -> None:
+        """Drop sessions that clients abandoned without sending DELETE."""
+        cutoff = time.time() - SESSION_IDLE_TIMEOUT
+        for session in list(self.sessions.values()):
+            if session.last_seen < cutoff and not session.in_flight:
+                self._close_session(session)
+
+    def _close_session(self, session: HttpSession) -> None:
+        """Forget a session and cancel whatever it still has running."""
+        self.sessions.pop(session.session_id, None)
+        for task in list(session.in_flight.values()):
+            task.cancel()
+        logger.info(f"👋 MCP HTTP session {session.session_id} closed ({len(self.sessions)} active)")
+
+    def _origin_allowed(self, request: _HttpRequest) -> bool:
+        """Accept requests without Origin (non-browser clients) or from a local origin."""
+        origin = request.headers.get("origin")
+        if not origin:
+            return True
+        host = urlsplit(origin).hostname or ""
+        return host in _LOCAL_ORIGIN_HOSTS or host == self.host
+
+    @staticmethod
+    def _error_body(message: str) -> Dict[str, Any]:
+        return {"error": message}
+
+    @staticmethod
+    def _status_head(status: int, headers: Dict[str, str]) -> bytes:
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, body: Any, keep_alive: bool,
+                         extra_headers: Optional[Dict[str, str]] = None) -> None:
+        """Write a complete response with a JSON body (or no body when body is None)."""
+        payload = b"" if body is None else json_codec.dumps(body)
+        headers = {
+            "Content-Length": str(len(payload)),
+            "Connection": "keep-alive" if keep_alive else "close",
+        }
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        if extra_headers:
+            headers.update(extra_headers)
+        writer.write(self._status_head(status, headers) + payload)
+        await writer.drain()
@@ -3,18 +3,50 @@ Interactive Session Manager for MCP Your Turn Server
 
 This module manages interactive sessions where the server waits for user responses
 via Telegram. It handles session state, timeouts, and response processing.
+
+Waiting is event-driven: every state change (mark_*) resolves the session's
+waiter future, and timeouts are loop.call_at timers, so an idle waiting
+session costs no CPU and a reply reaches the waiter on the next loop tick.
+Finished sessions are retained in finish order, bounded by a maximum age
+and a maximum count (oldest evicted first); one timer purges exactly the
+sessions that are due.
+
+With a SessionStore attached (attach_store), creation, message binding,
+completion and eviction are persisted, and the sessions found in the store
+are re-hydrated, so questions survive a restart.
 """
 
 import asyncio
+import os
+import re
+import sys
 import time
 import uuid
 import logging
-from typing import Dict, Optional, Any, Callable, Awaitable
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Callable, Awaitable, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
+if TYPE_CHECKING:
+    from session_store import SessionStore
+
 logger = logging.getLogger(__name__)
 
+# Retention of finished sessions (env SESSION_RETENTION_SECONDS / SESSION_RETENTION_MAX)
+DEFAULT_RETENTION_SECONDS = 3600
+DEFAULT_MAX_RETAINED_SESSIONS = 1000
+
+# Most questions accepted in one batch (one Telegram message)
+MAX_BATCH_QUESTIONS = 10
+
+# "2: answer" / "2. answer" / "2) answer" targets question 2 of a batch
+_BATCH_ANSWER_PREFIX = re.compile(r"^\s*(\d{1,2})\s*[:.)]\s*(.+)$", re.DOTALL)
+
+# Re-hydrated sessions whose timeout passed while the server was down stay open
+# this long, so replies sent before the timeout can still be replayed to them
+REPLAY_GRACE_SECONDS = 60
+
 
 class SessionStatus(Enum):
     """Status of an interactive session."""
@@ -23,81 +55,160 @@ class SessionStatus(Enum):
     COMPLETED = "completed"
     TIMEOUT = "timeout"
     ERROR = "error"
+    CANCELLED = "cancelled"
+
+
+_ACTIVE_STATUSES = frozenset((SessionStatus.PENDING, SessionStatus.WAITING))
 
+# dataclass(slots=True) exists from Python 3.10; older versions get a regular dataclass
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class InteractiveSession:
-    """Represents an interactive session waiting for user response."""
+    """
+    Represents an interactive session waiting for user response.
+
+    Slotted (on Python 3.10+) and kept small because finished sessions are retained: the
+    question text is dropped once it has been sent (release_message), and
+    metadata stays None unless a caller supplies some.
+    """
     
     session_id: str
-    message: str
+    message: Optional[str]
     chat_id: Optional[str] = None
     created_at: float = field(default_factory=time.time)
     timeout_seconds: int = 300  # 5 minutes default
     status: SessionStatus = SessionStatus.PENDING
     response: Optional[str] = None
     error_message: Optional[str] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
-    
+    metadata: Optional[Dict[str, Any]] = None
+    # Telegram message carrying the question (for edits and reply routing)
+    telegram_message_id: Optional[int] = None
+    # The answer has been returned to a client (a restored session is then not claimable)
+    delivered: bool = False
+    # Resolved on the next state change after wait_for_response started waiting
+    _waiter: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
+    # Expiry timer (loop.call_at), armed while the session is active
+    _timer: Optional[asyncio.TimerHandle] = field(default=None, repr=False, compare=False)
+    # Called once the session leaves the active state (the manager updates its indexes)
+    _on_finished: Optional[Callable[["InteractiveSession"], None]] = field(default=None, repr=False, compare=False)
+
     @property
     def is_expired(self) -> bool:
         """Check if the session has expired.
         A timeout_seconds <= 0 means infinite timeout (never expires).
         """
+        return self.expired_at(time.time())
+
+    def expired_at(self, when: float) -> bool:
+        """Check if the session had expired at the given wall-clock time."""
         if self.timeout_seconds <= 0:
             return False
-        return time.time() - self.created_at > self.timeout_seconds
+        return when - self.created_at > self.timeout_seconds
 
     @property
     def is_active(self) -> bool:
         """Check if the session is still active (pending or waiting)."""
-        return self.status in [SessionStatus.PENDING, SessionStatus.WAITING]
+        return self.status in _ACTIVE_STATUSES
+
+    def release_message(self) -> None:
+        """Drop the question text once it has been delivered."""
+        self.message = None
     
     def mark_completed(self, response: str) -> None:
         """Mark the session as completed with a response."""
         self.response = response
         self.status = SessionStatus.COMPLETED
+        self._settle()
     
     def mark_timeout(self) -> None:
         """Mark the session as timed out."""
         self.status = SessionStatus.TIMEOUT
+        self._settle()
     
     def mark_error(self, error_message: str) -> None:
         """Mark the session as having an error."""
         self.error_message = error_message
         self.status = SessionStatus.ERROR
+        self._settle()
+
+    def mark_cancelled(self, reason: Optional[str] = None) -> None:
+        """Mark the session as cancelled (the requester stopped waiting)."""
+        self.error_message = reason
+        self.status = SessionStatus.CANCELLED
+        self._settle()
+
+    def _settle(self) -> None:
+        """Wake the waiter and disarm the expiry timer after a state change."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._on_finished is not None and not self.is_active:
+            on_finished, self._on_finished = self._on_finished, None
+            on_finished(self)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(self.status)
 
 
 class InteractiveSessionManager:
     """Manages interactive sessions for user responses."""
     
-    def __init__(self, cleanup_interval: int = 60):
+    def __init__(
+        self,
+        cleanup_interval: int = 60,
+        retention_seconds: float = DEFAULT_RETENTION_SECONDS,
+        max_retained: int = DEFAULT_MAX_RETAINED_SESSIONS
+    ):
         """
         Initialize the session manager.
         
         Args:
-            cleanup_interval: How often to clean up expired sessions (seconds)
+            cleanup_interval: Unused; purging is driven by deadlines (kept for compatibility)
+            retention_seconds: How long finished sessions are kept after they finish
+            max_retained: Most finished sessions kept; the oldest are evicted beyond it
         """
         self.sessions: Dict[str, InteractiveSession] = {}
         self.cleanup_interval = cleanup_interval
-        self._cleanup_task: Optional[asyncio.Task] = None
+        self.retention_seconds = retention_seconds
+        self.max_retained = max(0, max_retained)
         self._response_callbacks: Dict[str, Callable[[str], Awaitable[None]]] = {}
+        # Retention queue: finished session_id -> finished_at, oldest first. With a
+        # single max age, finish order is purge-deadline order, so the head is
+        # always the next session due. OrderedDict keeps head access O(1) under
+        # constant popping from the front, which a plain dict does not.
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._purge_timer: Optional[asyncio.TimerHandle] = None
+        self._started = False
+        # chat_id -> active sessions in creation order
+        self._active_by_chat: Dict[str, "OrderedDict[str, InteractiveSession]"] = {}
+        # (chat_id, message_id) of each question sent -> session_id, kept until the session is purged
+        self._session_by_message: Dict[Tuple[str, int], str] = {}
+        # Optional durable store (see attach_store), and the sessions re-hydrated
+        # from it that no tool call has picked up again yet
+        self.store: Optional["SessionStore"] = None
+        self._restored: Dict[str, InteractiveSession] = {}
         
     async def start(self) -> None:
-        """Start the session manager and cleanup task."""
-        if self._cleanup_task is None:
-            self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        """Start the session manager (arms the purge timer and re-hydrated sessions' timeouts)."""
+        if not self._started:
+            self._started = True
+            for active in list(self._active_by_chat.values()):
+                for session in list(active.values()):
+                    if session.session_id in self._restored:
+                        self._arm_restored(session)
+                    else:
+                        self._arm_expiry(session)
+            self._schedule_purge()
             logger.info("Interactive session manager started")
     
     async def stop(self) -> None:
-        """Stop the session manager and cleanup task."""
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
-            self._cleanup_task = None
+        """Stop the session manager and its purge timer."""
+        if self._started:
+            self._started = False
+            if self._purge_timer is not None:
+                self._purge_timer.cancel()
+                self._purge_timer = None
             logger.info("Interactive session manager stopped")
     
     def create_session(
@@ -125,103 +236,296 @@ class InteractiveSessionManager:
             message=message,
             chat_id=chat_id,
             timeout_seconds=timeout_seconds,
-            metadata=metadata or {}
+            metadata=metadata or None
         )
         
         self.sessions[session_id] = session
+        if chat_id is not None:
+            self._active_by_chat.setdefault(str(chat_id), OrderedDict())[session_id] = session
+        session._on_finished = self._session_finished
+        self._arm_expiry(session)
+        if self.store is not None:
+            self.store.save_session(session)
         logger.info(f"Created interactive session {session_id}")
         return session
-    
-    async def wait_for_response(
+
+    def create_batch(
         self,
-        session: InteractiveSession,
-        poll_interval: float = 1.0
-    ) -> Optional[str]:
+        questions: List[Dict[str, Any]],
+        chat_id: Optional[str] = None,
+        timeout_seconds: int = 300,
+        reason: Optional[str] = None
+    ) -> List[InteractiveSession]:
         """
-        Wait for a response to an interactive session.
+        Create one child session per question of a batch asked in a single message.
+
+        The children share a "batch" list (their session IDs, in question
+        order) in their metadata; "index" is each child's position,
+        "options" its answer buttons and "reason" the batch's reason, if any.
+        Children do not auto-submit the default answer on timeout.
 
         Args:
-            session: The session to wait for
-            poll_interval: How often to check for responses (seconds)
+            questions: Items with "question" (text) and optional "options" (list of strings)
+            chat_id: Telegram chat ID (if applicable)
+            timeout_seconds: How long to wait for the answers
+            reason: Why the agent asks, shown above the questions
 
         Returns:
-            Optional[str]: The user's response, or None if timeout/error
+            List[InteractiveSession]: The child sessions, in question order
         """
-        session.status = SessionStatus.WAITING
-        logger.info(f"⏳ Starting wait for response to session {session.session_id}")
+        batch: List[str] = []
+        children = []
+        for index, item in enumerate(questions):
+            # The prewritten default answers your_turn, not the questions of a batch
+            metadata = {"batch": batch, "index": index, "auto_default": False}
+            if reason:
+                metadata["reason"] = reason
+            if item.get("options"):
+                metadata["options"] = list(item["options"])
+            session = self.create_session(item["question"], chat_id, timeout_seconds, metadata)
+            batch.append(session.session_id)
+            children.append(session)
+        return children
+
+    def get_batch(self, session: InteractiveSession) -> List[InteractiveSession]:
+        """The sessions of the batch a session belongs to, in question order ([session] if none)."""
+        batch = (session.metadata or {}).get("batch")
+        if not batch:
+            return [session]
+        return [self.sessions[sid] for sid in batch if sid in self.sessions]
+
+    def route_batch_reply(self, session: InteractiveSession, text: str) -> Tuple[InteractiveSession, str]:
+        """
+        Pick the question of a batch that a free-text reply answers.
 
-        poll_count = 0
-        while True:
-            poll_count += 1
+        "N: answer" answers question N; anything else answers the first
+        question still open. Sessions outside a batch are returned unchanged.
 
-            # Check if we have a response (check this first!)
-            if session.status == SessionStatus.COMPLETED:
-                logger.info(f"✅ Session {session.session_id} completed with response: '{session.response}' (after {poll_count} polls)")
-                return session.response
+        Args:
+            session: The session the reply was routed to
+            text: The reply text
 
-            # Check for timeout
-            if session.is_expired:
-                # Do one final check for response before timing out (race condition fix)
-                if session.status == SessionStatus.COMPLETED:
-                    logger.info(f"✅ Session {session.session_id} completed just before timeout: '{session.response}' (after {poll_count} polls)")
-                    return session.response
+        Returns:
+            Tuple[InteractiveSession, str]: The target session and the answer text
+        """
+        siblings = self.get_batch(session)
+        if len(siblings) == 1 and not (session.metadata or {}).get("batch"):
+            return session, text
+        match = _BATCH_ANSWER_PREFIX.match(text)
+        if match:
+            number = int(match.group(1))
+            for sibling in siblings:
+                if sibling.metadata["index"] == number - 1:
+                    return sibling, match.group(2).strip()
+        for sibling in siblings:
+            if sibling.is_active:
+                return sibling, text
+        return session, text
+
+    def attach_store(self, store: "SessionStore") -> int:
+        """
+        Persist sessions to a store from now on, re-hydrating the sessions it holds.
 
-                session.mark_timeout()
-                logger.warning(f"⏰ Session {session.session_id} timed out after {session.timeout_seconds} seconds ({poll_count} polls)")
+        Active sessions get their timeout timers back (armed by start() if no
+        loop is running yet). Sessions whose timeout passed while the server
+        was down stay open for REPLAY_GRACE_SECONDS, so that replies sent in
+        time can be replayed from Telegram's backlog; replies are judged by
+        when they were sent (see submit_response).
 
-                # Auto-submit default message if configured
+        Args:
+            store: The SessionStore to load from and write to
+
+        Returns:
+            int: Number of active sessions re-hydrated
+        """
+        self.store = store
+        restored_active = 0
+        for row in store.load_sessions():
+            session_id = row["session_id"]
+            if session_id in self.sessions:
+                continue
+            try:
+                status = SessionStatus(row["status"])
+            except ValueError:
+                status = SessionStatus.ERROR
+            session = InteractiveSession(
+                session_id=session_id,
+                message=row["message"],
+                chat_id=row["chat_id"],
+                created_at=row["created_at"],
+                timeout_seconds=row["timeout_seconds"],
+                status=status,
+                response=row["response"],
+                error_message=row["error_message"],
+                telegram_message_id=row["telegram_message_id"],
+                delivered=bool(row["delivered"])
+            )
+            self.sessions[session_id] = session
+            if session.is_active or (session.status == SessionStatus.COMPLETED and not session.delivered):
+                # May still be claimed by a client asking again (claim_restored_session)
+                self._restored[session_id] = session
+            else:
+                session.release_message()
+            if session.telegram_message_id is not None:
+                self._session_by_message[(str(session.chat_id), session.telegram_message_id)] = session_id
+
+            if session.is_active:
+                if session.chat_id is not None:
+                    self._active_by_chat.setdefault(str(session.chat_id), OrderedDict())[session_id] = session
+                session._on_finished = self._session_finished
+                self._arm_restored(session)
+                restored_active += 1
+            else:
+                self._finished[session_id] = row["finished_at"] or session.created_at
+
+        # The store lists by creation time; retention needs finish order
+        self._finished = OrderedDict(sorted(self._finished.items(), key=lambda item: item[1]))
+        while len(self._finished) > self.max_retained:
+            self._evict(next(iter(self._finished)))
+        if self._started:
+            self._schedule_purge()
+        logger.info(f"💾 Re-hydrated {len(self.sessions)} session(s) from the store ({restored_active} active)")
+        return restored_active
+
+    def _arm_restored(self, session: InteractiveSession) -> None:
+        """Arm a re-hydrated session's timeout, granting the replay grace period if it is overdue."""
+        if not session.is_expired:
+            self._arm_expiry(session)
+            return
+        if session._timer is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Armed by start()
+            return
+        session._timer = loop.call_at(loop.time() + REPLAY_GRACE_SECONDS, self._expire_session, session)
+
+    def _arm_expiry(self, session: InteractiveSession) -> None:
+        """Schedule the session's timeout on the running loop (no-op without one)."""
+        if session.timeout_seconds <= 0 or session._timer is not None or not session.is_active:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Created outside the loop; armed when someone starts waiting
+            return
+        delay = max(0.0, session.created_at + session.timeout_seconds - time.time())
+        session._timer = loop.call_at(loop.time() + delay, self._expire_session, session)
+
+    def _expire_session(self, session: InteractiveSession) -> None:
+        """Timer callback: time the session out, auto-submitting the default answer if configured."""
+        session._timer = None
+        if not session.is_active:
+            return
+        session.mark_timeout()
+        logger.warning(f"⏰ Session {session.session_id} timed out after {session.timeout_seconds} seconds")
+        if (session.metadata or {}).get("auto_default", True):
+            self._auto_submit_default(session)
+
+    def _auto_submit_default(self, session: InteractiveSession) -> Optional[str]:
+        """Complete a timed-out session with the prewritten answer marked default: true, if any."""
+        try:
+            from config import config as _cfg
+            msgs = getattr(_cfg, 'messages', {}).get('messages', {}) if _cfg else {}
+            pre = msgs.get('prewritten') or []
+            default_item = None
+            if isinstance(pre, list):
+                for it in pre:
+                    if isinstance(it, dict) and it.get('default') is True:
+                        default_item = it
+                        break
+            if default_item is not None:
                 try:
-                    from config import config as _cfg
-                    msgs = getattr(_cfg, 'messages', {}).get('messages', {}) if _cfg else {}
-                    pre = msgs.get('prewritten') or []
-                    default_item = None
-                    if isinstance(pre, list):
-                        for it in pre:
-                            if isinstance(it, dict) and it.get('default') is True:
-                                default_item = it
-                                break
-                    if default_item is not None:
-                        try:
-                            text = _cfg.resolve_message_item(default_item)
-                            if text:
-                                old_status = session.status.value
-                                session.mark_completed(text)
-                                logger.info(f"✅ Auto-submitted default message on timeout for session {session.session_id} (was {old_status})")
-                                return text
-                        except Exception as e:
-                            logger.error(f"Failed to resolve default prewritten message: {e}")
+                    text = _cfg.resolve_message_item(default_item)
+                    if text:
+                        old_status = session.status.value
+                        session.mark_completed(text)
+                        if self.store is not None:
+                            # The timeout was already stored when the session finished
+                            self.store.save_session(session, self._finished.get(session.session_id))
+                        logger.info(f"✅ Auto-submitted default message on timeout for session {session.session_id} (was {old_status})")
+                        return text
                 except Exception as e:
-                    logger.error(f"Default message lookup failed: {e}")
+                    logger.error(f"Failed to resolve default prewritten message: {e}")
+        except Exception as e:
+            logger.error(f"Default message lookup failed: {e}")
+        return None
 
-                break
+    async def wait_for_response(
+        self,
+        session: InteractiveSession,
+        poll_interval: float = 1.0
+    ) -> Optional[str]:
+        """
+        Wait for a response to an interactive session.
 
-            # Check if session is no longer active (but not completed)
-            if not session.is_active and session.status != SessionStatus.COMPLETED:
-                logger.warning(f"❌ Session {session.session_id} became inactive without completion (after {poll_count} polls)")
-                break
+        Args:
+            session: The session to wait for
+            poll_interval: Unused; kept for backward compatibility (waiting is event-driven)
 
-            # Log periodic status updates (every 30 seconds)
-            if poll_count % 30 == 0:
-                logger.info(f"🔄 Still waiting for session {session.session_id} (poll #{poll_count}, status: {session.status.value})")
+        Returns:
+            Optional[str]: The user's response, or None if timeout/error
+        """
+        if session.status == SessionStatus.PENDING:
+            session.status = SessionStatus.WAITING
+        logger.info(f"⏳ Starting wait for response to session {session.session_id}")
 
-            # Wait before next check
-            await asyncio.sleep(poll_interval)
+        if session.is_active:
+            try:
+                # Shielded: several callers may wait on the same session
+                await asyncio.shield(self._waiter_for(session))
+            except asyncio.CancelledError:
+                # The waiter went away: free the session so replies are not routed to it
+                if session.is_active:
+                    session.mark_cancelled("Request cancelled by client")
+                    logger.info(f"🚫 Wait for session {session.session_id} cancelled")
+                raise
 
-        # Final check before returning None
         if session.status == SessionStatus.COMPLETED:
-            logger.info(f"✅ Session {session.session_id} completed in final check: '{session.response}' (after {poll_count} polls)")
+            logger.info(f"✅ Session {session.session_id} completed with response: '{session.response}'")
             return session.response
 
-        logger.info(f"❌ Returning None for session {session.session_id} (after {poll_count} polls)")
+        logger.info(f"❌ Returning None for session {session.session_id} (status: {session.status.value})")
         return None
     
-    def submit_response(self, session_id: str, response: str) -> bool:
+    async def wait_until_finished(self, session: InteractiveSession, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until a session leaves the active state, without taking ownership of it.
+
+        Unlike wait_for_response, giving up (timeout or cancellation) leaves
+        the session open, so it can be waited on again (ticket mode).
+
+        Args:
+            session: The session to wait for
+            timeout: Seconds to wait at most (None = until the session finishes)
+
+        Returns:
+            bool: True if the session has finished
+        """
+        if session.is_active:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._waiter_for(session)), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return not session.is_active
+
+    def _waiter_for(self, session: InteractiveSession) -> asyncio.Future:
+        """The future resolved on the session's next state change (arms its timeout too)."""
+        self._arm_expiry(session)
+        if session._waiter is None or session._waiter.done():
+            session._waiter = asyncio.get_running_loop().create_future()
+        return session._waiter
+
+    def submit_response(self, session_id: str, response: str, received_at: Optional[float] = None) -> bool:
         """
         Submit a response for a session.
 
         Args:
             session_id: The session ID
             response: The user's response
+            received_at: When the user sent it (defaults to now); replies replayed
+                after a restart are accepted if they were sent before the timeout
 
         Returns:
             bool: True if response was accepted, False otherwise
@@ -237,8 +541,9 @@ class InteractiveSessionManager:
             logger.warning(f"❌ Attempted to submit response for inactive session {session_id} (status: {session.status.value})")
             return False
 
-        if session.is_expired:
-            session.mark_timeout()
+        if session.expired_at(time.time() if received_at is None else received_at):
+            # The timer has not fired yet; expire now, exactly as it would
+            self._expire_session(session)
             logger.warning(f"❌ Attempted to submit response for expired session {session_id}")
             return False
 
@@ -248,6 +553,24 @@ class InteractiveSessionManager:
         logger.info(f"✅ Response submitted for session {session_id} (status changed from {old_status} to {session.status.value})")
         return True
     
+    def cancel_session(self, session_id: str, reason: Optional[str] = None) -> bool:
+        """
+        Cancel an active session.
+
+        Args:
+            session_id: The session ID
+            reason: Optional reason recorded on the session
+
+        Returns:
+            bool: True if the session was active and is now cancelled
+        """
+        session = self.sessions.get(session_id)
+        if not session or not session.is_active:
+            return False
+        session.mark_cancelled(reason)
+        logger.info(f"🚫 Session {session_id} cancelled{f': {reason}' if reason else ''}")
+        return True
+
     def get_session(self, session_id: str) -> Optional[InteractiveSession]:
         """Get a session by ID."""
         return self.sessions.get(session_id)
@@ -260,47 +583,196 @@ class InteractiveSessionManager:
         }
     
     def get_sessions_for_chat(self, chat_id: str) -> Dict[str, InteractiveSession]:
-        """Get all sessions for a specific chat ID."""
+        """Get all sessions (active and finished) for a specific chat ID."""
         return {
             sid: session for sid, session in self.sessions.items()
             if session.chat_id == chat_id
         }
+
+    def get_active_sessions_for_chat(self, chat_id: str) -> Dict[str, InteractiveSession]:
+        """Get the active sessions for a chat, oldest first (from the per-chat index)."""
+        return dict(self._active_by_chat.get(str(chat_id), {}))
+
+    def get_latest_active_session(self, chat_id: str, at: Optional[float] = None) -> Optional[InteractiveSession]:
+        """
+        Get the most recently created active session for a chat.
+
+        Amortized O(1): the newest entry of the per-chat index is returned,
+        after expiring any newer sessions whose timer has not fired yet.
+
+        Args:
+            chat_id: Telegram chat ID
+            at: When the reply was sent (defaults to now)
+
+        Returns:
+            Optional[InteractiveSession]: The session a plain reply should go to, or None
+        """
+        at = time.time() if at is None else at
+        active = self._active_by_chat.get(str(chat_id))
+        while active:
+            session = next(reversed(active.values()))
+            if not session.expired_at(at):
+                return session
+            # Removes it from the index through _unindex_session
+            self._expire_session(session)
+        return None
+
+    def bind_message(self, session_id: str, message_id: int) -> None:
+        """
+        Record that a Telegram message in the session's chat carries its question.
+
+        Args:
+            session_id: The session ID
+            message_id: Telegram message ID returned by send_message
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        session.telegram_message_id = int(message_id)
+        self._session_by_message[(str(session.chat_id), session.telegram_message_id)] = session_id
+        if self.store is not None:
+            self.store.save_session(session)
+
+    def get_session_for_message(self, chat_id: Any, message_id: int) -> Optional[InteractiveSession]:
+        """
+        Get the session whose question is the given Telegram message.
+
+        The session may already be finished; callers should check is_active.
+
+        Args:
+            chat_id: Chat of the message
+            message_id: Telegram message ID (e.g. of reply_to_message)
+
+        Returns:
+            Optional[InteractiveSession]: The session, or None if the message is not a known question
+        """
+        session_id = self._session_by_message.get((str(chat_id), int(message_id)))
+        return self.sessions.get(session_id) if session_id else None
+
+    def claim_restored_session(self, message: str, chat_id: Any,
+                               timeout_seconds: Optional[int] = None) -> Optional[InteractiveSession]:
+        """
+        Pick up a re-hydrated session asking the same question in the same chat.
+
+        A client whose your_turn call was cut off by a restart typically asks
+        again; it gets the original session (still waiting, or answered while
+        the server was down) instead of a duplicate question. Each restored
+        session is claimed at most once, and an answer that already reached a
+        client (see mark_delivered) is never handed out again.
+
+        Args:
+            message: The question text
+            chat_id: Telegram chat ID
+            timeout_seconds: The new call's timeout; must match the original's if given
+
+        Returns:
+            Optional[InteractiveSession]: The restored session, or None
+        """
+        for session in reversed(list(self._restored.values())):
+            if (session.message == message and str(session.chat_id) == str(chat_id)
+                    and (timeout_seconds is None or session.timeout_seconds == timeout_seconds)
+                    and (session.is_active
+                         or (session.status == SessionStatus.COMPLETED and not session.delivered))):
+                del self._restored[session.session_id]
+                logger.info(f"💾 Resuming re-hydrated session {session.session_id}")
+                return session
+        return None
+
+    def mark_delivered(self, session: InteractiveSession) -> None:
+        """Record that a session's answer was returned to a client, so a restart never replays it."""
+        if session.delivered or session.status != SessionStatus.COMPLETED:
+            return
+        session.delivered = True
+        self._restored.pop(session.session_id, None)
+        if self.store is not None:
+            self.store.save_session(session, self._finished.get(session.session_id))
+
+    def _unindex_session(self, session: InteractiveSession) -> None:
+        """Drop a finished session from the per-chat index."""
+        key = str(session.chat_id)
+        active = self._active_by_chat.get(key)
+        if active is not None:
+            active.pop(session.session_id, None)
+            if not active:
+                del self._active_by_chat[key]
     
-    async def _cleanup_loop(self) -> None:
-        """Background task to clean up expired sessions."""
-        while True:
-            try:
-                await asyncio.sleep(self.cleanup_interval)
-                await self._cleanup_expired_sessions()
-            except asyncio.CancelledError:
+    def _session_finished(self, session: InteractiveSession) -> None:
+        """Hook run once per session when it leaves the active state."""
+        self._unindex_session(session)
+        finished_at = time.time()
+        self._finished[session.session_id] = finished_at
+        if self.store is not None:
+            self.store.save_session(session, finished_at)
+        while len(self._finished) > self.max_retained:
+            # Over the count limit: evict the oldest finished session right away
+            self._evict(next(iter(self._finished)))
+        if self._started and self._purge_timer is None:
+            self._schedule_purge()
+
+    def _evict(self, session_id: str) -> None:
+        """Forget a finished session and everything indexed by it."""
+        self._finished.pop(session_id, None)
+        self._restored.pop(session_id, None)
+        session = self.sessions.pop(session_id, None)
+        if self.store is not None:
+            self.store.delete_session(session_id)
+        if session is not None and session.telegram_message_id is not None:
+            key = (str(session.chat_id), session.telegram_message_id)
+            # Batch children share one message, bound to one of them
+            if self._session_by_message.get(key) == session_id:
+                del self._session_by_message[key]
+
+    def _schedule_purge(self) -> None:
+        """Point the purge timer at the oldest finished session's deadline."""
+        if self._purge_timer is not None:
+            self._purge_timer.cancel()
+            self._purge_timer = None
+        if not self._finished:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        purge_at = next(iter(self._finished.values())) + self.retention_seconds
+        delay = max(0.0, purge_at - time.time())
+        self._purge_timer = loop.call_at(loop.time() + delay, self._purge_due)
+
+    def _purge_due(self) -> None:
+        """Timer callback: purge due sessions and rearm for the next deadline."""
+        self._purge_timer = None
+        try:
+            self.purge_finished_sessions()
+        except Exception as e:
+            logger.error(f"Error in session cleanup: {e}")
+        if self._started:
+            self._schedule_purge()
+
+    def purge_finished_sessions(self, now: Optional[float] = None) -> int:
+        """
+        Remove finished sessions whose retention period is over.
+
+        Only sessions that are due are touched, oldest first, so the cost is
+        O(k) for k due sessions, independent of how many are retained.
+
+        Args:
+            now: Wall-clock time to purge up to (defaults to time.time())
+
+        Returns:
+            int: Number of sessions removed
+        """
+        now = time.time() if now is None else now
+        cutoff = now - self.retention_seconds
+        purged = 0
+        while self._finished:
+            session_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > cutoff:
                 break
-            except Exception as e:
-                logger.error(f"Error in session cleanup: {e}")
-    
-    async def _cleanup_expired_sessions(self) -> None:
-        """Clean up expired sessions."""
-        expired_sessions = []
-        
-        for session_id, session in self.sessions.items():
-            if session.is_expired and session.is_active:
-                session.mark_timeout()
-                expired_sessions.append(session_id)
-        
-        # Remove old completed/timeout/error sessions (older than 1 hour)
-        cutoff_time = time.time() - 3600  # 1 hour
-        old_sessions = [
-            session_id for session_id, session in self.sessions.items()
-            if session.created_at < cutoff_time and not session.is_active
-        ]
-        
-        for session_id in old_sessions:
-            del self.sessions[session_id]
-        
-        if expired_sessions:
-            logger.info(f"Marked {len(expired_sessions)} sessions as expired")
-        
-        if old_sessions:
-            logger.info(f"Cleaned up {len(old_sessions)} old sessions")
+            self._evict(session_id)
+            purged += 1
+
+        if purged:
+            logger.info(f"Cleaned up {purged} old sessions")
+        return purged
 
 
 # Global session manager instance
@@ -311,10 +783,25 @@ def get_session_manager() -> InteractiveSessionManager:
     """Get or create the global session manager instance."""
     global _session_manager
     if _session_manager is None:
-        _session_manager = InteractiveSessionManager()
+        _session_manager = InteractiveSessionManager(
+            retention_seconds=_env_number('SESSION_RETENTION_SECONDS', DEFAULT_RETENTION_SECONDS),
+            max_retained=int(_env_number('SESSION_RETENTION_MAX', DEFAULT_MAX_RETAINED_SESSIONS))
+        )
     return _session_manager
 
 
+def _env_number(name: str, default: float) -> float:
+    """Read a non-negative number from the environment, falling back to default."""
+    value = os.getenv(name)
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        logger.warning(f"⚠️ Invalid {name}={value!r}, using {default}")
+        return default
+
+
 async def create_interactive_session(
     message: str,
     chat_id: Optional[str] = None,
@@ -347,7 +834,7 @@ async def wait_for_user_response(
     
     Args:
         session: The session to wait for
-        poll_interval: How often to check for responses (seconds)
+        poll_interval: Unused; kept for backward compatibility
         
     Returns:
         Optional[str]: The user's response, or None if timeout/error
@@ -0,0 +1,121 @@
+"""
+JSON codec for MCP frames.
+
+Picks the fastest JSON library available, in this order: orjson, ujson, then
+the standard library json module. Set MCP_JSON_CODEC=orjson|ujson|json to
+force a specific backend.
+
+All backends share one interface: loads() accepts bytes or str, and dumps()
+returns compact UTF-8 bytes that can be written straight to a binary stream.
+"""
+
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, Optional, Union
+
+# Every backend's decode error (and UnicodeDecodeError for bad bytes) is a
+# ValueError subclass, so callers catch this regardless of the backend.
+JSONDecodeError = ValueError
+
+
+def is_valid_id(value: Any) -> bool:
+    """Whether value may be a JSON-RPC request id (string, number or null; never bool)."""
+    return value is None or (isinstance(value, (str, int, float)) and not isinstance(value, bool))
+
+
+class JsonCodec:
+    """A JSON backend with a bytes-oriented interface."""
+
+    def __init__(self, name: str, loads: Callable[[Union[bytes, str]], Any], dumps: Callable[[Any], bytes]):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self) -> str:
+        return f"JsonCodec({self.name!r})"
+
+
+def _std_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _make_json() -> JsonCodec:
+    return JsonCodec("json", json.loads, _std_dumps)
+
+
+def _make_orjson() -> Optional[JsonCodec]:
+    try:
+        import orjson  # type: ignore
+    except ImportError:
+        return None
+
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=options)
+        except TypeError:
+            # e.g. integers wider than 64 bits; the stdlib handles those
+            return _std_dumps(obj)
+
+    return JsonCodec("orjson", orjson.loads, dumps)
+
+
+def _make_ujson() -> Optional[JsonCodec]:
+    try:
+        import ujson  # type: ignore
+    except ImportError:
+        return None
+
+    def dumps(obj: Any) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+    return JsonCodec("ujson", ujson.loads, dumps)
+
+
+_FACTORIES: Dict[str, Callable[[], Optional[JsonCodec]]] = {
+    "orjson": _make_orjson,
+    "ujson": _make_ujson,
+    "json": _make_json,
+}
+
+
+def available_codecs() -> Dict[str, JsonCodec]:
+    """Return every importable backend, fastest first."""
+    codecs = {}
+    for name, factory in _FACTORIES.items():
+        codec = factory()
+        if codec is not None:
+            codecs[name] = codec
+    return codecs
+
+
+def select_codec(preferred: Optional[str] = None) -> JsonCodec:
+    """
+    Select a JSON backend.
+
+    Args:
+        preferred: Backend name to use if importable (orjson, ujson or json)
+
+    Returns:
+        JsonCodec: The preferred backend, else the fastest importable one
+    """
+    if preferred:
+        factory = _FACTORIES.get(preferred.strip().lower())
+        codec = factory() if factory else None
+        if codec is not None:
+            return codec
+        print(f"[JSON] Codec {preferred!r} not available, falling back to auto-selection", file=sys.stderr)
+
+    for factory in _FACTORIES.values():
+        codec = factory()
+        if codec is not None:
+            return codec
+    return _make_json()
+
+
+# Process-wide codec
+codec = select_codec(os.getenv("MCP_JSON_CODEC"))
+loads = codec.loads
+dumps = codec.dumps
@@ -37,7 +37,6 @@ Notes:
 """
 
 import argparse
-import json
 import os
 import sys
 import time
@@ -45,6 +44,8 @@ import shlex
 import subprocess
 from typing import List, Optional, Tuple
 
+import json_codec
+
 DOCKER_IMAGE = os.getenv("YOUR_TURN_IMAGE", "your-turn-server")
 
 
@@ -135,6 +136,11 @@ def _run_docker_with_input(lines: List[str], token: Optional[str], chat: Optiona
             pass
 
 
+def _encode_request(request: dict) -> str:
+    """Encode a JSON-RPC request as one stdin line (without the newline)."""
+    return json_codec.dumps(request).decode("utf-8")
+
+
 def _parse_json_lines(stdout_text: str) -> List[dict]:
     """Parse each non-empty line of stdout as JSON, return list of parsed dicts.
     Ignores lines that fail to parse.
@@ -145,8 +151,8 @@ def _parse_json_lines(stdout_text: str) -> List[dict]:
         if not line:
             continue
         try:
-            results.append(json.loads(line))
-        except json.JSONDecodeError:
+            results.append(json_codec.loads(line))
+        except json_codec.JSONDecodeError:
             # Leave a hint for debugging, but don't crash
             print(f"[CLIENT] ⚠️ Non-JSON line on stdout (ignored): {line[:120]}", file=sys.stderr)
     return results
@@ -154,8 +160,8 @@ def _parse_json_lines(stdout_text: str) -> List[dict]:
 
 def cmd_tools_list(args: argparse.Namespace) -> int:
     lines = [
-        json.dumps({"jsonrpc": "2.0", "id": 0, "method": "initialize"}),
-        json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}),
+        _encode_request({"jsonrpc": "2.0", "id": 0, "method": "initialize"}),
+        _encode_request({"jsonrpc": "2.0", "id": 1, "method": "tools/list"}),
     ]
     code, so, se = _run_docker_with_input(lines, args.token, args.chat, network_host=args.network_host, max_wait=args.max_wait)
 
@@ -182,7 +188,7 @@ def cmd_your_turn(args: argparse.Namespace) -> int:
         }
     }
 
-    lines = [json.dumps(initialize), json.dumps(call)]
+    lines = [_encode_request(initialize), _encode_request(call)]
 
     print("[CLIENT] 🚀 Launching your-turn-server in Docker...", file=sys.stderr)
     print(f"[CLIENT]     Image: {DOCKER_IMAGE}", file=sys.stderr)
@@ -213,7 +219,8 @@ def cmd_your_turn(args: argparse.Namespace) -> int:
     if "result" in reply and reply["result"].get("content"):
         text = reply["result"]["content"][0].get("text", "")
         print("[CLIENT] ✅ Received JSON-RPC result for your_turn.", file=sys.stderr)
-        print(f"[CLIENT] 🧾 First 200 chars: {text[:200].replace('\n',' ')}", file=sys.stderr)
+        preview = text[:200].replace('\n', ' ')
+        print(f"[CLIENT] 🧾 First 200 chars: {preview}", file=sys.stderr)
         return 0
     elif "error" in reply:
         print(f"[CLIENT] ⚠️ Error response: {reply['error']}", file=sys.stderr)
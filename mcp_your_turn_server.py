@@ -6,41 +6,83 @@ Supports sound notifications and optional Telegram bot integration.
 """
 
 import asyncio
-import json
 import sys
 import os
 import argparse
+import importlib
 import logging
-from typing import Any, Dict, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
+from enum import Enum
 
-# Debugging environment variables
-print(f"DEBUG: TELEGRAM_BOT_TOKEN from os.getenv: {os.getenv('TELEGRAM_BOT_TOKEN')}", file=sys.stderr)
-print(f"DEBUG: TELEGRAM_CHAT_ID from os.getenv: {os.getenv('TELEGRAM_CHAT_ID')}", file=sys.stderr)
+import json_codec
+from stdio_transport import DEFAULT_MAX_FRAME_BYTES, StdioReader, StdioWriter
+from http_transport import DEFAULT_HTTP_HOST, DEFAULT_HTTP_PORT, HttpTransport
+from daemon_transport import ON_DEMAND_IDLE_TIMEOUT, UnixSocketDaemon, default_socket_path, run_shim
 
-# Import our custom modules
+# Import our custom modules. telegram_notifier (python-telegram-bot, httpx,
+# Deepgram) is imported on first use, so sound-only servers never load it
+# and initialize is answered before it is loaded.
 try:
-    from config import config
-    from telegram_notifier import TelegramNotifier
-    from sound_manager import play_notification_sound
+    from config import get_config
+    from sound_manager import get_sound_stats, play_notification_sound_async
     from interactive_session import (
+        MAX_BATCH_QUESTIONS,
+        SessionStatus,
         create_interactive_session,
+        get_session_manager,
         wait_for_user_response
     )
 except ImportError as e:
     print(f"[WARNING] Could not import custom modules: {e}", file=sys.stderr)
     print("[WARNING] Some features will be disabled", file=sys.stderr)
-    config = None
-    TelegramNotifier = None
-    play_notification_sound = None
+    get_config = None
+    play_notification_sound_async = None
+    get_sound_stats = None
     create_interactive_session = None
     wait_for_user_response = None
     get_session_manager = None
+    SessionStatus = None
+    MAX_BATCH_QUESTIONS = 10
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Upper bound on requests handled at the same time on one connection
+# (each HTTP session and daemon shim has its own).
+# your_turn calls can wait for hours, so this must comfortably exceed the
+# number of agents sharing the pipe.
+DEFAULT_MAX_CONCURRENT_REQUESTS = 32
+
+# Methods answered at once: they never take a slot, so a connection full of
+# your_turn waits can still handshake, list tools and ping
+NON_BLOCKING_METHODS = frozenset({"initialize", "tools/list", "ping"})
+NON_BLOCKING_TOOLS = frozenset({"your_turn_poll"})
+
+# Seconds in-flight requests may still finish after stdin closes; the rest
+# are cancelled (their questions withdrawn) so the process exits promptly
+SHUTDOWN_GRACE_SECONDS = 5.0
+
+# Seconds between notifications/progress heartbeats while your_turn waits (0 disables)
+DEFAULT_PROGRESS_INTERVAL = 10.0
+
+# Seconds after a question is sent during which further ones are merged into one message (0 disables)
+DEFAULT_COALESCE_WINDOW = 0.5
+
+# Default wait of one your_turn_await call (the question itself stays open longer)
+DEFAULT_AWAIT_TIMEOUT = 60
+
+
+class TelegramState(Enum):
+    """Readiness of the Telegram integration (reported by GET /health)."""
+    DISABLED = "disabled"      # not configured, or python-telegram-bot unavailable
+    PENDING = "pending"        # configured, warm-up not started yet
+    WARMING_UP = "warming_up"  # connecting and starting the poller in the background
+    READY = "ready"            # polling; questions can be sent immediately
+    FAILED = "failed"          # last warm-up failed; retried by the next tool call
+
 
 @dataclass
 class ResponseResult:
@@ -54,9 +96,36 @@ class ResponseResult:
     telegram_attempted: bool
     error: Optional[str]
 
+def resolve_telegram_credentials(telegram_bot_token: Optional[str] = None,
+                                 telegram_chat_id: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Resolve the Telegram bot token and chat ID.
+
+    Priority: environment variables > command-line args > config file.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: (bot_token, chat_id), either may be None
+    """
+    # Loading the config also loads .env into the environment
+    config = get_config() if get_config else None
+    bot_token = os.getenv('TELEGRAM_BOT_TOKEN') or telegram_bot_token
+    chat_id = os.getenv('TELEGRAM_CHAT_ID') or telegram_chat_id
+
+    # Fall back to config file if available
+    if not bot_token or not chat_id:
+        if config and hasattr(config, 'get_telegram_config'):
+            config_token, config_chat_id = config.get_telegram_config()
+            bot_token = bot_token or config_token
+            chat_id = chat_id or config_chat_id
+    return bot_token, chat_id
+
+
 class MCPServer:
-    def __init__(self, telegram_bot_token: Optional[str] = None, telegram_chat_id: Optional[str] = None):
-        # Define single tool - simplified back to original behavior
+    def __init__(self, telegram_bot_token: Optional[str] = None, telegram_chat_id: Optional[str] = None,
+                 max_concurrent_requests: Optional[int] = None, max_frame_bytes: Optional[int] = None,
+                 progress_interval: Optional[float] = None, session_store: Optional[str] = None,
+                 coalesce_window: Optional[float] = None):
+        # your_turn blocks until the reply; the your_turn_start/poll/await tickets split it up
         self.tools = {
             "your_turn": {
                 "name": "your_turn",
@@ -75,47 +144,292 @@ class MCPServer:
                     },
                     "additionalProperties": False
                 }
+            },
+            "your_turn_batch": {
+                "name": "your_turn_batch",
+                "description": "Ask several questions at once: one notification and one Telegram message with answer buttons per question. Waits for all answers and returns them together (partial answers on timeout).",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "questions": {
+                            "type": "array",
+                            "description": f"Questions to ask (max {MAX_BATCH_QUESTIONS}): plain strings, or objects with options for answer buttons",
+                            "items": {
+                                "anyOf": [
+                                    {"type": "string"},
+                                    {
+                                        "type": "object",
+                                        "properties": {
+                                            "question": {"type": "string"},
+                                            "options": {"type": "array", "items": {"type": "string"}}
+                                        },
+                                        "required": ["question"]
+                                    }
+                                ]
+                            },
+                            "minItems": 1,
+                            "maxItems": MAX_BATCH_QUESTIONS
+                        },
+                        "reason": {
+                            "type": "string",
+                            "description": "Optional context shown above the questions"
+                        },
+                        "timeout_seconds": {
+                            "type": "number",
+                            "description": "Optional override for wait timeout in seconds (min 10, max 7200, 0 = no timeout). Default 300."
+                        }
+                    },
+                    "required": ["questions"],
+                    "additionalProperties": False
+                }
+            },
+            "your_turn_start": {
+                "name": "your_turn_start",
+                "description": "Notify the user like your_turn, but return a ticket immediately instead of waiting. Keep working, then collect the reply with your_turn_poll or your_turn_await.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "reason": {
+                            "type": "string",
+                            "description": "Optional reason for the notification (e.g., 'mission completed', 'need user input')"
+                        },
+                        "timeout_seconds": {
+                            "type": "number",
+                            "description": "How long the question stays open in seconds (min 10, max 7200, 0 = no timeout). Default 300."
+                        }
+                    },
+                    "additionalProperties": False
+                }
+            },
+            "your_turn_poll": {
+                "name": "your_turn_poll",
+                "description": "Check a your_turn_start ticket without blocking: still waiting, or the user's reply.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "ticket": {
+                            "type": "string",
+                            "description": "Ticket returned by your_turn_start"
+                        }
+                    },
+                    "required": ["ticket"],
+                    "additionalProperties": False
+                }
+            },
+            "your_turn_await": {
+                "name": "your_turn_await",
+                "description": "Wait for the reply to a your_turn_start ticket, up to timeout_seconds. If time runs out the question stays open and the ticket can be awaited or polled again.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "ticket": {
+                            "type": "string",
+                            "description": "Ticket returned by your_turn_start"
+                        },
+                        "timeout_seconds": {
+                            "type": "number",
+                            "description": f"Longest this call blocks in seconds (min 10, max 7200, 0 = until the question closes). Default {DEFAULT_AWAIT_TIMEOUT}."
+                        }
+                    },
+                    "required": ["ticket"],
+                    "additionalProperties": False
+                }
             }
         }
 
-        # Initialize Telegram notifier
-        self.telegram_notifier = None
-
-        # Priority: command-line args > environment variables > config file
-        # Priority: environment variables > command-line args > config file
-        bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
-        chat_id = os.getenv('TELEGRAM_CHAT_ID')
-
-        # Fall back to command-line args if not provided via environment variables
-        if not bot_token:
-            bot_token = telegram_bot_token
-        if not chat_id:
-            chat_id = telegram_chat_id
-
-        # Fall back to config file if available
-        if not bot_token or not chat_id:
-            if config and hasattr(config, 'get_telegram_config'):
-                config_token, config_chat_id = config.get_telegram_config()
-                if not bot_token:
-                    bot_token = config_token
-                if not chat_id:
-                    chat_id = config_chat_id
-
-        # Create Telegram notifier if we have credentials
-        if bot_token and chat_id and TelegramNotifier:
-            self.telegram_notifier = TelegramNotifier(bot_token, chat_id)
-            print(f"[TELEGRAM] Initialized with chat ID: {chat_id}", file=sys.stderr)
+        # In-flight request tasks keyed by JSON-RPC id (see run/_dispatch_request)
+        self._in_flight: Dict[Any, asyncio.Task] = {}
+        self._request_slots: Optional[asyncio.Semaphore] = None
+        self._writer: Optional[StdioWriter] = None
+        self._reader: Optional[StdioReader] = None
+        # Fire-and-forget tasks (kept referenced until they finish)
+        self._background_tasks: set = set()
+        # Serializes Telegram start-up when several requests need it at once
+        self._interactive_lock: Optional[asyncio.Lock] = None
+
+        # Priority: environment variable > command-line arg > default
+        limit = os.getenv('MCP_MAX_CONCURRENT_REQUESTS') or max_concurrent_requests
+        try:
+            self.max_concurrent_requests = max(1, int(limit)) if limit else DEFAULT_MAX_CONCURRENT_REQUESTS
+        except (TypeError, ValueError):
+            logger.warning(f"⚠️ Invalid max concurrent requests value {limit!r}, using {DEFAULT_MAX_CONCURRENT_REQUESTS}")
+            self.max_concurrent_requests = DEFAULT_MAX_CONCURRENT_REQUESTS
+
+        frame_limit = os.getenv('MCP_MAX_FRAME_BYTES') or max_frame_bytes
+        try:
+            self.max_frame_bytes = max(1024, int(frame_limit)) if frame_limit else DEFAULT_MAX_FRAME_BYTES
+        except (TypeError, ValueError):
+            logger.warning(f"⚠️ Invalid max frame size {frame_limit!r}, using {DEFAULT_MAX_FRAME_BYTES}")
+            self.max_frame_bytes = DEFAULT_MAX_FRAME_BYTES
+
+        interval = os.getenv('MCP_PROGRESS_INTERVAL') or progress_interval
+        try:
+            self.progress_interval = max(0.0, float(interval)) if interval is not None else DEFAULT_PROGRESS_INTERVAL
+        except (TypeError, ValueError):
+            logger.warning(f"⚠️ Invalid progress interval {interval!r}, using {DEFAULT_PROGRESS_INTERVAL}")
+            self.progress_interval = DEFAULT_PROGRESS_INTERVAL
+
+        window = os.getenv('MCP_COALESCE_WINDOW') or coalesce_window
+        try:
+            self.coalesce_window = max(0.0, float(window)) if window is not None else DEFAULT_COALESCE_WINDOW
+        except (TypeError, ValueError):
+            logger.warning(f"⚠️ Invalid coalesce window {window!r}, using {DEFAULT_COALESCE_WINDOW}")
+            self.coalesce_window = DEFAULT_COALESCE_WINDOW
+        # Outcome of the last background sound: idle, playing, ok or failed (reported by GET /health)
+        self.sound_status = "idle"
+
+        # Telegram notifier, created on first use (see the telegram_notifier property)
+        self._telegram_notifier = None
+        self._telegram_credentials = None
+        self.telegram_state = TelegramState.DISABLED
+        # Background warm-up started after initialize; tool calls await it
+        self._telegram_warmup: Optional[asyncio.Task] = None
+        # Durable session store (SESSION_STORE_PATH / --session-store), Telegram only
+        self.session_store = None
+        bot_token, chat_id = resolve_telegram_credentials(telegram_bot_token, telegram_chat_id)
+
+        # Remember credentials; the notifier itself is created on first use
+        if bot_token and chat_id:
+            self._telegram_credentials = (bot_token, chat_id)
+            self.telegram_state = TelegramState.PENDING
+            print(f"[TELEGRAM] Configured for chat ID: {chat_id} (loaded on first use)", file=sys.stderr)
+            self._attach_session_store(os.getenv('SESSION_STORE_PATH') or session_store)
         elif bot_token or chat_id:
             print(f"[TELEGRAM] Incomplete configuration - missing {'chat_id' if not chat_id else 'bot_token'}", file=sys.stderr)
         else:
             print("[TELEGRAM] No configuration found - sound notifications only", file=sys.stderr)
 
-    def play_notification_sound(self):
-        """Play a notification sound using the sound manager."""
+    def _attach_session_store(self, path: Optional[str]) -> None:
+        """Persist interactive sessions to the SQLite store at path and re-hydrate them (no-op without a path)."""
+        if not path or not get_session_manager:
+            return
+        # Imported only when configured: sqlite3 is not needed otherwise
+        from session_store import open_session_store
+        self.session_store = open_session_store(path)
+        if self.session_store is not None:
+            restored = get_session_manager().attach_store(self.session_store)
+            print(f"[SESSIONS] Persisting to {self.session_store.path} ({restored} pending question(s) restored)",
+                  file=sys.stderr)
+
+    def close_session_store(self) -> None:
+        """Flush and close the session store, if any."""
+        if self.session_store is not None:
+            try:
+                self.session_store.close()
+            except Exception as e:
+                logger.error(f"❌ Failed to close session store: {e}")
+            self.session_store = None
+
+    @property
+    def telegram_notifier(self):
+        """The TelegramNotifier, importing the Telegram stack on first access (None if unconfigured)."""
+        if self._telegram_notifier is None and self._telegram_credentials:
+            bot_token, chat_id = self._telegram_credentials
+            self._telegram_credentials = None
+            try:
+                from telegram_notifier import TelegramNotifier
+            except ImportError as e:
+                print(f"[WARNING] Could not import telegram_notifier: {e}", file=sys.stderr)
+                return None
+            self._telegram_notifier = TelegramNotifier(bot_token, chat_id)
+            self._telegram_notifier.coalesce_window = self.coalesce_window
+            print(f"[TELEGRAM] Initialized with chat ID: {chat_id}", file=sys.stderr)
+        return self._telegram_notifier
+
+    @telegram_notifier.setter
+    def telegram_notifier(self, notifier) -> None:
+        self._telegram_notifier = notifier
+        self.telegram_state = TelegramState.PENDING if notifier else TelegramState.DISABLED
+
+    def start_telegram_warmup(self) -> Optional[asyncio.Task]:
+        """
+        Start connecting to Telegram in the background.
+
+        Called right after initialize so that the get_me round trip, the
+        Application build and start_polling are done before the first
+        your_turn call. Idempotent; a failed warm-up is restarted.
+
+        Returns:
+            Optional[asyncio.Task]: The warm-up task (result: ready or not), or None if Telegram is disabled
+        """
+        if self.telegram_state == TelegramState.DISABLED:
+            return None
+        task = self._telegram_warmup
+        if task is None or (task.done() and (task.cancelled() or not task.result())):
+            task = asyncio.create_task(self._warm_up_telegram())
+            self._telegram_warmup = task
+        return task
+
+    async def _warm_up_telegram(self) -> bool:
+        """Import the Telegram stack and start interactive mode; never raises."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.telegram_state = TelegramState.WARMING_UP
+        logger.info("🔥 Warming up Telegram in the background...")
+        try:
+            if self.session_store is not None:
+                # Re-hydrated questions need their timeouts before replies are replayed
+                await get_session_manager().start()
+            if self._telegram_notifier is None:
+                # Import python-telegram-bot off the event loop so pending responses are not delayed
+                await loop.run_in_executor(None, importlib.import_module, "telegram_notifier")
+            notifier = self.telegram_notifier
+            if not notifier or not notifier.is_enabled():
+                self.telegram_state = TelegramState.DISABLED
+                logger.warning("⚠️ Telegram notifier unavailable, continuing with sound notifications only")
+                return False
+            ready = await self._ensure_interactive_mode()
+        except Exception as e:
+            logger.error(f"❌ Telegram warm-up failed: {e}")
+            ready = False
+
+        self.telegram_state = TelegramState.READY if ready else TelegramState.FAILED
+        if ready:
+            logger.info(f"✅ Telegram ready in {loop.time() - started:.2f}s")
+        else:
+            logger.error(f"❌ Telegram not ready after {loop.time() - started:.2f}s, will retry on next tool call")
+        return ready
+
+    async def _wait_for_telegram(self) -> bool:
+        """Wait for the Telegram warm-up (starting it if needed); True when questions can be sent."""
+        task = self.start_telegram_warmup()
+        if task is None:
+            return False
+        # Shielded: a cancelled tool call must not abort the shared warm-up
+        return await asyncio.shield(task)
+
+    def play_notification_sound(self) -> asyncio.Task:
+        """
+        Start the notification sound in the background.
+
+        Playback can take seconds (or time out) on headless machines, so it
+        runs off the event loop, in parallel with the Telegram question; its
+        outcome is logged and kept in sound_status, never awaited by a tool call.
+        Bursts are collapsed by the sound manager (MCP_SOUND_MIN_INTERVAL).
+
+        Returns:
+            asyncio.Task: The playback task
+        """
+        self.sound_status = "playing"
+        task = asyncio.create_task(self._play_sound())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    @property
+    def sound_stats(self) -> Optional[Dict[str, Any]]:
+        """Throttling counters of the sound manager (reported by GET /health), None before the first sound."""
+        return get_sound_stats() if get_sound_stats else None
+
+    async def _play_sound(self) -> bool:
+        """Play the notification sound in a worker thread, falling back to the terminal bell."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        success = False
         try:
-            if play_notification_sound:
+            if play_notification_sound_async:
                 # Use the new sound manager
-                success = play_notification_sound()
+                success = await play_notification_sound_async()
                 if not success:
                     logger.warning("Sound manager failed, using fallback")
                     # IMPORTANT: write bell to stderr to avoid corrupting MCP JSON on stdout
@@ -127,6 +441,9 @@ class MCPServer:
             logger.error(f"Sound notification failed: {e}")
             # IMPORTANT: write any fallback bell/notice to stderr to avoid corrupting MCP JSON on stdout
             print(f"\a[NOTIFICATION: sound failed - {e}]", file=sys.stderr, flush=True)
+        self.sound_status = "ok" if success else "failed"
+        logger.info(f"🔊 Sound {self.sound_status} after {loop.time() - started:.2f}s (in background)")
+        return success
 
     async def _ensure_interactive_mode(self) -> bool:
         """Ensure Telegram interactive mode is running."""
@@ -134,6 +451,15 @@ class MCPServer:
             logger.error("No Telegram notifier available")
             return False
 
+        # Concurrent tool calls (several agents on one server) must not each
+        # build their own Application and poller
+        if self._interactive_lock is None:
+            self._interactive_lock = asyncio.Lock()
+        async with self._interactive_lock:
+            return await self._start_interactive_mode()
+
+    async def _start_interactive_mode(self) -> bool:
+        """Start Telegram interactive mode unless it is already running."""
         try:
             # Test connection first
             logger.info("🔍 Testing Telegram connection...")
@@ -161,12 +487,9 @@ class MCPServer:
             # Start interactive mode (polling)
             if not self.telegram_notifier._running:
                 logger.info("🔄 Starting interactive polling...")
+                # Returns once polling has started (or failed)
                 await self.telegram_notifier.start_interactive_mode()
 
-                # Give it a moment to start
-                import asyncio
-                await asyncio.sleep(2)
-
                 if self.telegram_notifier._running:
                     logger.info("✅ Interactive polling started successfully")
                     return True
@@ -182,7 +505,8 @@ class MCPServer:
             logger.debug(f"Full traceback: {traceback.format_exc()}")
             return False
 
-    async def _handle_your_turn_tool(self, request: Dict[str, Any], arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def _handle_your_turn_tool(self, request: Dict[str, Any], arguments: Dict[str, Any],
+                                     notify: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
         """
         Handle the your_turn tool - simplified approach based on old server architecture.
 
@@ -190,86 +514,175 @@ class MCPServer:
         1. Plays notification sound
         2. Attempts to get user response via Telegram (with timeout)
         3. ALWAYS returns the pre-written message with any user response included
+
+        While waiting, progress heartbeats are sent through notify if the
+        request carried a progress token, so clients do not time out and retry.
         """
         reason = arguments.get("reason", "")
-        # Allow MCP clients to override timeout (defaults to 300)
+        timeout_seconds = self._parse_timeout(arguments)
+        logger.info(f"🔔 Your Turn tool called with reason: {reason} (timeout_seconds={timeout_seconds})")
+
+        # Try to get user response via Telegram (simplified approach)
+        user_response = None
+        telegram_attempted = False
+        session = None
+
         try:
-            timeout_seconds_raw = arguments.get("timeout_seconds", 300)
+            telegram_attempted, session = await self._ask_user(reason, timeout_seconds)
+            if session is not None:
+                heartbeat = self._start_progress_heartbeat(request, notify, timeout_seconds)
+                try:
+                    if timeout_seconds == 0:
+                        logger.info("⏳ Waiting indefinitely for user response (infinite timeout)...")
+                        # Wait without wrapping in asyncio.wait_for
+                        user_response = await wait_for_user_response(session)
+                    else:
+                        logger.info(f"⏳ Waiting for user response ({timeout_seconds} seconds max)...")
+                        # Wait for response with guaranteed timeout
+                        try:
+                            user_response = await asyncio.wait_for(
+                                wait_for_user_response(session),
+                                timeout=timeout_seconds + 5  # small buffer
+                            )
+                        except asyncio.TimeoutError:
+                            logger.info("⏰ Timeout reached - no user response")
+                            user_response = None
+                finally:
+                    if heartbeat is not None:
+                        heartbeat.cancel()
+
+                # Final check for race conditions
+                if not user_response and hasattr(session, 'response') and session.response:
+                    logger.warning(f"🔄 Using session response: '{session.response}'")
+                    user_response = session.response
+
+                if user_response:
+                    logger.info(f"✅ User response received: '{user_response}'")
+                    get_session_manager().mark_delivered(session)
+                else:
+                    logger.info("⏰ No user response received")
+
+        except asyncio.CancelledError:
+            # Client sent notifications/cancelled (or the transport shut down)
+            if session is not None:
+                self._withdraw_session(session)
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error in Telegram interaction: {e}")
+
+        message = self._build_your_turn_message(reason, user_response, telegram_attempted)
+        logger.info(f"📤 Returning response (user_response: {user_response is not None})")
+
+        response = self._tool_result(request, message)
+
+        # Log the exact response being returned
+        logger.info(f"🚀 Response ready - ID: {request.get('id')}, content length: {len(message)}")
+
+        return response
+
+    @staticmethod
+    def _parse_timeout(arguments: Dict[str, Any], default: int = 300) -> int:
+        """Read timeout_seconds from tool arguments: 0 = infinite, otherwise clamped to 10..7200."""
+        # Allow MCP clients to override timeout
+        try:
+            timeout_seconds_raw = arguments.get("timeout_seconds", default)
             timeout_seconds = int(float(timeout_seconds_raw))
         except Exception:
-            timeout_seconds = 300
+            timeout_seconds = default
         # Support infinite timeout when 0 is specified; otherwise clamp between 10 and 7200
         if timeout_seconds != 0:
             timeout_seconds = max(10, min(timeout_seconds, 7200))
-        logger.info(f"🔔 Your Turn tool called with reason: {reason} (timeout_seconds={timeout_seconds})")
+        return timeout_seconds
+
+    @staticmethod
+    def _tool_result(request: Dict[str, Any], text: str) -> Dict[str, Any]:
+        """A tools/call result carrying one text block."""
+        return {
+            "jsonrpc": "2.0",
+            "id": request.get("id"),
+            "result": {
+                "content": [
+                    {
+                        "type": "text",
+                        "text": text
+                    }
+                ]
+            }
+        }
 
+    async def _ask_user(self, reason: str, timeout_seconds: int) -> Tuple[bool, Optional[Any]]:
+        """
+        Play the notification sound and put the question to the user via Telegram.
+
+        Args:
+            reason: Reason given by the agent
+            timeout_seconds: How long the question stays open (0 = infinite)
+
+        Returns:
+            Tuple[bool, Optional[Any]]: Whether Telegram was attempted, and the
+                session the reply will arrive on (None if the question was not sent)
+        """
         # Play notification sound
         self.play_notification_sound()
 
-        # Try to get user response via Telegram (simplified approach)
-        user_response = None
-        telegram_attempted = False
+        # Normally already finished: warm-up starts right after initialize
+        telegram_ready = await self._wait_for_telegram()
 
-        if self.telegram_notifier and self.telegram_notifier.is_enabled():
-            telegram_attempted = True
-            try:
-                logger.info("🤖 Attempting to get user response via Telegram...")
+        if not self.telegram_notifier or not self.telegram_notifier.is_enabled():
+            return False, None
 
-                # Ensure interactive mode is active
-                interactive_started = await self._ensure_interactive_mode()
-                if interactive_started:
-                    # Create session
-                    # Compose prompt text, accounting for infinite timeout
-                    if timeout_seconds == 0:
-                        prompt_note = "Please respond when ready; I will wait indefinitely."
-                    else:
-                        unit = 'minutes' if timeout_seconds >= 60 else 'seconds'
-                        val = (timeout_seconds // 60) if timeout_seconds >= 60 else timeout_seconds
-                        prompt_note = f"Please respond if you have any input, or I'll continue automatically in {val} {unit}."
-
-                    session = await create_interactive_session(
-                        message=f"🔔 Notification: {reason}\n\n{prompt_note}",
-                        chat_id=self.telegram_notifier.chat_id,
-                        timeout_seconds=timeout_seconds
-                    )
-
-                    # Send question
-                    question_sent = await self.telegram_notifier.send_interactive_question(session)
-                    if question_sent:
-                        if timeout_seconds == 0:
-                            logger.info("⏳ Waiting indefinitely for user response (infinite timeout)...")
-                            # Wait without wrapping in asyncio.wait_for
-                            user_response = await wait_for_user_response(session)
-                        else:
-                            logger.info(f"⏳ Waiting for user response ({timeout_seconds} seconds max)...")
-                            # Wait for response with guaranteed timeout
-                            try:
-                                user_response = await asyncio.wait_for(
-                                    wait_for_user_response(session),
-                                    timeout=timeout_seconds + 5  # small buffer
-                                )
-                            except asyncio.TimeoutError:
-                                logger.info("⏰ Timeout reached - no user response")
-                                user_response = None
-
-                        # Final check for race conditions
-                        if not user_response and hasattr(session, 'response') and session.response:
-                            logger.warning(f"🔄 Using session response: '{session.response}'")
-                            user_response = session.response
-
-                        if user_response:
-                            logger.info(f"✅ User response received: '{user_response}'")
-                        else:
-                            logger.info("⏰ No user response received")
-                    else:
-                        logger.error("❌ Failed to send Telegram question")
-                else:
-                    logger.error("❌ Failed to start interactive mode")
+        logger.info("🤖 Attempting to get user response via Telegram...")
 
-            except Exception as e:
-                logger.error(f"❌ Error in Telegram interaction: {e}")
+        # Interactive mode is started by the warm-up
+        if not telegram_ready:
+            logger.error("❌ Failed to start interactive mode")
+            return True, None
+
+        # Compose prompt text, accounting for infinite timeout
+        if timeout_seconds == 0:
+            prompt_note = "Please respond when ready; I will wait indefinitely."
+        else:
+            unit = 'minutes' if timeout_seconds >= 60 else 'seconds'
+            val = (timeout_seconds // 60) if timeout_seconds >= 60 else timeout_seconds
+            prompt_note = f"Please respond if you have any input, or I'll continue automatically in {val} {unit}."
+        question = f"🔔 Notification: {reason}\n\n{prompt_note}"
+
+        # A call cut off by a restart is usually repeated: resume its question
+        session = self._claim_restored_session(question, timeout_seconds)
+        if session is not None:
+            return True, session
+
+        session = await create_interactive_session(
+            message=question,
+            chat_id=self.telegram_notifier.chat_id,
+            timeout_seconds=timeout_seconds,
+            metadata={"reason": reason} if reason else None
+        )
+
+        # Send question
+        try:
+            question_sent = await self.telegram_notifier.send_interactive_question(session)
+        except asyncio.CancelledError:
+            self._withdraw_session(session)
+            raise
+        if not question_sent:
+            logger.error("❌ Failed to send Telegram question")
+            get_session_manager().cancel_session(session.session_id, "Question could not be sent")
+            return True, None
+        return True, session
+
+    def _build_your_turn_message(self, reason: str, user_response: Optional[str], telegram_attempted: bool,
+                                 answers: Optional[List[Tuple[str, Optional[str]]]] = None) -> str:
+        """
+        Compose the your_turn result text from the configurable templates (messages.yml).
 
-        # Build response message (prefer configurable templates if available)
+        Args:
+            reason: Reason given by the agent
+            user_response: The user's reply, if any
+            telegram_attempted: Whether a Telegram question was attempted
+            answers: For a batch, (question, answer or None) pairs replacing user_response
+        """
+        config = get_config() if get_config else None
         msgs = getattr(config, 'messages', {}).get('messages', {}) if config else {}
         default_prefix = msgs.get('default_prefix', "🔔 Notification sent! The user has been alerted.")
         default_reason_prefix = msgs.get('default_reason_prefix', "📝 Reason: ")
@@ -284,7 +697,12 @@ class MCPServer:
             message += f"\n\n{default_reason_prefix}{reason}"
 
         # Add user response if we got one
-        if user_response:
+        if answers and any(answer for _, answer in answers):
+            message += f"\n\n{response_prefix.rstrip()}"
+            for number, (question, answer) in enumerate(answers, 1):
+                reply = f"\"{answer}\"" if answer else "(no answer)"
+                message += f"\n{number}. {question}\n   → {reply}"
+        elif user_response:
             message += f"\n\n{response_prefix}\"{user_response}\""
         else:
             # Add status message only if no user response
@@ -294,27 +712,272 @@ class MCPServer:
         if post_instructions:
             message += f"{post_instructions}"
 
-        logger.info(f"📤 Returning response (user_response: {user_response is not None})")
+        return message
+
+    async def _handle_your_turn_batch(self, request: Dict[str, Any], arguments: Dict[str, Any],
+                                      notify: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        Handle your_turn_batch: ask several questions in one Telegram message and wait for all answers.
+
+        One sound and one message cover the whole batch. Each question is a
+        child session answered on its own (buttons or "N: answer" replies);
+        the call returns once all are answered, or with the answers so far
+        when the timeout passes.
+        """
+        questions = self._parse_batch_questions(arguments.get("questions"))
+        if isinstance(questions, str):
+            return {
+                "jsonrpc": "2.0",
+                "id": request.get("id"),
+                "error": {
+                    "code": -32602,
+                    "message": questions
+                }
+            }
+        reason = arguments.get("reason", "")
+        timeout_seconds = self._parse_timeout(arguments)
+        logger.info(f"🗂️ your_turn_batch called with {len(questions)} question(s) (timeout_seconds={timeout_seconds})")
 
-        response = {
+        self.play_notification_sound()
+        telegram_ready = await self._wait_for_telegram()
+        telegram_attempted = bool(self.telegram_notifier and self.telegram_notifier.is_enabled())
+        sessions: List[Any] = []
+
+        if telegram_attempted and telegram_ready:
+            manager = get_session_manager()
+            await manager.start()
+            sessions = manager.create_batch(questions, self.telegram_notifier.chat_id, timeout_seconds, reason)
+            try:
+                sent = await self.telegram_notifier.send_batch_question(sessions)
+            except asyncio.CancelledError:
+                self._withdraw_batch(sessions)
+                raise
+            if not sent:
+                logger.error("❌ Failed to send Telegram batch question")
+                for session in sessions:
+                    manager.cancel_session(session.session_id, "Question could not be sent")
+                sessions = []
+
+        if sessions:
+            heartbeat = self._start_progress_heartbeat(request, notify, timeout_seconds)
+            try:
+                # Each child times out on its own timer; the buffer only guards against a stuck one
+                await asyncio.wait_for(
+                    asyncio.gather(*(manager.wait_until_finished(session) for session in sessions)),
+                    timeout=timeout_seconds + 5 if timeout_seconds else None
+                )
+            except asyncio.TimeoutError:
+                logger.info("⏰ Timeout reached - returning partial answers")
+            except asyncio.CancelledError:
+                self._withdraw_batch(sessions)
+                raise
+            finally:
+                if heartbeat is not None:
+                    heartbeat.cancel()
+            answers = [(item["question"], session.response if session.status == SessionStatus.COMPLETED else None)
+                       for item, session in zip(questions, sessions)]
+            logger.info(f"✅ Batch answered {sum(1 for _, a in answers if a)}/{len(answers)}")
+            for session in sessions:
+                manager.mark_delivered(session)
+            # Close what is still open and show the unanswered questions as closed
+            # (each answer already redrew the message)
+            for session in sessions:
+                manager.cancel_session(session.session_id, "Batch returned")
+            if any(session.status != SessionStatus.COMPLETED for session in sessions):
+                self._refresh_batch_message(sessions)
+        else:
+            answers = [(item["question"], None) for item in questions]
+
+        message = self._build_your_turn_message(reason, None, telegram_attempted, answers)
+        return self._tool_result(request, message)
+
+    @staticmethod
+    def _parse_batch_questions(raw: Any) -> Any:
+        """Normalize the questions argument to [{"question", "options"}]; returns an error string if invalid."""
+        if not isinstance(raw, list) or not raw:
+            return "Missing required parameter: questions (a non-empty list)"
+        if len(raw) > MAX_BATCH_QUESTIONS:
+            return f"Too many questions: {len(raw)} (max {MAX_BATCH_QUESTIONS})"
+        questions = []
+        for item in raw:
+            if isinstance(item, str):
+                item = {"question": item}
+            if not isinstance(item, dict) or not str(item.get("question") or "").strip():
+                return "Each question must be a string or an object with a non-empty \"question\""
+            options = item.get("options") or []
+            if not isinstance(options, list):
+                return "Question options must be a list of strings"
+            questions.append({"question": str(item["question"]).strip(),
+                              "options": [str(option) for option in options if str(option).strip()]})
+        return questions
+
+    def _withdraw_batch(self, sessions: List[Any]) -> None:
+        """Cancel the open questions of a cancelled your_turn_batch call and update its message."""
+        for session in sessions:
+            get_session_manager().cancel_session(session.session_id, "Request cancelled by client")
+        logger.info(f"🚫 your_turn_batch {sessions[0].session_id[:8]}... cancelled by client")
+        self._refresh_batch_message(sessions)
+
+    def _refresh_batch_message(self, sessions: List[Any]) -> None:
+        """Redraw a batch's Telegram message in the background (the caller does not wait on Telegram)."""
+        if self.telegram_notifier:
+            task = asyncio.create_task(self.telegram_notifier.refresh_batch_message(sessions[0]))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
+    async def _handle_your_turn_start(self, request: Dict[str, Any], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Handle your_turn_start: notify the user and return a ticket without waiting.
+
+        The ticket is the session ID; the reply is collected later with
+        your_turn_poll (non-blocking) or your_turn_await (blocking).
+        """
+        reason = arguments.get("reason", "")
+        timeout_seconds = self._parse_timeout(arguments)
+        logger.info(f"🎫 your_turn_start called with reason: {reason} (timeout_seconds={timeout_seconds})")
+
+        telegram_attempted, session = await self._ask_user(reason, timeout_seconds)
+        if session is None:
+            # Nobody can answer: report like a your_turn that got no reply
+            return self._tool_result(request, self._build_your_turn_message(reason, None, telegram_attempted))
+
+        if session.status == SessionStatus.PENDING:
+            session.status = SessionStatus.WAITING
+        logger.info(f"🎫 Ticket {session.session_id} issued")
+        return self._tool_result(request, self._ticket_status_text(session))
+
+    async def _handle_your_turn_poll(self, request: Dict[str, Any], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle your_turn_poll: report a ticket's status without blocking."""
+        session = self._find_ticket(arguments)
+        if session is None:
+            return self._unknown_ticket_error(request, arguments)
+        return self._tool_result(request, self._ticket_status_text(session))
+
+    async def _handle_your_turn_await(self, request: Dict[str, Any], arguments: Dict[str, Any],
+                                      notify: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        Handle your_turn_await: block until the ticket is answered or this call's own timeout passes.
+
+        Running out of time (or being cancelled) ends only this call; the
+        question stays open and the ticket can be awaited or polled again.
+        """
+        session = self._find_ticket(arguments)
+        if session is None:
+            return self._unknown_ticket_error(request, arguments)
+
+        timeout_seconds = self._parse_timeout(arguments, DEFAULT_AWAIT_TIMEOUT)
+        logger.info(f"⏳ Awaiting ticket {session.session_id} ({timeout_seconds or 'no'} seconds max)...")
+        heartbeat = self._start_progress_heartbeat(request, notify, timeout_seconds)
+        try:
+            await get_session_manager().wait_until_finished(session, timeout_seconds or None)
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+        return self._tool_result(request, self._ticket_status_text(session))
+
+    def _find_ticket(self, arguments: Dict[str, Any]) -> Optional[Any]:
+        ticket = arguments.get("ticket")
+        if not ticket or not get_session_manager:
+            return None
+        return get_session_manager().get_session(str(ticket).strip())
+
+    @staticmethod
+    def _unknown_ticket_error(request: Dict[str, Any], arguments: Dict[str, Any]) -> Dict[str, Any]:
+        ticket = arguments.get("ticket")
+        return {
             "jsonrpc": "2.0",
             "id": request.get("id"),
-            "result": {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": message
-                    }
-                ]
+            "error": {
+                "code": -32602,
+                "message": f"Unknown or expired ticket: {ticket}" if ticket else "Missing required parameter: ticket"
             }
         }
 
-        # Log the exact response being returned
-        logger.info(f"🚀 Response ready - ID: {request.get('id')}, content length: {len(message)}")
-
-        return response
+    def _ticket_status_text(self, session: Any) -> str:
+        """Describe a ticket: still open (with timing), or the final your_turn message."""
+        metadata = session.metadata or {}
+        if session.is_active and not session.is_expired:
+            elapsed = int(time.time() - session.created_at)
+            if session.timeout_seconds > 0:
+                timing = f"{elapsed}s elapsed, {max(0, session.timeout_seconds - elapsed)}s remaining"
+            else:
+                timing = f"{elapsed}s elapsed, no timeout"
+            return (f"🎫 Ticket: {session.session_id}\n"
+                    f"⏳ Status: waiting for the user ({timing})\n\n"
+                    f"Keep working; call your_turn_poll (non-blocking) or your_turn_await (blocking) "
+                    f"with this ticket to collect the reply.")
+
+        status = session.status.value if not session.is_active else SessionStatus.TIMEOUT.value
+        response = session.response if session.status == SessionStatus.COMPLETED else None
+        get_session_manager().mark_delivered(session)
+        message = self._build_your_turn_message(metadata.get("reason", ""), response, telegram_attempted=True)
+        return f"🎫 Ticket: {session.session_id}\n📌 Status: {status}\n\n{message}"
+
+    def _start_progress_heartbeat(self, request: Dict[str, Any], notify: Optional[Callable[[Dict[str, Any]], Any]],
+                                  timeout_seconds: int) -> Optional[asyncio.Task]:
+        """
+        Start sending progress notifications for a waiting your_turn call.
 
+        Args:
+            request: The tools/call request (its params._meta.progressToken is used)
+            notify: Callable that sends a notification back to the requesting client
+            timeout_seconds: The wait timeout (0 = infinite)
 
+        Returns:
+            Optional[asyncio.Task]: The heartbeat task, or None if no heartbeat is needed
+        """
+        meta = (request.get("params") or {}).get("_meta") or {}
+        progress_token = meta.get("progressToken") if isinstance(meta, dict) else None
+        if progress_token is None or notify is None or self.progress_interval <= 0:
+            return None
+        logger.info(f"💓 Sending progress every {self.progress_interval:g}s (token {progress_token!r})")
+        return asyncio.create_task(self._progress_heartbeat(notify, progress_token, timeout_seconds))
+
+    async def _progress_heartbeat(self, notify: Callable[[Dict[str, Any]], Any], progress_token: Any,
+                                  timeout_seconds: int) -> None:
+        """Emit notifications/progress with elapsed and remaining time until cancelled."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            progress = round(loop.time() - started, 1)
+            elapsed = int(progress)
+            params: Dict[str, Any] = {"progressToken": progress_token, "progress": progress}
+            if timeout_seconds:
+                remaining = max(0, timeout_seconds - elapsed)
+                params["total"] = timeout_seconds
+                params["message"] = f"Waiting for user reply: {elapsed}s elapsed, {remaining}s remaining"
+            else:
+                params["message"] = f"Waiting for user reply: {elapsed}s elapsed, no timeout"
+            try:
+                notify({"jsonrpc": "2.0", "method": "notifications/progress", "params": params})
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to send progress notification: {e}")
+
+    def _claim_restored_session(self, question: str, timeout_seconds: int) -> Optional[Any]:
+        """Return a session re-hydrated from the store that asks the same question, if any."""
+        if self.session_store is None:
+            return None
+        return get_session_manager().claim_restored_session(question, self.telegram_notifier.chat_id,
+                                                            timeout_seconds)
+
+    def _withdraw_session(self, session: Any) -> None:
+        """Cancel a session whose request was cancelled and update its Telegram question."""
+        if get_session_manager:
+            get_session_manager().cancel_session(session.session_id, "Request cancelled by client")
+        logger.info(f"🚫 your_turn for session {session.session_id} cancelled by client")
+
+        # A coalesced question shares its message with other agents still
+        # waiting: redraw it so only this entry closes
+        if (session.metadata or {}).get("batch"):
+            self._refresh_batch_message([session])
+            return
+
+        # The edit runs in the background: the cancelled request must not wait on Telegram
+        if self.telegram_notifier:
+            task = asyncio.create_task(self.telegram_notifier.mark_question_cancelled(session))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
 
     async def _handle_notification_tool(self, request: Dict[str, Any], arguments: Dict[str, Any]) -> Dict[str, Any]:
         """Handle the notification tools (your_turn and your_turn_notify)."""
@@ -332,6 +995,7 @@ class MCPServer:
                 logger.error(f"Failed to send Telegram notification: {e}")
 
         # Prepare response message (use config templates)
+        config = get_config() if get_config else None
         msgs = getattr(config, 'messages', {}).get('messages', {}) if config else {}
         default_prefix = msgs.get('default_prefix', "🔔 Notification sent! The user has been alerted.")
         default_reason_prefix = msgs.get('default_reason_prefix', "📝 Reason: ")
@@ -423,7 +1087,7 @@ class MCPServer:
 
         # Ensure interactive mode is started
         logger.info("🤖 Ensuring Telegram interactive mode is active...")
-        interactive_started = await self._ensure_interactive_mode()
+        interactive_started = await self._wait_for_telegram()
         if not interactive_started:
             logger.error("Failed to start Telegram interactive mode")
             return {
@@ -492,11 +1156,142 @@ class MCPServer:
                 }
             }
 
-    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle incoming MCP requests."""
+    async def handle_request(self, request: Any, in_flight: Optional[Dict[Any, asyncio.Task]] = None,
+                             notify: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                             slots: Optional[asyncio.Semaphore] = None) -> Optional[Any]:
+        """
+        Handle an incoming MCP message.
+
+        Args:
+            request: A JSON-RPC request or notification object, or a batch (list) of them
+            in_flight: The connection's running request tasks by id, used for
+                notifications/cancelled and to register batch elements
+            notify: Sends a server notification (e.g. progress) to the client, if the
+                transport can deliver one before the response
+            slots: Concurrency limit each batch element takes a slot of (None = unlimited)
+
+        Returns:
+            The response object, a list of responses for a batch, or None when
+            nothing must be sent back (notifications, all-notification batches).
+        """
+        if isinstance(request, list):
+            return await self._handle_batch(request, in_flight, notify, slots)
+
+        request_id = request.get("id") if isinstance(request, dict) else None
+        if (not isinstance(request, dict) or not isinstance(request.get("method"), str)
+                or not json_codec.is_valid_id(request_id)):
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id if json_codec.is_valid_id(request_id) else None,
+                "error": {
+                    "code": -32600,
+                    "message": "Invalid Request"
+                }
+            }
+
+        if request.get("method") == "notifications/cancelled":
+            self._cancel_in_flight(request.get("params") or {}, in_flight)
+            return None
+
+        response = await self._handle_single_request(request, notify)
+
+        # Notifications (no id member) never get a response
+        if "id" not in request:
+            return None
+        return response
+
+    def _cancel_in_flight(self, params: Dict[str, Any], in_flight: Optional[Dict[Any, asyncio.Task]]) -> bool:
+        """Cancel the in-flight request named by a notifications/cancelled message."""
+        request_id = params.get("requestId")
+        reason = params.get("reason")
+        task = in_flight.get(request_id) if in_flight is not None else None
+        if task is None or task.done():
+            # Already finished, or unknown: the spec says to ignore it
+            logger.info(f"ℹ️ Cancellation for request {request_id!r} ignored (not in flight)")
+            return False
+        logger.info(f"🚫 Cancelling request {request_id!r}{f' ({reason})' if reason else ''}")
+        task.cancel()
+        return True
+
+    async def _handle_batch(self, batch: List[Any], in_flight: Optional[Dict[Any, asyncio.Task]] = None,
+                            notify: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                            slots: Optional[asyncio.Semaphore] = None) -> Optional[Any]:
+        """
+        Handle a JSON-RPC batch: every element is dispatched concurrently and
+        the responses are returned together as one array.
+
+        Each element takes its own slot of the concurrency limit, exactly as
+        if it had been sent alone.
+        """
+        if not batch:
+            return {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": -32600,
+                    "message": "Invalid Request: empty batch"
+                }
+            }
+
+        logger.info(f"📦 Handling batch of {len(batch)} message(s)")
+
+        async def handle_element(element: Any) -> Optional[Dict[str, Any]]:
+            if isinstance(element, list):
+                # Nested batches are not allowed
+                return {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {
+                        "code": -32600,
+                        "message": "Invalid Request"
+                    }
+                }
+            try:
+                return await self._handle_limited(element, in_flight, notify, slots)
+            except asyncio.CancelledError:
+                # This element was cancelled on its own; the rest of the batch still answers
+                return None
+            except Exception as e:
+                logger.error(f"❌ Error handling batch element: {e}")
+                if not isinstance(element, dict) or "id" not in element:
+                    return None
+                return {
+                    "jsonrpc": "2.0",
+                    "id": element.get("id"),
+                    "error": {
+                        "code": -32603,
+                        "message": f"Internal error: {str(e)}"
+                    }
+                }
+
+        tasks = []
+        for element in batch:
+            task = asyncio.create_task(handle_element(element))
+            element_id = element.get("id") if isinstance(element, dict) else None
+            if (in_flight is not None and element_id is not None and json_codec.is_valid_id(element_id)
+                    and element_id not in in_flight):
+                # Register each element so it can be cancelled individually
+                in_flight[element_id] = task
+                task.add_done_callback(lambda _t, key=element_id: in_flight.pop(key, None))
+            tasks.append(task)
+
+        try:
+            responses = await asyncio.gather(*tasks)
+        except asyncio.CancelledError:
+            for task in tasks:
+                task.cancel()
+            raise
+        responses = [response for response in responses if response is not None]
+        return responses or None
+
+    async def _handle_single_request(self, request: Dict[str, Any],
+                                     notify: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
+        """Handle a single MCP request object."""
         method = request.get("method")
         
         if method == "initialize":
+            # Connect to Telegram while the client finishes its handshake
+            self.start_telegram_warmup()
             return {
                 "jsonrpc": "2.0",
                 "id": request.get("id"),
@@ -521,13 +1316,28 @@ class MCPServer:
                 }
             }
         
+        elif method == "ping":
+            return {
+                "jsonrpc": "2.0",
+                "id": request.get("id"),
+                "result": {}
+            }
+
         elif method == "tools/call":
             params = request.get("params", {})
             tool_name = params.get("name")
             arguments = params.get("arguments", {})
 
             if tool_name == "your_turn":
-                return await self._handle_your_turn_tool(request, arguments)
+                return await self._handle_your_turn_tool(request, arguments, notify)
+            elif tool_name == "your_turn_batch":
+                return await self._handle_your_turn_batch(request, arguments, notify)
+            elif tool_name == "your_turn_start":
+                return await self._handle_your_turn_start(request, arguments)
+            elif tool_name == "your_turn_poll":
+                return await self._handle_your_turn_poll(request, arguments)
+            elif tool_name == "your_turn_await":
+                return await self._handle_your_turn_await(request, arguments, notify)
 
             else:
                 return {
@@ -549,77 +1359,204 @@ class MCPServer:
                 }
             }
 
-    async def run(self):
-        """Main server loop - reads from stdin and writes to stdout."""
-        while True:
-            try:
-                # Read line from stdin
-                line = await asyncio.get_event_loop().run_in_executor(None, sys.stdin.readline)
-                if not line:
-                    break
-                
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Parse JSON request
-                try:
-                    # Log raw line for debugging (stderr via logger)
-                    logger.info(f"🧾 Raw stdin line: {line!r}")
-                    request = json.loads(line)
-                    logger.info(f"📥 Received request: {request.get('method')} (ID: {request.get('id')})")
-                except json.JSONDecodeError as e:
-                    logger.warning(f"⚠️ Received invalid JSON, ignoring. Error: {e}. Raw: {line!r}")
-                    continue
-                
-                # Handle request
-                response = await self.handle_request(request)
-
-                # Log before sending response
-                logger.info(f"🔄 Sending response for request ID {request.get('id')}: {response.get('result', {}).get('content', [{}])[0].get('text', '')[:100]}...")
-
-                # Send response
-                response_json = json.dumps(response)
-                print(response_json, flush=True)
-
-                # Force flush all output streams immediately
-                sys.stdout.flush()
-                sys.stderr.flush()
-
-                # Log after sending
-                logger.info(f"✅ Response sent successfully (length: {len(response_json)} chars)")
-                logger.info(f"🔍 Response ID: {response.get('id')}, Method: {request.get('method')}")
-
-                # Additional delay to ensure response is fully transmitted
-                await asyncio.sleep(0.2)
-
-                # Log that we're ready for the next request
-                logger.info(f"🔄 Ready for next request...")
-
-                # Ensure we stay alive and don't exit prematurely
-                await asyncio.sleep(0.5)
-
-            except KeyboardInterrupt:
-                logger.info("🛑 Received interrupt signal - shutting down gracefully")
-                break
-            except Exception as e:
-                # Send error response if we have a request ID
-                request_id = request.get('id') if 'request' in locals() else None
-                error_response = {
+    def _send_response(self, response: Any) -> int:
+        """Queue one JSON-RPC response on the stdout writer; returns the frame size."""
+        return self._writer.send(response)
+
+    def new_request_slots(self) -> asyncio.Semaphore:
+        """A fresh concurrency limit for one connection or session."""
+        return asyncio.Semaphore(self.max_concurrent_requests)
+
+    async def dispatch(self, request: Any, in_flight: Optional[Dict[Any, asyncio.Task]] = None,
+                       notify: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                       slots: Optional[asyncio.Semaphore] = None) -> Optional[Any]:
+        """
+        Handle one inbound message under the concurrency limit.
+
+        This is the entry point used by every transport. Unexpected errors are
+        turned into a JSON-RPC internal error response (or dropped for
+        notifications) instead of being raised.
+
+        Args:
+            request: The decoded JSON-RPC message or batch
+            in_flight: The connection's running request tasks by id
+            notify: Sends a server notification to the client (None if unsupported)
+            slots: The connection's concurrency limit (None = the stdio connection's)
+        """
+        if slots is None:
+            if self._request_slots is None:
+                self._request_slots = self.new_request_slots()
+            slots = self._request_slots
+
+        is_single = isinstance(request, dict)
+        request_id = request.get("id") if is_single else None
+        try:
+            if not is_single:
+                # Batches take one slot per element (see _handle_batch)
+                return await self.handle_request(request, in_flight, notify, slots)
+            return await self._handle_limited(request, in_flight, notify, slots)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error handling request {request_id}: {e}")
+            import traceback
+            logger.debug(f"Full traceback: {traceback.format_exc()}")
+            if is_single and "id" in request:
+                return {
                     "jsonrpc": "2.0",
-                    "id": request_id,
+                    "id": request_id if json_codec.is_valid_id(request_id) else None,
                     "error": {
                         "code": -32603,
                         "message": f"Internal error: {str(e)}"
                     }
                 }
-                print(json.dumps(error_response), flush=True)
-                logger.error(f"❌ Error handling request: {e}")
-                import traceback
-                logger.debug(f"Full traceback: {traceback.format_exc()}")
+            return None
+
+    async def _handle_limited(self, request: Any, in_flight: Optional[Dict[Any, asyncio.Task]],
+                              notify: Optional[Callable[[Dict[str, Any]], Any]],
+                              slots: Optional[asyncio.Semaphore]) -> Optional[Any]:
+        """Handle one message, holding a slot of the limit unless it never blocks."""
+        if slots is None or not isinstance(request, dict) or self._is_non_blocking(request):
+            # Notifications (e.g. cancellations) and quick methods never queue behind long requests
+            return await self.handle_request(request, in_flight, notify)
+        async with slots:
+            return await self.handle_request(request, in_flight, notify)
+
+    @staticmethod
+    def _is_non_blocking(request: Dict[str, Any]) -> bool:
+        """Whether a request is answered without waiting, so it may bypass the concurrency limit."""
+        method = str(request.get("method", ""))
+        if method == "tools/call":
+            params = request.get("params")
+            return isinstance(params, dict) and params.get("name") in NON_BLOCKING_TOOLS
+        return method.startswith("notifications/") or method in NON_BLOCKING_METHODS
+
+    async def _dispatch_request(self, request: Any) -> None:
+        """
+        Handle a single stdin message in its own task and write its response.
+
+        Responses are written as soon as each request completes, so they may
+        leave the server in a different order than the requests arrived.
+        """
+        is_single = isinstance(request, dict)
+        request_id = request.get("id") if is_single else None
+        response = await self.dispatch(request, self._in_flight, self._send_response)
+
+        if response is None:
+            logger.info(f"🔕 No response to send for {request.get('method') if is_single else 'batch'} (notification)")
+            return
+
+        if isinstance(response, list):
+            logger.info(f"🔄 Sending batch response with {len(response)} element(s)")
+        else:
+            # Log before sending response
+            logger.info(f"🔄 Sending response for request ID {request_id}: {response.get('result', {}).get('content', [{}])[0].get('text', '')[:100]}...")
 
-                # Continue running after error
-                logger.info("🔄 Continuing to listen for requests...")
+        frame_size = self._send_response(response)
+
+        logger.info(f"✅ Response queued (length: {frame_size} bytes)")
+        if not isinstance(response, list):
+            logger.info(f"🔍 Response ID: {response.get('id')}, Method: {request.get('method') if is_single else None}")
+
+    def _start_request(self, request: Any) -> None:
+        """Spawn a task for the request and track it by JSON-RPC id while it runs."""
+        request_id = request.get("id") if isinstance(request, dict) else None
+
+        if not json_codec.is_valid_id(request_id):
+            logger.warning(f"⚠️ Invalid request ID {request_id!r}, rejecting")
+            self._send_response({
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": -32600,
+                    "message": "Invalid Request: id must be a string, number or null"
+                }
+            })
+            return
+
+        if request_id is not None and request_id in self._in_flight:
+            logger.warning(f"⚠️ Duplicate in-flight request ID {request_id!r}, rejecting")
+            self._send_response({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": -32600,
+                    "message": f"Request ID already in flight: {request_id!r}"
+                }
+            })
+            return
+
+        task = asyncio.create_task(self._dispatch_request(request))
+        if request_id is None:
+            # Notifications and batches have no single id; keep a reference until they finish
+            request_id = task
+        self._in_flight[request_id] = task
+        task.add_done_callback(lambda _t, key=request_id: self._in_flight.pop(key, None))
+        logger.info(f"📊 In-flight requests: {len(self._in_flight)} (limit {self.max_concurrent_requests})")
+
+    async def run(self):
+        """Main server loop - reads from stdin and dispatches each request concurrently."""
+        self._writer = StdioWriter()
+        self._writer.start()
+        self._reader = StdioReader(max_frame_bytes=self.max_frame_bytes)
+        await self._reader.start()
+
+        try:
+            while True:
+                try:
+                    frame = await self._reader.read_frame()
+                    if frame is None:
+                        break
+
+                    line = frame.strip()
+                    if not line:
+                        continue
+
+                    # Parse JSON request
+                    try:
+                        # Log raw line for debugging (stderr via logger)
+                        logger.info(f"🧾 Raw stdin line: {line[:2000]!r}")
+                        request = json_codec.loads(line)
+                        if isinstance(request, dict):
+                            logger.info(f"📥 Received request: {request.get('method')} (ID: {request.get('id')})")
+                        else:
+                            logger.info(f"📥 Received batch of {len(request) if isinstance(request, list) else 0} message(s)")
+                    except json_codec.JSONDecodeError as e:
+                        logger.warning(f"⚠️ Received invalid JSON, ignoring. Error: {e}. Raw: {line[:2000]!r}")
+                        continue
+
+                    self._start_request(request)
+
+                except KeyboardInterrupt:
+                    logger.info("🛑 Received interrupt signal - shutting down gracefully")
+                    break
+                except Exception as e:
+                    logger.error(f"❌ Error reading request: {e}")
+                    import traceback
+                    logger.debug(f"Full traceback: {traceback.format_exc()}")
+
+                    # Continue running after error
+                    logger.info("🔄 Continuing to listen for requests...")
+        finally:
+            self._reader.close()
+
+        # stdin closed: give running requests a short grace period to deliver
+        # their responses, then cancel the rest (withdrawing their questions)
+        if self._in_flight:
+            logger.info(f"⏳ Input closed, waiting up to {SHUTDOWN_GRACE_SECONDS:.0f}s "
+                        f"for {len(self._in_flight)} in-flight request(s)...")
+            _, pending = await asyncio.wait(list(self._in_flight.values()), timeout=SHUTDOWN_GRACE_SECONDS)
+            if pending:
+                logger.info(f"🚫 Cancelling {len(pending)} request(s) still waiting")
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                if self._background_tasks:
+                    # Let the Telegram edits of withdrawn questions go out
+                    await asyncio.wait(list(self._background_tasks), timeout=SHUTDOWN_GRACE_SECONDS)
+
+        # Deliver every queued response before returning
+        await self._writer.close()
 
 def parse_args():
     """Parse command-line arguments."""
@@ -637,6 +1574,12 @@ Examples:
   # Docker usage
   docker run your-turn-server --telegram-token "123:ABC" --telegram-chat-id "456789"
 
+  # One shared server for many agents (MCP streamable HTTP on 127.0.0.1:8765/mcp)
+  python3 mcp_your_turn_server.py --transport http --port 8765
+
+  # Many stdio agents sharing one Telegram poller (daemon started on demand)
+  python3 mcp_your_turn_server.py --transport shim
+
 Tools available:
   - your_turn_notify: Simple notification (sound + optional Telegram)
   - your_turn_interactive: Ask user a question and wait for response via Telegram
@@ -656,6 +1599,73 @@ Tools available:
         help='Telegram chat ID for notifications'
     )
 
+    parser.add_argument(
+        '--transport',
+        choices=['stdio', 'http', 'daemon', 'shim'],
+        default=os.getenv('MCP_TRANSPORT', 'stdio'),
+        help='Transport: stdio (default), http (MCP streamable HTTP), daemon (shared Unix socket server) '
+             'or shim (stdio forwarder to the daemon, started on demand). Env MCP_TRANSPORT'
+    )
+
+    parser.add_argument(
+        '--socket',
+        type=str,
+        default=os.getenv('MCP_DAEMON_SOCKET'),
+        help='Unix socket for --transport daemon/shim (default: per-bot path in a private per-user directory under $XDG_RUNTIME_DIR or /tmp, env MCP_DAEMON_SOCKET)'
+    )
+
+    parser.add_argument(
+        '--daemon-idle-timeout',
+        type=float,
+        default=0,
+        help=f'Daemon exits after this many seconds without shims (default 0 = never; on-demand daemons use {ON_DEMAND_IDLE_TIMEOUT})'
+    )
+
+    parser.add_argument(
+        '--host',
+        type=str,
+        default=os.getenv('MCP_HTTP_HOST', DEFAULT_HTTP_HOST),
+        help=f'Interface for --transport http (default {DEFAULT_HTTP_HOST}, env MCP_HTTP_HOST)'
+    )
+
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=int(os.getenv('MCP_HTTP_PORT', DEFAULT_HTTP_PORT)),
+        help=f'Port for --transport http (default {DEFAULT_HTTP_PORT}, env MCP_HTTP_PORT)'
+    )
+
+    parser.add_argument(
+        '--max-concurrent-requests',
+        type=int,
+        help=f'Maximum number of requests handled concurrently (default {DEFAULT_MAX_CONCURRENT_REQUESTS}, env MCP_MAX_CONCURRENT_REQUESTS)'
+    )
+
+    parser.add_argument(
+        '--max-frame-bytes',
+        type=int,
+        help=f'Maximum size of one inbound JSON-RPC line in bytes (default {DEFAULT_MAX_FRAME_BYTES}, env MCP_MAX_FRAME_BYTES)'
+    )
+
+    parser.add_argument(
+        '--progress-interval',
+        type=float,
+        help=f'Seconds between progress notifications while waiting for a reply, 0 disables (default {DEFAULT_PROGRESS_INTERVAL:g}, env MCP_PROGRESS_INTERVAL)'
+    )
+
+    parser.add_argument(
+        '--coalesce-window',
+        type=float,
+        help=f'Seconds after a question during which further ones share one Telegram message, 0 disables (default {DEFAULT_COALESCE_WINDOW:g}, env MCP_COALESCE_WINDOW)'
+    )
+
+    parser.add_argument(
+        '--session-store',
+        type=str,
+        help='SQLite file that keeps pending questions and the Telegram update offset across restarts '
+             '(default: in memory only, env SESSION_STORE_PATH)'
+    )
+
     parser.add_argument(
         '--version',
         action='version',
@@ -664,19 +1674,63 @@ Tools available:
 
     return parser.parse_args()
 
+def _shim_daemon_command(args, socket_path: str) -> List[str]:
+    """Command line a shim uses to start the shared daemon."""
+    command = [sys.executable, os.path.abspath(__file__), '--transport', 'daemon', '--socket', socket_path,
+               '--daemon-idle-timeout', str(args.daemon_idle_timeout or ON_DEMAND_IDLE_TIMEOUT)]
+    if args.max_concurrent_requests:
+        command += ['--max-concurrent-requests', str(args.max_concurrent_requests)]
+    if args.max_frame_bytes:
+        command += ['--max-frame-bytes', str(args.max_frame_bytes)]
+    if args.progress_interval is not None:
+        command += ['--progress-interval', str(args.progress_interval)]
+    if args.session_store:
+        command += ['--session-store', args.session_store]
+    if args.coalesce_window is not None:
+        command += ['--coalesce-window', str(args.coalesce_window)]
+    return command
+
+
 def main():
     """Entry point."""
     args = parse_args()
 
+    # Same precedence as MCPServer, so config-file setups with different bots get different daemons
+    bot_token, _ = resolve_telegram_credentials(args.telegram_token)
+    socket_path = args.socket or default_socket_path(bot_token)
+
+    if args.transport == 'shim':
+        # Credentials reach an on-demand daemon through the environment, not argv
+        if args.telegram_token and not os.getenv('TELEGRAM_BOT_TOKEN'):
+            os.environ['TELEGRAM_BOT_TOKEN'] = args.telegram_token
+        if args.telegram_chat_id and not os.getenv('TELEGRAM_CHAT_ID'):
+            os.environ['TELEGRAM_CHAT_ID'] = args.telegram_chat_id
+        try:
+            sys.exit(asyncio.run(run_shim(socket_path, _shim_daemon_command(args, socket_path))))
+        except KeyboardInterrupt:
+            return
+
     server = MCPServer(
         telegram_bot_token=args.telegram_token,
-        telegram_chat_id=args.telegram_chat_id
+        telegram_chat_id=args.telegram_chat_id,
+        max_concurrent_requests=args.max_concurrent_requests,
+        max_frame_bytes=args.max_frame_bytes,
+        progress_interval=args.progress_interval,
+        session_store=args.session_store,
+        coalesce_window=args.coalesce_window
     )
 
     try:
-        asyncio.run(server.run())
+        if args.transport == 'http':
+            asyncio.run(HttpTransport(server, host=args.host, port=args.port).serve())
+        elif args.transport == 'daemon':
+            asyncio.run(UnixSocketDaemon(server, socket_path, idle_timeout=args.daemon_idle_timeout).serve())
+        else:
+            asyncio.run(server.run())
     except KeyboardInterrupt:
         pass
+    finally:
+        server.close_session_store()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,336 @@
+"""
+In-process PCM playback for notification sounds.
+
+Playing a sound through paplay/aplay costs a fork/exec and a read of the
+sound file on every notification. This module decodes a WAV file once into
+a PcmBuffer, which the caller caches, and writes it straight to PulseAudio
+(libpulse-simple) or ALSA (libasound) through ctypes.
+
+Neither library is a hard dependency. When neither can be loaded,
+available_outputs() is empty and SoundManager keeps using the subprocess
+players. Set MCP_SOUND_OUTPUT=pulse|alsa to force one output, or
+MCP_SOUND_OUTPUT=subprocess to disable in-process playback.
+"""
+
+import abc
+import ctypes
+import ctypes.util
+import errno
+import io
+import logging
+import sys
+import time
+import wave
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Value of MCP_SOUND_OUTPUT that turns in-process playback off
+SUBPROCESS_OUTPUT = "subprocess"
+
+# ALSA buffer latency requested from snd_pcm_set_params, in microseconds
+ALSA_LATENCY_US = 100000
+
+# Seconds an output may take beyond the clip's own length before play() gives up
+PLAYBACK_TIMEOUT_MARGIN = 5.0
+
+# Frames written per call, so the deadline is checked while a clip is playing
+WRITE_CHUNK_SECONDS = 0.1
+
+
+class PcmError(Exception):
+    """Raised when an output cannot play a buffer."""
+
+
+class PcmBuffer:
+    """Decoded, interleaved little-endian PCM frames ready to be written to an output."""
+
+    __slots__ = ("rate", "channels", "sample_width", "frames")
+
+    def __init__(self, rate: int, channels: int, sample_width: int, frames: bytes):
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self.frames = frames
+
+    @property
+    def frame_count(self) -> int:
+        return len(self.frames) // (self.channels * self.sample_width)
+
+    @property
+    def duration(self) -> float:
+        """Playback length in seconds."""
+        return self.frame_count / self.rate if self.rate else 0.0
+
+    def __repr__(self) -> str:
+        return (f"PcmBuffer({self.rate} Hz, {self.channels} ch, {self.sample_width * 8}-bit, "
+                f"{self.duration:.2f} s)")
+
+
+def decode_wav(data: bytes) -> PcmBuffer:
+    """
+    Decode an uncompressed PCM WAV file.
+
+    Args:
+        data: Contents of the WAV file
+
+    Returns:
+        PcmBuffer: The decoded frames
+
+    Raises:
+        ValueError: If the data is not an uncompressed PCM WAV file
+    """
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            return PcmBuffer(wav.getframerate(), wav.getnchannels(), wav.getsampwidth(),
+                             wav.readframes(wav.getnframes()))
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"not a PCM WAV file: {e or 'truncated'}") from e
+
+
+def load_wav(path: str) -> PcmBuffer:
+    """Read and decode a WAV file (see decode_wav)."""
+    with open(path, "rb") as f:
+        return decode_wav(f.read())
+
+
+def _load_library(soname: str, name: str) -> Optional[ctypes.CDLL]:
+    """Load a shared library by soname, falling back to a ctypes.util lookup."""
+    for candidate in (soname, ctypes.util.find_library(name)):
+        if not candidate:
+            continue
+        try:
+            return ctypes.CDLL(candidate)
+        except OSError:
+            continue
+    return None
+
+
+class PcmOutput(abc.ABC):
+    """An audio output that plays a PcmBuffer synchronously."""
+
+    name = "pcm"
+
+    @abc.abstractmethod
+    def supports(self, buffer: PcmBuffer) -> bool:
+        """Whether this output can play the buffer's sample format."""
+
+    @abc.abstractmethod
+    def play(self, buffer: PcmBuffer) -> None:
+        """
+        Play the buffer and return once it has been drained.
+
+        Gives up once the clip's length plus PLAYBACK_TIMEOUT_MARGIN has passed.
+
+        Raises:
+            PcmError: If the output cannot be opened or written, or times out
+        """
+
+    @staticmethod
+    def _deadline(buffer: PcmBuffer) -> float:
+        """time.monotonic() value by which playing the buffer must be done."""
+        return time.monotonic() + buffer.duration + PLAYBACK_TIMEOUT_MARGIN
+
+    @staticmethod
+    def _chunk_frames(buffer: PcmBuffer) -> int:
+        return max(1, int(buffer.rate * WRITE_CHUNK_SECONDS))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class _PaSampleSpec(ctypes.Structure):
+    _fields_ = [("format", ctypes.c_int), ("rate", ctypes.c_uint32), ("channels", ctypes.c_uint8)]
+
+
+class PulseOutput(PcmOutput):
+    """PulseAudio (or PipeWire's Pulse server) through the libpulse-simple API."""
+
+    name = "pulse"
+
+    # WAV sample width -> pa_sample_format_t
+    _FORMATS = {1: 0, 2: 3, 3: 9, 4: 7}  # U8, S16LE, S24LE, S32LE
+    _STREAM_PLAYBACK = 1
+
+    def __init__(self, lib: ctypes.CDLL, server: Optional[str] = None):
+        self._lib = lib
+        self._server = server.encode() if server else None
+        err = ctypes.POINTER(ctypes.c_int)
+        lib.pa_simple_new.restype = ctypes.c_void_p
+        lib.pa_simple_new.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p,
+                                      ctypes.c_char_p, ctypes.POINTER(_PaSampleSpec), ctypes.c_void_p,
+                                      ctypes.c_void_p, err]
+        lib.pa_simple_write.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_size_t, err]
+        lib.pa_simple_drain.argtypes = [ctypes.c_void_p, err]
+        lib.pa_simple_free.argtypes = [ctypes.c_void_p]
+        lib.pa_simple_free.restype = None
+        lib.pa_strerror.argtypes = [ctypes.c_int]
+        lib.pa_strerror.restype = ctypes.c_char_p
+
+    def supports(self, buffer: PcmBuffer) -> bool:
+        return buffer.sample_width in self._FORMATS
+
+    def _error(self, action: str, code: ctypes.c_int) -> PcmError:
+        return PcmError(f"{action}: {self._lib.pa_strerror(code.value).decode(errors='replace')}")
+
+    def play(self, buffer: PcmBuffer) -> None:
+        if not self.supports(buffer):
+            raise PcmError(f"unsupported sample width {buffer.sample_width}")
+        spec = _PaSampleSpec(self._FORMATS[buffer.sample_width], buffer.rate, buffer.channels)
+        error = ctypes.c_int(0)
+        stream = self._lib.pa_simple_new(self._server, b"your-turn", self._STREAM_PLAYBACK, None,
+                                         b"notification", ctypes.byref(spec), None, None, ctypes.byref(error))
+        if not stream:
+            raise self._error("pa_simple_new", error)
+        try:
+            # pa_simple has no timeout: write in chunks and stop at the deadline
+            deadline = self._deadline(buffer)
+            chunk = self._chunk_frames(buffer) * buffer.channels * buffer.sample_width
+            for offset in range(0, len(buffer.frames), chunk):
+                if time.monotonic() > deadline:
+                    raise PcmError("pa_simple_write: timed out")
+                data = buffer.frames[offset:offset + chunk]
+                if self._lib.pa_simple_write(stream, data, len(data), ctypes.byref(error)) < 0:
+                    raise self._error("pa_simple_write", error)
+            if self._lib.pa_simple_drain(stream, ctypes.byref(error)) < 0:
+                raise self._error("pa_simple_drain", error)
+        finally:
+            self._lib.pa_simple_free(stream)
+
+
+class AlsaOutput(PcmOutput):
+    """An ALSA PCM device through libasound."""
+
+    name = "alsa"
+
+    # WAV sample width -> snd_pcm_format_t
+    _FORMATS = {1: 1, 2: 2, 3: 32, 4: 10}  # U8, S16_LE, S24_3LE, S32_LE
+    _STREAM_PLAYBACK = 0
+    _ACCESS_RW_INTERLEAVED = 3
+    _NONBLOCK = 1  # SND_PCM_NONBLOCK
+    _STATE_DRAINING = 5  # SND_PCM_STATE_DRAINING
+
+    def __init__(self, lib: ctypes.CDLL, device: str = "default"):
+        self._lib = lib
+        self.device = device
+        lib.snd_pcm_open.argtypes = [ctypes.POINTER(ctypes.c_void_p), ctypes.c_char_p, ctypes.c_int, ctypes.c_int]
+        lib.snd_pcm_set_params.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_uint,
+                                           ctypes.c_uint, ctypes.c_int, ctypes.c_uint]
+        lib.snd_pcm_writei.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_ulong]
+        lib.snd_pcm_writei.restype = ctypes.c_long
+        lib.snd_pcm_recover.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+        lib.snd_pcm_wait.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.snd_pcm_drain.argtypes = [ctypes.c_void_p]
+        lib.snd_pcm_drop.argtypes = [ctypes.c_void_p]
+        lib.snd_pcm_state.argtypes = [ctypes.c_void_p]
+        lib.snd_pcm_close.argtypes = [ctypes.c_void_p]
+        lib.snd_strerror.argtypes = [ctypes.c_int]
+        lib.snd_strerror.restype = ctypes.c_char_p
+
+    def supports(self, buffer: PcmBuffer) -> bool:
+        return buffer.sample_width in self._FORMATS
+
+    def _check(self, action: str, rc: int) -> None:
+        if rc < 0:
+            raise PcmError(f"{action}: {self._lib.snd_strerror(rc).decode(errors='replace')}")
+
+    def play(self, buffer: PcmBuffer) -> None:
+        if not self.supports(buffer):
+            raise PcmError(f"unsupported sample width {buffer.sample_width}")
+        pcm = ctypes.c_void_p()
+        # Non-blocking: a device held by another client fails at once (EBUSY)
+        # instead of blocking the sound lock, and every wait below is bounded
+        self._check("snd_pcm_open", self._lib.snd_pcm_open(ctypes.byref(pcm), self.device.encode(),
+                                                           self._STREAM_PLAYBACK, self._NONBLOCK))
+        try:
+            deadline = self._deadline(buffer)
+            self._check("snd_pcm_set_params", self._lib.snd_pcm_set_params(
+                pcm, self._FORMATS[buffer.sample_width], self._ACCESS_RW_INTERLEAVED,
+                buffer.channels, buffer.rate, 1, ALSA_LATENCY_US))
+            data = ctypes.create_string_buffer(buffer.frames, len(buffer.frames))
+            frame_bytes = buffer.channels * buffer.sample_width
+            offset, remaining = 0, buffer.frame_count
+            while remaining > 0:
+                written = self._lib.snd_pcm_writei(pcm, ctypes.byref(data, offset * frame_bytes), remaining)
+                if written == -errno.EAGAIN:
+                    # Buffer full: wait for room, up to the deadline
+                    self._wait_until(pcm, deadline, "snd_pcm_writei")
+                    continue
+                if written < 0:
+                    # Underrun or suspend: recover and retry the same frames
+                    self._check("snd_pcm_writei", self._lib.snd_pcm_recover(pcm, written, 1))
+                    continue
+                offset += written
+                remaining -= written
+            rc = self._lib.snd_pcm_drain(pcm)
+            if rc != -errno.EAGAIN:
+                self._check("snd_pcm_drain", rc)
+            # In non-blocking mode the drain continues in the background
+            while self._lib.snd_pcm_state(pcm) == self._STATE_DRAINING:
+                self._wait_until(pcm, deadline, "snd_pcm_drain")
+        finally:
+            self._lib.snd_pcm_close(pcm)
+
+    def _wait_until(self, pcm: ctypes.c_void_p, deadline: float, action: str) -> None:
+        """Wait briefly for the device to make progress; drop the stream once the deadline has passed."""
+        left = deadline - time.monotonic()
+        if left <= 0:
+            self._lib.snd_pcm_drop(pcm)
+            raise PcmError(f"{action}: timed out")
+        if self._lib.snd_pcm_state(pcm) == self._STATE_DRAINING:
+            # snd_pcm_wait does not report the end of a drain: poll the state
+            time.sleep(min(left, 0.01))
+        else:
+            self._lib.snd_pcm_wait(pcm, int(min(left, WRITE_CHUNK_SECONDS) * 1000))
+
+
+def _make_pulse() -> Optional[PcmOutput]:
+    lib = _load_library("libpulse-simple.so.0", "pulse-simple")
+    return PulseOutput(lib) if lib else None
+
+
+def _make_alsa() -> Optional[PcmOutput]:
+    lib = _load_library("libasound.so.2", "asound")
+    return AlsaOutput(lib) if lib else None
+
+
+_FACTORIES: Dict[str, Callable[[], Optional[PcmOutput]]] = {
+    "pulse": _make_pulse,
+    "alsa": _make_alsa,
+}
+
+
+def available_outputs() -> List[PcmOutput]:
+    """Return every output whose library loads, in order of preference (Pulse first)."""
+    outputs = []
+    for name, factory in _FACTORIES.items():
+        try:
+            output = factory()
+        except Exception as e:
+            logger.debug(f"❌ {name} output unavailable: {e}")
+            continue
+        if output is not None:
+            outputs.append(output)
+    return outputs
+
+
+def select_outputs(preferred: Optional[str] = None) -> List[PcmOutput]:
+    """
+    Select the in-process outputs to try.
+
+    Args:
+        preferred: pulse or alsa to use only that output, subprocess to use none
+
+    Returns:
+        List[PcmOutput]: The preferred output if loadable, else every available one
+    """
+    if preferred:
+        preferred = preferred.strip().lower()
+        if preferred == SUBPROCESS_OUTPUT:
+            return []
+        factory = _FACTORIES.get(preferred)
+        output = factory() if factory else None
+        if output is not None:
+            return [output]
+        print(f"[SOUND] Output {preferred!r} not available, falling back to auto-selection", file=sys.stderr)
+    return available_outputs()
@@ -0,0 +1,252 @@
+"""
+Durable session store for the MCP Your Turn server.
+
+Without a store every pending question lives only in memory, and Telegram
+polling starts with drop_pending_updates, so a restart loses the questions
+and any reply sent while the server was down. With a store (env
+SESSION_STORE_PATH or --session-store) session lifecycle events and the
+last processed Telegram update id are written to SQLite; on restart the
+sessions are re-hydrated and polling resumes from Telegram's backlog.
+
+Writes are batched: events are queued per session (later events for the
+same session replace earlier ones) and flushed in one transaction shortly
+after, so a burst of questions costs one commit. The database runs in WAL
+mode with synchronous=NORMAL, where a commit appends to the log without an
+fsync, which keeps flushes short enough to run on the event loop.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# sqlite3 is part of the standard library but optional in some Python builds
+try:
+    import sqlite3
+    SQLITE_AVAILABLE = True
+except ImportError:
+    sqlite3 = None
+    SQLITE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Seconds between a lifecycle event and the flush that persists it
+DEFAULT_FLUSH_INTERVAL = 0.2
+
+# State key of the last Telegram update id that was handled
+TELEGRAM_OFFSET_KEY = "telegram_update_offset"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    chat_id TEXT,
+    message TEXT,
+    created_at REAL NOT NULL,
+    timeout_seconds INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    response TEXT,
+    error_message TEXT,
+    telegram_message_id INTEGER,
+    finished_at REAL,
+    delivered INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# The question text is released from memory once sent; keep the stored copy
+_UPSERT_SESSION = """
+INSERT INTO sessions (session_id, chat_id, message, created_at, timeout_seconds, status,
+                      response, error_message, telegram_message_id, finished_at, delivered)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(session_id) DO UPDATE SET
+    message = COALESCE(excluded.message, sessions.message),
+    status = excluded.status,
+    response = excluded.response,
+    error_message = excluded.error_message,
+    telegram_message_id = excluded.telegram_message_id,
+    finished_at = excluded.finished_at,
+    delivered = excluded.delivered
+"""
+
+_COLUMNS = ("session_id", "chat_id", "message", "created_at", "timeout_seconds", "status",
+            "response", "error_message", "telegram_message_id", "finished_at", "delivered")
+
+# Position of the question text in a queued row
+_MESSAGE_COLUMN = _COLUMNS.index("message")
+
+
+class SessionStore:
+    """SQLite (WAL) persistence for interactive sessions and the Telegram update offset."""
+
+    def __init__(self, path: str, flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file
+            flush_interval: Seconds queued writes wait before being committed together
+
+        Raises:
+            RuntimeError: If sqlite3 is not available in this Python build
+        """
+        if not SQLITE_AVAILABLE:
+            raise RuntimeError("sqlite3 is not available in this Python build")
+        self.path = path
+        self.flush_interval = flush_interval
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._migrate()
+        # session_id -> row to upsert, or None to delete; key -> value for state
+        self._pending_sessions: Dict[str, Optional[Tuple[Any, ...]]] = {}
+        self._pending_state: Dict[str, str] = {}
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._state_cache: Dict[str, Optional[str]] = {}
+        logger.info(f"💾 Session store opened at {path}")
+
+    def _migrate(self) -> None:
+        """Add columns introduced after a database was created."""
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(sessions)")}
+        if "delivered" not in columns:
+            self._db.execute("ALTER TABLE sessions ADD COLUMN delivered INTEGER NOT NULL DEFAULT 0")
+
+    def load_sessions(self) -> List[Dict[str, Any]]:
+        """Return every stored session as a dict of columns, oldest first."""
+        cursor = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM sessions ORDER BY created_at")
+        return [dict(zip(_COLUMNS, row)) for row in cursor]
+
+    def save_session(self, session: Any, finished_at: Optional[float] = None) -> None:
+        """
+        Queue the current state of a session for the next flush.
+
+        A later snapshot replaces the queued one, except that the question
+        text of the queued one is kept once the session has released it.
+
+        Args:
+            session: The InteractiveSession
+            finished_at: When the session left the active state, if it has
+        """
+        message = session.message
+        if message is None:
+            queued = self._pending_sessions.get(session.session_id)
+            if queued is not None:
+                message = queued[_MESSAGE_COLUMN]
+        self._pending_sessions[session.session_id] = (
+            session.session_id,
+            None if session.chat_id is None else str(session.chat_id),
+            message,
+            session.created_at,
+            session.timeout_seconds,
+            session.status.value,
+            session.response,
+            session.error_message,
+            session.telegram_message_id,
+            finished_at,
+            int(session.delivered),
+        )
+        self._schedule_flush()
+
+    def delete_session(self, session_id: str) -> None:
+        """Queue the removal of a session for the next flush."""
+        self._pending_sessions[session_id] = None
+        self._schedule_flush()
+
+    def get_state(self, key: str) -> Optional[str]:
+        """Read a state value, including one that is queued but not flushed yet."""
+        if key in self._pending_state:
+            return self._pending_state[key]
+        if key not in self._state_cache:
+            row = self._db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+            self._state_cache[key] = row[0] if row else None
+        return self._state_cache[key]
+
+    def set_state(self, key: str, value: Any) -> None:
+        """Queue a state value for the next flush."""
+        self._pending_state[key] = str(value)
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_timer is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop (scripts, shutdown): write through
+            self.flush()
+            return
+        self._flush_timer = loop.call_later(self.flush_interval, self._flush_due)
+
+    def _flush_due(self) -> None:
+        self._flush_timer = None
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"❌ Failed to flush session store: {e}")
+
+    def flush(self) -> int:
+        """
+        Commit all queued writes in one transaction.
+
+        Returns:
+            int: Number of rows written or deleted
+        """
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if not self._pending_sessions and not self._pending_state:
+            return 0
+
+        sessions, self._pending_sessions = self._pending_sessions, {}
+        state, self._pending_state = self._pending_state, {}
+        upserts = [row for row in sessions.values() if row is not None]
+        deletes = [(sid,) for sid, row in sessions.items() if row is None]
+        try:
+            with self._db:
+                self._db.execute("BEGIN")
+                if upserts:
+                    self._db.executemany(_UPSERT_SESSION, upserts)
+                if deletes:
+                    self._db.executemany("DELETE FROM sessions WHERE session_id = ?", deletes)
+                if state:
+                    self._db.executemany(
+                        "INSERT INTO state (key, value) VALUES (?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                        list(state.items()))
+        except Exception:
+            # Keep the batch for the next attempt, unless newer events replaced it
+            for sid, row in sessions.items():
+                self._pending_sessions.setdefault(sid, row)
+            for key, value in state.items():
+                self._pending_state.setdefault(key, value)
+            raise
+        self._state_cache.update(state)
+        return len(upserts) + len(deletes) + len(state)
+
+    def close(self) -> None:
+        """Flush queued writes and close the database."""
+        try:
+            self.flush()
+        finally:
+            self._db.close()
+            logger.info("💾 Session store closed")
+
+
+def open_session_store(path: Optional[str]) -> Optional[SessionStore]:
+    """
+    Open the session store at path, or return None if no path is configured.
+
+    Failures are logged and the server continues with in-memory sessions only.
+    """
+    if not path:
+        return None
+    try:
+        return SessionStore(os.path.expanduser(path))
+    except Exception as e:
+        logger.error(f"❌ Could not open session store {path}: {e}; sessions will not survive restarts")
+        return None
@@ -4,101 +4,407 @@ Sound Manager for MCP Your Turn Server
 This module provides a robust sound notification system with multiple fallback options:
 1. Platform-specific system sounds (primary)
 2. External alert.wav file (secondary)
-3. Embedded minimal beep sound (tertiary)
+3. Synthesized alert tone (tertiary)
 4. ASCII bell character (final fallback)
 
-The embedded sound is a minimal beep to reduce file size while maintaining functionality.
+The tone is generated in memory (a sine beep with short fades, cached once
+built) and handed to players through a memfd or stdin, so it needs no sound
+file and never touches the filesystem.
+
+Players and sound files that are not installed are skipped without spawning
+anything, and the backend that works is probed once and cached: later
+notifications go straight to it. The chain is probed again after the cached
+backend fails. The bell never fails, so when it is the only backend that
+worked it is kept for at most BELL_REPROBE_INTERVAL seconds; real audio that
+was not up yet at the first probe is picked up later.
+
+On Linux, WAV files are also played in-process when libpulse-simple or
+libasound can be loaded (see pcm_playback): each file is decoded once and the
+cached PCM is written straight to the output, ahead of the subprocess
+players, which remain the fallback.
+
+Playback is blocking (subprocess players with timeouts); async callers use
+play_notification_sound_async, which runs it in a worker thread so the
+event loop never waits on audio.
+
+Bursts are collapsed: a request made while a sound is playing waits for that
+playback and shares its result, and a request within min_interval seconds
+of the last playback's start is dropped (env MCP_SOUND_MIN_INTERVAL, default
+3, 0 disables). The counts are reported by stats().
 """
 
+import array
+import asyncio
+import functools
+import math
 import os
+import struct
 import sys
-import tempfile
-import base64
+import shutil
 import subprocess
 import logging
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
 
-# Minimal embedded beep sound - a very short WAV file
-# This is a minimal valid WAV file with a short beep
-EMBEDDED_BEEP_WAV_BASE64 = """
-UklGRiQAAABXQVZFZm10IBAAAAABAAEARKwAAIhYAQACABAAZGF0YQAAAAA=
-"""
+if TYPE_CHECKING:
+    # ctypes and the audio libraries are only loaded when the backends are probed
+    from pcm_playback import PcmBuffer, PcmOutput
+
+# Seconds after a playback starts during which further requests are dropped
+DEFAULT_SOUND_MIN_INTERVAL = 3.0
+
+# Seconds the ASCII bell fallback stays cached before real audio is probed again
+BELL_REPROBE_INTERVAL = 300.0
+
+# Description of the final fallback backend
+ASCII_BELL = "ASCII bell"
+
+# Longest a request waits for a playback started by another request to finish
+SHARED_PLAYBACK_TIMEOUT = 15.0
+
+# Synthesized alert tone (16-bit mono PCM)
+DEFAULT_TONE_FREQUENCY = 880  # Hz
+DEFAULT_TONE_DURATION = 0.25  # seconds
+TONE_SAMPLE_RATE = 22050
+TONE_VOLUME = 0.5
+# Linear fade at both ends so the tone starts and stops without a click
+TONE_FADE_SECONDS = 0.01
 
 logger = logging.getLogger(__name__)
 
+# A playback strategy: (description, play) where play() returns True on success
+Backend = Tuple[str, Callable[[], bool]]
+
+
+@functools.lru_cache(maxsize=8)
+def synthesize_tone_pcm(frequency: float = DEFAULT_TONE_FREQUENCY, duration: float = DEFAULT_TONE_DURATION,
+                        rate: int = TONE_SAMPLE_RATE) -> bytes:
+    """
+    Generate a sine tone as 16-bit little-endian mono PCM samples.
+
+    Args:
+        frequency: Tone frequency in Hz, below half the sample rate
+        duration: Tone length in seconds
+        rate: Sample rate in Hz
+
+    Returns:
+        bytes: The samples (cached per arguments)
+
+    Raises:
+        ValueError: If the frequency or duration is out of range
+    """
+    if not 0 < frequency < rate / 2:
+        raise ValueError(f"tone frequency must be between 0 and {rate / 2} Hz, got {frequency}")
+    if duration <= 0:
+        raise ValueError(f"tone duration must be positive, got {duration}")
+    count = max(1, int(rate * duration))
+    fade = max(1, int(rate * TONE_FADE_SECONDS))
+    amplitude = TONE_VOLUME * 32767
+    step = 2 * math.pi * frequency / rate
+    samples = array.array('h', (
+        int(amplitude * min(1.0, i / fade, (count - 1 - i) / fade) * math.sin(step * i))
+        for i in range(count)))
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes()
+
+
+@functools.lru_cache(maxsize=8)
+def synthesize_tone_wav(frequency: float = DEFAULT_TONE_FREQUENCY, duration: float = DEFAULT_TONE_DURATION,
+                        rate: int = TONE_SAMPLE_RATE) -> bytes:
+    """
+    Generate a sine tone as a complete in-memory WAV file (see synthesize_tone_pcm).
+
+    Returns:
+        bytes: RIFF/WAVE data, 16-bit mono PCM (cached per arguments)
+    """
+    data = synthesize_tone_pcm(frequency, duration, rate)
+    header = struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + len(data), b'WAVE',
+                         b'fmt ', 16, 1, 1, rate, rate * 2, 2, 16, b'data', len(data))
+    return header + data
+
+
+class _Playback:
+    """A playback in progress, shared by the requests that arrive while it runs."""
+
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = False
+
 
 class SoundManager:
     """Manages sound notifications with multiple fallback strategies."""
     
-    def __init__(self, external_sound_file: Optional[str] = None):
+    def __init__(self, external_sound_file: Optional[str] = None,
+                 tone_frequency: float = DEFAULT_TONE_FREQUENCY, tone_duration: float = DEFAULT_TONE_DURATION,
+                 min_interval: float = DEFAULT_SOUND_MIN_INTERVAL):
         """
         Initialize the sound manager.
         
         Args:
             external_sound_file: Path to external sound file (e.g., alert.wav)
+            tone_frequency: Frequency of the synthesized fallback tone in Hz
+            tone_duration: Length of the synthesized fallback tone in seconds
+            min_interval: Seconds after a playback starts during which requests are dropped
         """
         self.external_sound_file = external_sound_file or "alert.wav"
         self.platform = sys.platform.lower()
-        self._temp_sound_file = None
+        self.tone_frequency = tone_frequency
+        self.tone_duration = tone_duration
+        # memfd holding the tone WAV for subprocess players (Linux), created on first use
+        self._tone_fd: Optional[int] = None
+        # Backend that last played successfully, and when it was probed; probed on first use
+        self._backend: Optional[Backend] = None
+        self._backend_probed_at = 0.0
+        # In-process PCM outputs (loaded on first probe) and decoded WAV files by path
+        self._pcm_outputs: Optional[List["PcmOutput"]] = None
+        self._pcm_buffers: Dict[str, Optional["PcmBuffer"]] = {}
+        # Worker threads may play concurrently; one sound at a time
+        self._lock = threading.Lock()
+        # Burst collapsing: the playback in progress, when the last one started, and counters
+        self.min_interval = max(0.0, min_interval)
+        self._state_lock = threading.Lock()
+        self._in_flight: Optional["_Playback"] = None
+        self._last_started: Optional[float] = None
+        self._last_result = False
+        self._counts = {"requested": 0, "played": 0, "shared": 0, "throttled": 0}
         
     def play_notification_sound(self) -> bool:
         """
         Play notification sound using the best available method.
 
+        The first call probes the fallback chain and caches the backend that
+        worked; later calls go straight to it. The chain is probed again only
+        when the cached backend fails.
+
+        A call made while another is playing waits for it (at most
+        SHARED_PLAYBACK_TIMEOUT seconds) and returns its result; a call within min_interval of the last playback's start
+        returns that playback's result without playing.
+
         Returns:
             bool: True if sound was played successfully, False otherwise
         """
-        logger.info(f"🔊 Starting sound notification on platform: {self.platform}")
+        owner = False
+        with self._state_lock:
+            self._counts["requested"] += 1
+            playback = self._in_flight
+            if playback is not None:
+                self._counts["shared"] += 1
+            elif (self._last_started is not None
+                  and time.monotonic() - self._last_started < self.min_interval):
+                self._counts["throttled"] += 1
+                logger.info(f"🔇 Sound throttled: played less than {self.min_interval:g}s ago")
+                return self._last_result
+            else:
+                playback = self._in_flight = _Playback()
+                self._last_started = time.monotonic()
+                self._counts["played"] += 1
+                owner = True
+        if not owner:
+            # Bounded: a stuck output must not hold every later caller's thread
+            if not playback.done.wait(SHARED_PLAYBACK_TIMEOUT):
+                logger.warning(f"⚠️ Shared playback still running after {SHARED_PLAYBACK_TIMEOUT:g}s, giving up")
+                return False
+            return playback.result
+
+        try:
+            with self._lock:
+                playback.result = self._play_notification_sound()
+        finally:
+            with self._state_lock:
+                self._in_flight = None
+                self._last_result = playback.result
+            playback.done.set()
+        return playback.result
+
+    def stats(self) -> Dict[str, object]:
+        """
+        Burst collapsing counters, for monitoring.
 
-        # Strategy 1: Platform-specific system sounds
-        logger.debug("🎵 Trying platform-specific system sounds...")
-        if self._play_system_sound():
-            logger.info("✅ Played system sound successfully")
-            return True
-        logger.debug("❌ System sound failed, trying next strategy...")
+        Returns:
+            Dict[str, object]: requested, played, shared (joined a playback in
+            progress) and throttled (dropped within min_interval) counts, plus
+            min_interval, whether a sound is playing, and the cached backend
+        """
+        with self._state_lock:
+            stats: Dict[str, object] = dict(self._counts)
+            stats["playing"] = self._in_flight is not None
+        stats["min_interval"] = self.min_interval
+        stats["backend"] = self.backend_name
+        return stats
+
+    @property
+    def backend_name(self) -> Optional[str]:
+        """Description of the cached audio backend, or None before the first probe."""
+        return self._backend[0] if self._backend else None
+
+    def reset_backend(self) -> None:
+        """Forget the cached backend so the next notification probes again."""
+        with self._lock:
+            self._backend = None
+
+    def _play_notification_sound(self) -> bool:
+        """Play through the cached backend, probing when there is none (caller holds the lock)."""
+        if (self._backend is not None and self._backend[0] == ASCII_BELL
+                and time.monotonic() - self._backend_probed_at >= BELL_REPROBE_INTERVAL):
+            logger.info("🔊 Bell fallback cached for a while, probing real audio again...")
+            self._backend = None
+        if self._backend is not None:
+            description, play = self._backend
+            if self._play_backend(description, play):
+                return True
+            logger.warning(f"⚠️ Audio backend '{description}' failed, probing again...")
+            self._backend = None
+        return self._probe_and_play()
+
+    def _probe_and_play(self) -> bool:
+        """Try each available backend in fallback order and cache the first that plays."""
+        logger.info(f"🔊 Probing audio backends on platform: {self.platform}")
+        for description, play in self._available_backends():
+            if self._play_backend(description, play):
+                self._backend = (description, play)
+                self._backend_probed_at = time.monotonic()
+                logger.info(f"✅ Audio backend selected: {description}")
+                return True
+            logger.debug(f"❌ {description} failed, trying next backend...")
+        logger.error("❌ All sound strategies failed!")
+        return False
+
+    def _available_backends(self) -> List[Backend]:
+        """The full fallback chain, without players or sound files that are not installed."""
+        return (self._system_sound_backends() + self._external_sound_backends()
+                + self._embedded_sound_backends() + [(ASCII_BELL, self._play_ascii_bell)])
+
+    @staticmethod
+    def _play_backend(description: str, play: Callable[[], bool]) -> bool:
+        try:
+            return play()
+        except Exception as e:
+            logger.debug(f"❌ Unexpected error with {description}: {e}")
+            return False
+
+    @staticmethod
+    def _try_backends(backends: List[Backend]) -> bool:
+        """Play through the first backend in the list that works, without caching it."""
+        return any(SoundManager._play_backend(description, play) for description, play in backends)
+
+    def _file_players(self) -> List[str]:
+        """Installed command line players for sound files, in order of preference."""
+        if self.platform.startswith('darwin'):
+            candidates = ['afplay']
+        elif self.platform.startswith('linux'):
+            candidates = ['paplay', 'aplay']
+        else:
+            candidates = []
+        return [name for name in candidates if shutil.which(name)]
 
-        # Strategy 2: External sound file
-        logger.debug(f"🎵 Trying external sound file: {self.external_sound_file}")
-        if self._play_external_sound():
-            logger.info("✅ Played external sound file successfully")
+    def _player_backend(self, cmd: List[str], description: str, timeout: int = 5) -> Backend:
+        return (description, lambda: self._run_player(cmd, description, timeout))
+
+    @staticmethod
+    def _run_player(cmd: List[str], description: str, timeout: int = 5, **run_kwargs) -> bool:
+        """Run a command line player and report whether it exited successfully."""
+        try:
+            logger.debug(f"🔊 Trying {description}")
+            subprocess.run(cmd, check=True, capture_output=True, timeout=timeout, **run_kwargs)
+            logger.debug(f"✅ Sound played successfully: {description}")
             return True
-        logger.debug("❌ External sound failed, trying next strategy...")
+        except subprocess.CalledProcessError as e:
+            logger.debug(f"❌ Command failed for {description}: {e}")
+        except subprocess.TimeoutExpired:
+            logger.debug(f"⏰ Timeout for {description}")
+        except FileNotFoundError:
+            logger.debug(f"📁 Command not found for {description}")
+        return False
+
+    def _pcm_output_list(self) -> List["PcmOutput"]:
+        """In-process outputs whose library loads (Linux only), selected once."""
+        if self._pcm_outputs is None:
+            self._pcm_outputs = []
+            if self.platform.startswith('linux'):
+                try:
+                    from pcm_playback import select_outputs
+                    self._pcm_outputs = select_outputs(os.getenv('MCP_SOUND_OUTPUT'))
+                except Exception as e:
+                    logger.debug(f"❌ In-process playback unavailable: {e}")
+            if self._pcm_outputs:
+                logger.info(f"🎛️ In-process audio outputs: {', '.join(o.name for o in self._pcm_outputs)}")
+        return self._pcm_outputs
 
-        # Strategy 3: Embedded minimal beep
-        logger.debug("🎵 Trying embedded minimal beep...")
-        if self._play_embedded_sound():
-            logger.info("✅ Played embedded sound successfully")
+    def _pcm_backends(self, sound_file: str) -> List[Backend]:
+        """In-process backends for a WAV file, if it exists and an output is available."""
+        outputs = self._pcm_output_list()
+        if not outputs or not sound_file.lower().endswith('.wav') or not os.path.exists(sound_file):
+            return []
+        return [(f"in-process {output.name} with {sound_file}",
+                 lambda output=output: self._play_pcm(output, self._pcm_buffer(sound_file), sound_file))
+                for output in outputs]
+
+    def _pcm_buffer(self, sound_file: str) -> Optional["PcmBuffer"]:
+        """The decoded PCM of a WAV file, read from disk only once."""
+        if sound_file not in self._pcm_buffers:
+            from pcm_playback import load_wav
+            try:
+                self._pcm_buffers[sound_file] = load_wav(sound_file)
+            except (OSError, ValueError) as e:
+                logger.debug(f"❌ Cannot decode {sound_file}: {e}")
+                self._pcm_buffers[sound_file] = None
+        return self._pcm_buffers[sound_file]
+
+    @staticmethod
+    def _play_pcm(output: "PcmOutput", buffer: Optional["PcmBuffer"], label: str) -> bool:
+        """Write a cached PCM buffer to an in-process output."""
+        from pcm_playback import PcmError
+        if buffer is None or not output.supports(buffer):
+            return False
+        try:
+            logger.debug(f"🔊 Playing {label} in-process through {output.name}")
+            output.play(buffer)
             return True
-        logger.debug("❌ Embedded sound failed, using final fallback...")
+        except PcmError as e:
+            logger.debug(f"❌ In-process {output.name} playback failed: {e}")
+            return False
 
-        # Strategy 4: ASCII bell (final fallback)
-        logger.debug("🎵 Using ASCII bell fallback...")
-        result = self._play_ascii_bell()
-        if result:
-            logger.info("✅ ASCII bell fallback used successfully")
-        else:
-            logger.error("❌ All sound strategies failed!")
-        return result
-    
     def _play_system_sound(self) -> bool:
         """Play platform-specific system notification sound."""
-        try:
-            if self.platform.startswith('win'):
-                logger.debug("🪟 Attempting Windows system sound...")
-                return self._play_windows_system_sound()
-            elif self.platform.startswith('darwin'):
-                logger.debug("🍎 Attempting macOS system sound...")
-                return self._play_macos_system_sound()
-            elif self.platform.startswith('linux'):
-                logger.debug("🐧 Attempting Linux system sound...")
-                return self._play_linux_system_sound()
-            else:
-                logger.debug(f"❓ Unknown platform: {self.platform}")
-        except Exception as e:
-            logger.warning(f"System sound failed with exception: {e}")
-        return False
-    
+        return self._try_backends(self._system_sound_backends())
+
+    def _system_sound_backends(self) -> List[Backend]:
+        """Platform-specific system sounds whose player and sound file are installed."""
+        if self.platform.startswith('win'):
+            return [("Windows MessageBeep", self._play_windows_system_sound)]
+        elif self.platform.startswith('darwin'):
+            sounds_to_try = [
+                '/System/Library/Sounds/Ping.aiff',
+                '/System/Library/Sounds/Glass.aiff',
+                '/System/Library/Sounds/Blow.aiff',
+                '/System/Library/Sounds/Pop.aiff'
+            ]
+            if not shutil.which('afplay'):
+                return []
+            return [self._player_backend(['afplay', sound_file], f"macOS sound {sound_file}")
+                    for sound_file in sounds_to_try if os.path.exists(sound_file)]
+        elif self.platform.startswith('linux'):
+            # Try multiple Linux audio systems and sounds
+            commands = [
+                (['paplay', '/usr/share/sounds/alsa/Front_Left.wav'], 'PulseAudio with ALSA sound'),
+                (['aplay', '/usr/share/sounds/alsa/Front_Left.wav'], 'ALSA with Front_Left sound'),
+                (['paplay', '/usr/share/sounds/sound-icons/bell.wav'], 'PulseAudio with bell sound'),
+                (['aplay', '/usr/share/sounds/sound-icons/bell.wav'], 'ALSA with bell sound'),
+                (['speaker-test', '-t', 'sine', '-f', '800', '-l', '1'], 'Speaker test sine wave'),
+                (['beep', '-f', '800', '-l', '500'], 'System beep command')
+            ]
+            in_process = [backend for sound_file in dict.fromkeys(cmd[1] for cmd, _ in commands[:4])
+                          for backend in self._pcm_backends(sound_file)]
+            return in_process + [self._player_backend(cmd, description) for cmd, description in commands
+                                 if shutil.which(cmd[0]) and (cmd[1].startswith('-') or os.path.exists(cmd[1]))]
+        logger.debug(f"❓ Unknown platform: {self.platform}")
+        return []
+
     def _play_windows_system_sound(self) -> bool:
         """Play Windows system notification sound."""
         try:
@@ -108,178 +414,92 @@ class SoundManager:
             return True
         except ImportError as e:
             logger.debug(f"winsound not available: {e}")
+            return False
+        except Exception as e:
+            logger.debug(f"Windows sound error: {e}")
             # Fallback to simple beep
             try:
                 import winsound
                 logger.debug("🔊 Using Windows simple beep fallback...")
                 winsound.Beep(800, 500)  # 800Hz for 500ms
                 return True
-            except ImportError as e2:
+            except Exception as e2:
                 logger.debug(f"winsound fallback also failed: {e2}")
                 return False
-        except Exception as e:
-            logger.debug(f"Windows sound error: {e}")
-            return False
-    
-    def _play_macos_system_sound(self) -> bool:
-        """Play macOS system notification sound."""
-        sounds_to_try = [
-            '/System/Library/Sounds/Ping.aiff',
-            '/System/Library/Sounds/Glass.aiff',
-            '/System/Library/Sounds/Blow.aiff',
-            '/System/Library/Sounds/Pop.aiff'
-        ]
-
-        for sound_file in sounds_to_try:
-            try:
-                logger.debug(f"🔊 Trying macOS sound: {sound_file}")
-                result = subprocess.run(['afplay', sound_file],
-                                     check=True, capture_output=True, timeout=5)
-                logger.debug(f"✅ macOS sound played successfully: {sound_file}")
-                return True
-            except subprocess.CalledProcessError as e:
-                logger.debug(f"❌ afplay failed for {sound_file}: {e}")
-            except subprocess.TimeoutExpired:
-                logger.debug(f"⏰ afplay timeout for {sound_file}")
-            except FileNotFoundError:
-                logger.debug(f"📁 Sound file not found: {sound_file}")
-            except Exception as e:
-                logger.debug(f"❌ Unexpected error with {sound_file}: {e}")
-
-        logger.debug("❌ All macOS system sounds failed")
-        return False
-    
-    def _play_linux_system_sound(self) -> bool:
-        """Play Linux system notification sound."""
-        # Try multiple Linux audio systems and sounds
-        commands = [
-            (['paplay', '/usr/share/sounds/alsa/Front_Left.wav'], 'PulseAudio with ALSA sound'),
-            (['aplay', '/usr/share/sounds/alsa/Front_Left.wav'], 'ALSA with Front_Left sound'),
-            (['paplay', '/usr/share/sounds/sound-icons/bell.wav'], 'PulseAudio with bell sound'),
-            (['aplay', '/usr/share/sounds/sound-icons/bell.wav'], 'ALSA with bell sound'),
-            (['speaker-test', '-t', 'sine', '-f', '800', '-l', '1'], 'Speaker test sine wave'),
-            (['beep', '-f', '800', '-l', '500'], 'System beep command')
-        ]
-
-        for cmd, description in commands:
-            try:
-                logger.debug(f"🔊 Trying Linux audio: {description}")
-                result = subprocess.run(cmd, check=True, capture_output=True, timeout=5)
-                logger.debug(f"✅ Linux sound played successfully: {description}")
-                return True
-            except subprocess.CalledProcessError as e:
-                logger.debug(f"❌ Command failed for {description}: {e}")
-            except subprocess.TimeoutExpired:
-                logger.debug(f"⏰ Timeout for {description}")
-            except FileNotFoundError:
-                logger.debug(f"📁 Command not found for {description}")
-            except Exception as e:
-                logger.debug(f"❌ Unexpected error with {description}: {e}")
-
-        logger.debug("❌ All Linux system sounds failed")
-        return False
-    
+
     def _play_external_sound(self) -> bool:
         """Play external sound file if it exists."""
+        return self._try_backends(self._external_sound_backends())
+
+    def _external_sound_backends(self) -> List[Backend]:
+        """Players for the external sound file, if the file exists."""
         if not os.path.exists(self.external_sound_file):
             logger.debug(f"📁 External sound file not found: {self.external_sound_file}")
-            return False
+            return []
+        sound_file = self.external_sound_file
+        if self.platform.startswith('win'):
+            return [(f"winsound with {sound_file}", lambda: self._play_windows_sound_file(sound_file))]
+        return self._pcm_backends(sound_file) + [
+            self._player_backend([player, sound_file], f"{player} with {sound_file}", timeout=10)
+            for player in self._file_players()]
 
-        logger.debug(f"🔊 Found external sound file: {self.external_sound_file}")
+    @staticmethod
+    def _play_windows_sound_file(sound_file: str) -> bool:
+        import winsound
+        winsound.PlaySound(sound_file, winsound.SND_FILENAME)
+        return True
 
-        try:
-            if self.platform.startswith('win'):
-                logger.debug("🪟 Using Windows winsound for external file...")
-                import winsound
-                winsound.PlaySound(self.external_sound_file, winsound.SND_FILENAME)
-                logger.debug("✅ Windows external sound played successfully")
-                return True
-            elif self.platform.startswith('darwin'):
-                logger.debug("🍎 Using macOS afplay for external file...")
-                result = subprocess.run(['afplay', self.external_sound_file],
-                                     check=True, capture_output=True, timeout=10)
-                logger.debug("✅ macOS external sound played successfully")
-                return True
-            elif self.platform.startswith('linux'):
-                # Try paplay first, then aplay
-                for cmd_name in ['paplay', 'aplay']:
-                    try:
-                        logger.debug(f"🐧 Trying Linux {cmd_name} for external file...")
-                        result = subprocess.run([cmd_name, self.external_sound_file],
-                                             check=True, capture_output=True, timeout=10)
-                        logger.debug(f"✅ Linux {cmd_name} external sound played successfully")
-                        return True
-                    except subprocess.CalledProcessError as e:
-                        logger.debug(f"❌ {cmd_name} failed: {e}")
-                    except subprocess.TimeoutExpired:
-                        logger.debug(f"⏰ {cmd_name} timeout")
-                    except FileNotFoundError:
-                        logger.debug(f"📁 {cmd_name} command not found")
-        except Exception as e:
-            logger.warning(f"External sound playback failed with exception: {e}")
-        return False
-    
     def _play_embedded_sound(self) -> bool:
-        """Play embedded minimal beep sound."""
-        try:
-            logger.debug("🔊 Creating temporary file from embedded sound data...")
-            # Create temporary file with embedded sound
-            if self._temp_sound_file is None:
-                self._create_temp_sound_file()
-
-            if self._temp_sound_file and os.path.exists(self._temp_sound_file):
-                logger.debug(f"📁 Temporary sound file created: {self._temp_sound_file}")
-                return self._play_temp_sound_file()
-            else:
-                logger.debug("❌ Failed to create temporary sound file")
-        except Exception as e:
-            logger.warning(f"Embedded sound playback failed with exception: {e}")
-        return False
-    
-    def _create_temp_sound_file(self) -> None:
-        """Create temporary sound file from embedded data."""
-        try:
-            logger.debug("🔄 Decoding base64 embedded sound data...")
-            # Decode base64 sound data
-            sound_data = base64.b64decode(EMBEDDED_BEEP_WAV_BASE64.strip())
-            logger.debug(f"📊 Decoded {len(sound_data)} bytes of sound data")
+        """Play the synthesized alert tone."""
+        return self._try_backends(self._embedded_sound_backends())
 
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(sound_data)
-                self._temp_sound_file = temp_file.name
-                logger.debug(f"💾 Created temporary sound file: {self._temp_sound_file}")
+    def _embedded_sound_backends(self) -> List[Backend]:
+        """Outputs and players for the synthesized tone, which is fed from memory."""
+        if self.platform.startswith('win'):
+            return [("winsound with synthesized tone", self._play_windows_tone)]
+        in_process = [(f"in-process {output.name} with synthesized tone",
+                       lambda output=output: self._play_pcm(output, self._tone_buffer(), "synthesized tone"))
+                      for output in self._pcm_output_list()]
+        return in_process + [(f"{player} with synthesized tone", lambda player=player: self._play_tone_with(player))
+                             for player in self._file_players()]
+
+    @property
+    def tone_wav(self) -> bytes:
+        """The synthesized tone as WAV bytes."""
+        return synthesize_tone_wav(self.tone_frequency, self.tone_duration)
+
+    def _tone_buffer(self) -> "PcmBuffer":
+        from pcm_playback import PcmBuffer
+        return PcmBuffer(TONE_SAMPLE_RATE, 1, 2, synthesize_tone_pcm(self.tone_frequency, self.tone_duration))
+
+    def _play_windows_tone(self) -> bool:
+        import winsound
+        winsound.PlaySound(self.tone_wav, winsound.SND_MEMORY)
+        return True
+
+    def _play_tone_with(self, player: str) -> bool:
+        """Play the tone with a command line player, from a memfd where available, else from stdin."""
+        description = f"{player} with synthesized tone"
+        fd = self._tone_memfd()
+        if fd is not None:
+            # /dev/fd/N reopens the memfd, so every run reads it from the start
+            return self._run_player([player, f"/dev/fd/{fd}"], description, pass_fds=(fd,))
+        return self._run_player([player, "/dev/stdin"], description, input=self.tone_wav)
+
+    def _tone_memfd(self) -> Optional[int]:
+        """An anonymous in-memory file holding the tone WAV, written once (None without memfd_create)."""
+        if self._tone_fd is None and hasattr(os, 'memfd_create'):
+            try:
+                fd = os.memfd_create("your-turn-tone")
+            except OSError as e:
+                logger.debug(f"memfd_create failed, feeding players through stdin: {e}")
+                return None
+            data = self.tone_wav
+            while data:
+                data = data[os.write(fd, data):]
+            self._tone_fd = fd
+        return self._tone_fd
 
-        except Exception as e:
-            logger.warning(f"Failed to create temporary sound file: {e}")
-            self._temp_sound_file = None
-    
-    def _play_temp_sound_file(self) -> bool:
-        """Play the temporary sound file."""
-        if not self._temp_sound_file:
-            return False
-            
-        try:
-            if self.platform.startswith('win'):
-                import winsound
-                winsound.PlaySound(self._temp_sound_file, winsound.SND_FILENAME)
-                return True
-            elif self.platform.startswith('darwin'):
-                subprocess.run(['afplay', self._temp_sound_file], 
-                             check=True, capture_output=True, timeout=5)
-                return True
-            elif self.platform.startswith('linux'):
-                for cmd in [['paplay'], ['aplay']]:
-                    try:
-                        subprocess.run(cmd + [self._temp_sound_file], 
-                                     check=True, capture_output=True, timeout=5)
-                        return True
-                    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
-                        continue
-        except Exception as e:
-            logger.debug(f"Temporary sound file playback failed: {e}")
-        return False
-    
     def _play_ascii_bell(self) -> bool:
         """Play ASCII bell character as final fallback, without polluting stdout (MCP JSON)."""
         try:
@@ -294,13 +514,13 @@ class SoundManager:
             return False
     
     def cleanup(self) -> None:
-        """Clean up temporary files."""
-        if self._temp_sound_file and os.path.exists(self._temp_sound_file):
+        """Close the in-memory tone file."""
+        if self._tone_fd is not None:
             try:
-                os.unlink(self._temp_sound_file)
-                self._temp_sound_file = None
-            except Exception as e:
-                logger.debug(f"Failed to cleanup temporary sound file: {e}")
+                os.close(self._tone_fd)
+            except OSError as e:
+                logger.debug(f"Failed to close tone memfd: {e}")
+            self._tone_fd = None
     
     def __del__(self):
         """Cleanup when object is destroyed."""
@@ -309,6 +529,19 @@ class SoundManager:
 
 # Global sound manager instance
 _sound_manager = None
+# Worker threads may ask for the manager concurrently; they must share one
+_sound_manager_lock = threading.Lock()
+
+
+def _min_interval_from_env() -> float:
+    value = os.getenv('MCP_SOUND_MIN_INTERVAL')
+    if not value:
+        return DEFAULT_SOUND_MIN_INTERVAL
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        logger.warning(f"⚠️ Invalid MCP_SOUND_MIN_INTERVAL {value!r}, using {DEFAULT_SOUND_MIN_INTERVAL:g}")
+        return DEFAULT_SOUND_MIN_INTERVAL
 
 
 def get_sound_manager(external_sound_file: Optional[str] = None) -> SoundManager:
@@ -319,14 +552,21 @@ def get_sound_manager(external_sound_file: Optional[str] = None) -> SoundManager
         external_sound_file: Path to external sound file
         
     Returns:
-        SoundManager: The sound manager instance
+        SoundManager: The sound manager instance (throttled by MCP_SOUND_MIN_INTERVAL)
     """
     global _sound_manager
     if _sound_manager is None:
-        _sound_manager = SoundManager(external_sound_file)
+        with _sound_manager_lock:
+            if _sound_manager is None:
+                _sound_manager = SoundManager(external_sound_file, min_interval=_min_interval_from_env())
     return _sound_manager
 
 
+def get_sound_stats() -> Optional[Dict[str, object]]:
+    """Counters of the global sound manager (see SoundManager.stats), or None before the first sound."""
+    return _sound_manager.stats() if _sound_manager is not None else None
+
+
 def play_notification_sound(external_sound_file: Optional[str] = None) -> bool:
     """
     Convenience function to play notification sound.
@@ -341,6 +581,19 @@ def play_notification_sound(external_sound_file: Optional[str] = None) -> bool:
     return manager.play_notification_sound()
 
 
+async def play_notification_sound_async(external_sound_file: Optional[str] = None) -> bool:
+    """
+    Play the notification sound in a worker thread without blocking the event loop.
+
+    Args:
+        external_sound_file: Path to external sound file
+
+    Returns:
+        bool: True if sound was played successfully
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, play_notification_sound, external_sound_file)
+
+
 if __name__ == "__main__":
     # Test the sound manager
     print("Testing sound manager...")
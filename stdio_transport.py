@@ -0,0 +1,257 @@
+"""
+Stdio transport for the MCP Your Turn server.
+
+The MCP stdio protocol is line-delimited JSON: one JSON-RPC message per line
+on stdin, one per line on stdout. StdioReader reads frames from stdin
+natively on the event loop, and StdioWriter owns the stdout side so that
+concurrent request handlers never interleave partial frames.
+"""
+
+import asyncio
+import os
+import stat
+import sys
+import logging
+from typing import Any, BinaryIO, Dict, List, Optional
+
+import json_codec
+
+logger = logging.getLogger(__name__)
+
+# Largest accepted inbound frame (one JSON-RPC message line)
+DEFAULT_MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+# StreamReader buffer limit; longer lines are read in chunks of this size
+_READ_CHUNK_LIMIT = 64 * 1024
+
+
+class _FrameTooLarge(Exception):
+    """Raised internally when an inbound line exceeds the frame limit."""
+
+    def __init__(self, size: int):
+        super().__init__(size)
+        self.size = size
+
+
+class StdioReader:
+    """
+    Reads newline-delimited frames from stdin.
+
+    When stdin is a pipe or socket (the normal case for MCP clients and
+    `docker run -i`), the stream is attached to the event loop with
+    connect_read_pipe, so reading costs no thread hop and close() cancels a
+    pending read immediately. Otherwise (terminals, regular files, platforms
+    without pipe support) it falls back to readline in the default executor.
+    """
+
+    def __init__(self, stream: Optional[BinaryIO] = None, max_frame_bytes: int = DEFAULT_MAX_FRAME_BYTES):
+        """
+        Initialize the reader.
+
+        Args:
+            stream: Binary stream to read frames from (defaults to sys.stdin.buffer)
+            max_frame_bytes: Frames longer than this are discarded
+        """
+        self._stream = stream if stream is not None else sys.stdin.buffer
+        self.max_frame_bytes = max_frame_bytes
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._transport: Optional[asyncio.BaseTransport] = None
+        self._eof = False
+        self.frames_read = 0
+        self.frames_dropped = 0
+
+    @property
+    def uses_pipe(self) -> bool:
+        """True when frames are read natively on the event loop."""
+        return self._reader is not None
+
+    async def start(self) -> None:
+        """Attach to the input stream, preferring a native pipe reader."""
+        if self._reader is not None or not self._is_pipe():
+            if self._reader is None:
+                logger.info("📥 stdin is not a pipe, reading frames in a worker thread")
+            return
+
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=_READ_CHUNK_LIMIT, loop=loop)
+        protocol = asyncio.StreamReaderProtocol(reader, loop=loop)
+        try:
+            self._transport, _ = await loop.connect_read_pipe(lambda: protocol, self._stream)
+        except (NotImplementedError, OSError, ValueError) as e:
+            logger.info(f"📥 Native pipe reader unavailable ({e}), reading frames in a worker thread")
+            return
+        self._reader = reader
+        logger.debug("📥 Reading stdin with asyncio pipe transport")
+
+    def _is_pipe(self) -> bool:
+        """Check whether the input stream is a FIFO or socket."""
+        try:
+            mode = os.fstat(self._stream.fileno()).st_mode
+        except (AttributeError, OSError, ValueError):
+            return False
+        return stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode)
+
+    async def read_frame(self) -> Optional[bytes]:
+        """
+        Read the next frame.
+
+        Returns:
+            Optional[bytes]: The frame without its trailing newline, or None at EOF.
+            Frames exceeding max_frame_bytes are logged and skipped.
+        """
+        while not self._eof:
+            try:
+                if self._reader is not None:
+                    frame = await self._read_pipe_frame()
+                else:
+                    frame = await self._read_threaded_frame()
+            except _FrameTooLarge as e:
+                self.frames_dropped += 1
+                logger.error(f"❌ Dropping {e.size}-byte frame (limit {self.max_frame_bytes} bytes)")
+                continue
+            if frame is not None:
+                self.frames_read += 1
+            return frame
+        return None
+
+    async def _read_pipe_frame(self) -> Optional[bytes]:
+        """Read one line from the pipe, accumulating it chunk by chunk."""
+        parts: List[bytes] = []
+        size = 0
+        limit = self.max_frame_bytes + 2  # room for a trailing CRLF
+        while True:
+            try:
+                chunk = await self._reader.readuntil(b"\n")
+                complete = True
+            except asyncio.LimitOverrunError as e:
+                # Line longer than the buffer limit: take what is buffered and keep going
+                chunk = await self._reader.readexactly(e.consumed)
+                complete = False
+            except asyncio.IncompleteReadError as e:
+                # EOF; a final line without a newline is still a frame
+                self._eof = True
+                chunk = e.partial
+                complete = True
+
+            size += len(chunk)
+            if size <= limit:
+                parts.append(chunk)
+            elif parts:
+                # Oversized: stop buffering and just count what is left of the line
+                parts.clear()
+            if complete:
+                break
+
+        if size == 0:
+            return None
+        frame = b"".join(parts).rstrip(b"\r\n")
+        if size > limit or len(frame) > self.max_frame_bytes:
+            raise _FrameTooLarge(size)
+        return frame
+
+    async def _read_threaded_frame(self) -> Optional[bytes]:
+        """Fallback: blocking readline in the default executor."""
+        loop = asyncio.get_running_loop()
+        limit = self.max_frame_bytes + 2  # room for a trailing CRLF
+        line = await loop.run_in_executor(None, self._stream.readline, limit)
+        if not line:
+            self._eof = True
+            return None
+        if not line.endswith(b"\n") and len(line) >= limit:
+            # Discard the remainder of the oversized line
+            size = len(line)
+            while True:
+                rest = await loop.run_in_executor(None, self._stream.readline, _READ_CHUNK_LIMIT)
+                size += len(rest)
+                if not rest or rest.endswith(b"\n"):
+                    break
+            raise _FrameTooLarge(size)
+        return line.rstrip(b"\r\n")
+
+    def close(self) -> None:
+        """Detach from the input stream."""
+        self._eof = True
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+
+class StdioWriter:
+    """
+    Single writer for outgoing JSON-RPC frames.
+
+    Frames are encoded by the caller's task and queued; one coroutine drains
+    the queue and performs exactly one write and one flush per frame, so
+    frames leave in the order they were queued and are never interleaved.
+    """
+
+    def __init__(self, stream: Optional[BinaryIO] = None):
+        """
+        Initialize the writer.
+
+        Args:
+            stream: Binary stream to write frames to (defaults to sys.stdout.buffer)
+        """
+        self._stream = stream if stream is not None else sys.stdout.buffer
+        self._queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.frames_written = 0
+
+    def start(self) -> None:
+        """Start the writer coroutine (idempotent)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def send(self, message: Dict[str, Any]) -> int:
+        """
+        Queue a JSON-RPC message for delivery.
+
+        Args:
+            message: The JSON-RPC message to send
+
+        Returns:
+            int: Size of the encoded frame in bytes
+        """
+        frame = json_codec.dumps(message) + b"\n"
+        if self._closed:
+            logger.warning("⚠️ Writer closed, dropping outgoing frame")
+            return len(frame)
+        self._queue.put_nowait(frame)
+        return len(frame)
+
+    async def drain(self) -> None:
+        """Wait until every queued frame has been written and flushed."""
+        await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush pending frames and stop the writer coroutine."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put_nowait(None)
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        """Write queued frames until close() is called."""
+        broken = False
+        while True:
+            frame = await self._queue.get()
+            try:
+                if frame is None:
+                    return
+                if broken:
+                    continue
+                self._stream.write(frame)
+                self._stream.flush()
+                self.frames_written += 1
+            except (BrokenPipeError, ConnectionResetError) as e:
+                # Client went away; keep draining so drain()/close() never hang
+                logger.error(f"❌ Output pipe closed, dropping further frames: {e}")
+                broken = True
+            except Exception as e:
+                logger.error(f"❌ Failed to write frame: {e}")
+            finally:
+                self._queue.task_done()
@@ -9,12 +9,12 @@ import sys
 import logging
 import os
 import tempfile
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
 # Telegram imports (optional dependency)
 try:
     from telegram import Bot, Update
-    from telegram.ext import Application, MessageHandler, filters, ContextTypes
+    from telegram.ext import Application, ApplicationHandlerStop, MessageHandler, TypeHandler, filters, ContextTypes
     from telegram.error import TelegramError, NetworkError, TimedOut
     TELEGRAM_AVAILABLE = True
 except ImportError:
@@ -22,25 +22,36 @@ except ImportError:
     Bot = None
     Update = None
     Application = None
+    ApplicationHandlerStop = Exception
     MessageHandler = None
+    TypeHandler = None
     filters = None
     ContextTypes = None
     TelegramError = Exception
     NetworkError = Exception
     TimedOut = Exception
 
-# Deepgram imports (optional dependency)
-try:
-    from deepgram import DeepgramClient, PrerecordedOptions  # type: ignore
-    from deepgram.clients.common.v1.options import BufferSource  # type: ignore
-    DEEPGRAM_AVAILABLE = True
-except Exception:
-    DEEPGRAM_AVAILABLE = False
-    DeepgramClient = None  # type: ignore
-    PrerecordedOptions = None  # type: ignore
-    BufferSource = None  # type: ignore
+# Deepgram imports (optional dependency, loaded on the first voice message;
+# the SDK is large and most sessions never transcribe anything)
+DEEPGRAM_AVAILABLE: Optional[bool] = None
+DeepgramClient = None  # type: ignore
+PrerecordedOptions = None  # type: ignore
+BufferSource = None  # type: ignore
+
+
+def _load_deepgram() -> bool:
+    """Import the Deepgram SDK on first use. Returns True if it is available."""
+    global DEEPGRAM_AVAILABLE, DeepgramClient, PrerecordedOptions, BufferSource
+    if DEEPGRAM_AVAILABLE is None:
+        try:
+            from deepgram import DeepgramClient, PrerecordedOptions  # type: ignore
+            from deepgram.clients.common.v1.options import BufferSource  # type: ignore
+            DEEPGRAM_AVAILABLE = True
+        except Exception:
+            DEEPGRAM_AVAILABLE = False
+    return DEEPGRAM_AVAILABLE
 
-from interactive_session import get_session_manager, InteractiveSession
+from interactive_session import get_session_manager, InteractiveSession, SessionStatus
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +77,12 @@ class TelegramNotifier:
         self._connection_tested = False
         self._last_activity = None
         self._monitoring_task = None
+        # Seconds questions wait for others to share one message (0 = send each at once)
+        self.coalesce_window = 0.0
+        self._coalescing: List[Tuple["InteractiveSession", asyncio.Future]] = []
+        self._coalesce_task: Optional[asyncio.Task] = None
+        # Loop time of the last question message sent (a lone question is never delayed)
+        self._last_question_at: Optional[float] = None
 
         logger.info("🤖 Initializing Telegram notifier...")
 
@@ -144,6 +161,12 @@ class TelegramNotifier:
             # Create application for handling updates
             self.application = Application.builder().token(self.bot_token).build()
 
+            # With a session store, skip updates handled before a restart (group -1)
+            # and record each update id once it has been handled (group 1)
+            if get_session_manager().store is not None:
+                self.application.add_handler(TypeHandler(Update, self._skip_handled_update), group=-1)
+                self.application.add_handler(TypeHandler(Update, self._record_handled_update), group=1)
+
             # Add message handler for user responses (text)
             message_handler = MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message)
             self.application.add_handler(message_handler)
@@ -188,13 +211,20 @@ class TelegramNotifier:
             await self.application.start()
             logger.info("✅ Application started")
 
-            # Start polling for updates
+            # Start polling for updates. Without a session store nothing could
+            # receive replies sent while we were down, so drop them; with one,
+            # replay them into the re-hydrated sessions.
+            store = get_session_manager().store
             logger.info("🔄 Starting polling for updates...")
+            if store is not None:
+                # session_store (and sqlite3) is only imported when a store is configured
+                from session_store import TELEGRAM_OFFSET_KEY
+                logger.info(f"💾 Resuming after update {store.get_state(TELEGRAM_OFFSET_KEY) or 'none'}, replaying missed replies")
             await self.application.updater.start_polling(
                 poll_interval=1.0,      # Poll every second
                 timeout=10,             # 10 second timeout for each poll
                 bootstrap_retries=5,    # Retry 5 times on startup
-                drop_pending_updates=True  # Drop any pending updates on startup
+                drop_pending_updates=store is None
             )
 
             logger.info("✅ Interactive mode started successfully - now listening for messages!")
@@ -272,6 +302,33 @@ class TelegramNotifier:
                 logger.error(f"❌ Connection monitoring error: {e}")
                 await asyncio.sleep(10)  # Wait before retrying
 
+    async def _skip_handled_update(self, update: "Update", context: "ContextTypes.DEFAULT_TYPE") -> None:
+        """Stop updates the session store says were already handled (redelivered after a restart)."""
+        store = get_session_manager().store
+        if store is None:
+            return
+        from session_store import TELEGRAM_OFFSET_KEY
+        handled = store.get_state(TELEGRAM_OFFSET_KEY)
+        if handled is not None and update.update_id <= int(handled):
+            logger.info(f"⏭️ Skipping update {update.update_id}, already handled before restart")
+            raise ApplicationHandlerStop
+
+    async def _record_handled_update(self, update: "Update", context: "ContextTypes.DEFAULT_TYPE") -> None:
+        """Persist the id of the last handled update (written with the next store flush)."""
+        store = get_session_manager().store
+        if store is not None:
+            from session_store import TELEGRAM_OFFSET_KEY
+            store.set_state(TELEGRAM_OFFSET_KEY, update.update_id)
+
+    @staticmethod
+    def _sent_at(message: Any) -> Optional[float]:
+        """When a Telegram message was sent (epoch seconds), if known."""
+        date = getattr(message, 'date', None) if message is not None else None
+        try:
+            return date.timestamp() if date is not None else None
+        except (AttributeError, TypeError):
+            return None
+
     async def _handle_message(self, update: "Update", context: "ContextTypes.DEFAULT_TYPE") -> None:
         """Handle incoming messages from users."""
         if not update.message or not update.message.text:
@@ -294,33 +351,59 @@ class TelegramNotifier:
             logger.warning(f"⚠️ Message from unauthorized chat {chat_id}, expected {self.chat_id}")
             return
 
-        # Get session manager and find active sessions for this chat
+        # Route to the question being replied to, else the most recent active session
         session_manager = get_session_manager()
-        active_sessions = session_manager.get_sessions_for_chat(chat_id)
-
-        logger.info(f"🔍 Found {len(active_sessions)} active sessions for chat {chat_id}")
+        latest_session = self._find_reply_session(update.message, chat_id)
 
-        if not active_sessions:
+        if latest_session is None:
             # No active sessions, send help message
             logger.info("ℹ️ No active sessions found, sending help message")
             await self._send_help_message(chat_id)
             return
 
-        # Find the most recent active session
-        latest_session = max(active_sessions.values(), key=lambda s: s.created_at)
-        logger.info(f"🎯 Using latest session: {latest_session.session_id}")
+        # Within a batch, "2: ..." answers question 2, anything else the first open one
+        latest_session, message_text = session_manager.route_batch_reply(latest_session, message_text)
+
+        if not latest_session.is_active:
+            await self._send_error_message(chat_id, "That question is already closed, your reply was not delivered")
+            return
+
+        logger.info(f"🎯 Using session: {latest_session.session_id}")
 
         # Submit the response
         logger.info(f"📝 Submitting response to session {latest_session.session_id}: '{message_text}'")
-        success = session_manager.submit_response(latest_session.session_id, message_text)
+        success = session_manager.submit_response(latest_session.session_id, message_text,
+                                                  received_at=self._sent_at(update.message))
 
         if success:
             logger.info(f"✅ Response successfully submitted for session {latest_session.session_id}")
             await self._send_confirmation_message(chat_id, message_text)
+            await self.refresh_batch_message(latest_session)
         else:
             logger.error(f"❌ Failed to submit response for session {latest_session.session_id}")
             await self._send_error_message(chat_id, "Failed to process your response")
 
+    def _find_reply_session(self, message: Any, chat_id: str) -> Optional["InteractiveSession"]:
+        """
+        Pick the session a user message answers.
+
+        A reply to one of our questions (reply_to_message) goes to that
+        question's session, even if it has finished; anything else goes to
+        the newest session of the chat that was active when the message was
+        sent (which matters for replies replayed after a restart).
+
+        Returns:
+            Optional[InteractiveSession]: The target session (check is_active), or None
+        """
+        session_manager = get_session_manager()
+        reply_to = getattr(message, 'reply_to_message', None) if message is not None else None
+        if reply_to is not None:
+            session = session_manager.get_session_for_message(chat_id, reply_to.message_id)
+            if session is not None:
+                logger.info(f"↩️ Reply to message {reply_to.message_id} routed to session {session.session_id}")
+                return session
+        return session_manager.get_latest_active_session(chat_id, self._sent_at(message))
+
     async def _send_help_message(self, chat_id: str) -> None:
         """Send a help message when no active sessions are found."""
         message = "ℹ️ No active questions found. I'll notify you when the LLM needs your input!"
@@ -373,7 +456,7 @@ class TelegramNotifier:
 
     async def _transcribe_with_deepgram(self, file_path: str, timeout_seconds: int = 45) -> Optional[str]:
         """Transcribe a local audio file using Deepgram. Returns transcript text or None."""
-        if not DEEPGRAM_AVAILABLE:
+        if not _load_deepgram():
             logger.error("Deepgram SDK not available. Install with: pip install deepgram-sdk")
             return None
         try:
@@ -475,14 +558,19 @@ class TelegramNotifier:
 
         # Submit transcript as a normal text response into the latest active session
         session_manager = get_session_manager()
-        active_sessions = session_manager.get_sessions_for_chat(chat_id)
-        if not active_sessions:
+        latest_session = self._find_reply_session(update.message, chat_id)
+        if latest_session is None:
             await self._send_help_message(chat_id)
             return
-        latest_session = max(active_sessions.values(), key=lambda s: s.created_at)
-        success = session_manager.submit_response(latest_session.session_id, transcript)
+        latest_session, transcript = session_manager.route_batch_reply(latest_session, transcript)
+        if not latest_session.is_active:
+            await self._send_error_message(chat_id, "That question is already closed, your reply was not delivered")
+            return
+        success = session_manager.submit_response(latest_session.session_id, transcript,
+                                                  received_at=self._sent_at(update.message))
         if success:
             await self._send_confirmation_message(chat_id, transcript)
+            await self.refresh_batch_message(latest_session)
         else:
             await self._send_error_message(chat_id, "Failed to process your transcribed response")
             logger.error("Session manager failed to submit transcribed response")
@@ -572,6 +660,15 @@ class TelegramNotifier:
             except Exception as e:
                 logger.error(f"Failed to resolve message item: {e}")
                 return
+        elif response_type.startswith("opt:"):
+            # Answer button of a batch question, by index into the question's options
+            session = get_session_manager().get_session(session_id)
+            options = ((session.metadata or {}).get("options") or []) if session else []
+            try:
+                response_text = options[int(response_type.split(":", 1)[1])]
+            except (ValueError, IndexError):
+                logger.error(f"Invalid option for session {session_id}: {response_type}")
+                return
         else:
             # Unknown quick-type; ignore
             logger.warning(f"Ignoring unknown response type: {response_type}")
@@ -583,6 +680,12 @@ class TelegramNotifier:
         logger.info(f"🔍 Submitting quick response to session {session_id}: '{response_text}'")
         success = session_manager.submit_response(session_id, response_text)
 
+        session = session_manager.get_session(session_id)
+        if session is not None and (session.metadata or {}).get("batch"):
+            # One message holds the whole batch: redraw it instead of replacing it
+            await self.refresh_batch_message(session)
+            return
+
         if success:
             logger.info(f"✅ Quick response successfully submitted for session {session_id}: {response_text}")
 
@@ -621,9 +724,35 @@ class TelegramNotifier:
         except Exception as e:
             logger.error(f"Failed to edit message for custom response: {e}")
 
+    @staticmethod
+    def _prewritten_buttons() -> List[Dict[str, Any]]:
+        """Button labels for the pre-written messages configured in messages.yml."""
+        from config import config as _cfg
+        msgs = getattr(_cfg, 'messages', {}).get('messages', {}) if _cfg else {}
+        predefined: List[Dict[str, Any]] = []
+        if isinstance(msgs.get('prewritten'), list):
+            for item in msgs['prewritten']:
+                # Support:
+                # - dict items {label, text}
+                # - dict items {label, compose: [use: templateName|templateName]}
+                # - plain strings
+                if isinstance(item, dict):
+                    label = item.get('label') or (item.get('text') or str(item))[:32]
+                    predefined.append({'label': label})
+                elif isinstance(item, str):
+                    predefined.append({'label': item[:32]})
+        return predefined
+
     async def send_interactive_question(self, session: "InteractiveSession") -> bool:
         """
-        Send an interactive question via Telegram.
+        Send an interactive question via Telegram, coalescing bursts.
+
+        A question with nothing pending and no question sent within the
+        coalescing window goes out at once. Questions arriving within the
+        window after it are collected until the window closes and go out
+        together (one entry and set of reply buttons per agent), so a fleet
+        of agents finishing together sends two messages instead of N, and a
+        lone question is never delayed.
 
         Args:
             session: The interactive session containing the question
@@ -633,9 +762,62 @@ class TelegramNotifier:
         """
         if not self.enabled or not self.bot:
             return False
+        if self.coalesce_window <= 0:
+            return await self._send_single_question(session)
+
+        loop = asyncio.get_running_loop()
+        if self._coalesce_task is None and (self._last_question_at is None
+                                            or loop.time() - self._last_question_at >= self.coalesce_window):
+            self._last_question_at = loop.time()
+            return await self._send_single_question(session)
+
+        sent = loop.create_future()
+        self._coalescing.append((session, sent))
+        if self._coalesce_task is None:
+            self._coalesce_task = asyncio.create_task(self._flush_coalesced())
+        # Shielded: a caller that gives up must not abort the others' message
+        return await asyncio.shield(sent)
+
+    async def _flush_coalesced(self) -> None:
+        """Close the coalescing window and send what arrived in it as one message."""
+        try:
+            await asyncio.sleep(self.coalesce_window)
+        finally:
+            # Questions arriving from now on open the next window
+            pending, self._coalescing = self._coalescing, []
+            self._coalesce_task = None
+            self._last_question_at = asyncio.get_running_loop().time()
+
+        sessions = [session for session, _ in pending if session.is_active]
+        try:
+            if len(sessions) > 1:
+                logger.info(f"📦 Coalescing {len(sessions)} questions into one message")
+                batch = [session.session_id for session in sessions]
+                for index, session in enumerate(sessions):
+                    metadata = dict(session.metadata or {})
+                    metadata.update(batch=batch, index=index, coalesced=True)
+                    session.metadata = metadata
+                result = await self.send_batch_question(sessions)
+            elif sessions:
+                result = await self._send_single_question(sessions[0])
+            else:
+                result = False
+        except Exception as e:
+            self._log_error(f"Failed to send coalesced questions: {e}")
+            result = False
+
+        for session, sent in pending:
+            if not sent.done():
+                sent.set_result(result and session.is_active)
+
+    async def _send_single_question(self, session: "InteractiveSession") -> bool:
+        """Send one interactive question as its own Telegram message."""
 
         try:
-            from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+            from telegram import ForceReply, InlineKeyboardButton, InlineKeyboardMarkup
+
+            # With several questions open in this chat, a plain message can only go to the newest
+            concurrent = len(get_session_manager().get_active_sessions_for_chat(self.chat_id)) > 1
 
             # Format the interactive message
             message = f"❓ *Question for you:*\n\n{session.message}"
@@ -654,25 +836,15 @@ class TelegramNotifier:
             message += f"\n⏰ {timestamp}"
 
             # Add instructions
-            message += "\n\n💬 You can simply type a response."
+            if concurrent:
+                message += "\n\n↩️ Several questions are open: reply to this message to answer this one."
+            else:
+                message += "\n\n💬 You can simply type a response."
 
             # If prewritten options exist, we will render buttons for them below
 
             # Build keyboard from configured pre-written messages, if any
-            from config import config as _cfg
-            msgs = getattr(_cfg, 'messages', {}).get('messages', {}) if _cfg else {}
-            predefined: List[Dict[str, Any]] = []
-            if isinstance(msgs.get('prewritten'), list):
-                for item in msgs['prewritten']:
-                    # Support:
-                    # - dict items {label, text}
-                    # - dict items {label, compose: [use: templateName|templateName]}
-                    # - plain strings
-                    if isinstance(item, dict):
-                        label = item.get('label') or (item.get('text') or str(item))[:32]
-                        predefined.append({'label': label})
-                    elif isinstance(item, str):
-                        predefined.append({'label': item[:32]})
+            predefined = self._prewritten_buttons()
 
             keyboard = []
             if predefined:
@@ -688,12 +860,17 @@ class TelegramNotifier:
                 if row:
                     keyboard.append(row)
 
-            # If no predefined messages configured, no keyboard (user simply types)
-
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            if keyboard:
+                reply_markup = InlineKeyboardMarkup(keyboard)
+            elif concurrent:
+                # No buttons: open the reply box on this message so the answer is routed here
+                reply_markup = ForceReply(selective=True, input_field_placeholder=f"Reply to {session.session_id[:8]}...")
+            else:
+                # If no predefined messages configured, no keyboard (user simply types)
+                reply_markup = InlineKeyboardMarkup(keyboard)
 
             # Send the message with timeout (plain text to avoid parsing errors)
-            await asyncio.wait_for(
+            sent = await asyncio.wait_for(
                 self.bot.send_message(
                     chat_id=self.chat_id,
                     text=message,
@@ -703,6 +880,15 @@ class TelegramNotifier:
                 timeout=10.0  # 10 second timeout
             )
 
+            # Remember the message so it can be edited later (e.g. on cancellation)
+            # and so replies to it are routed to this session
+            message_id = getattr(sent, 'message_id', None)
+            session.telegram_message_id = message_id
+            if message_id is not None:
+                get_session_manager().bind_message(session.session_id, message_id)
+            # The text now lives in Telegram; retained sessions do not need it
+            session.release_message()
+
             self._log_info(f"Interactive question sent for session {session.session_id}")
             return True
 
@@ -710,6 +896,146 @@ class TelegramNotifier:
             self._log_error(f"Failed to send interactive question: {e}")
             return False
 
+    def _render_batch(self, sessions: List["InteractiveSession"]) -> Tuple[str, Any]:
+        """Text and answer buttons of a batch message, showing which questions are answered."""
+        from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+        first = sessions[0]
+        coalesced = (first.metadata or {}).get("coalesced")
+        reason = (first.metadata or {}).get("reason")
+        if coalesced:
+            # Separate agents' questions: each already carries its own reason
+            lines = [f"🔔 {len(sessions)} agents are waiting for you:"]
+        else:
+            lines = [f"❓ {len(sessions)} questions for you:"]
+            if reason:
+                lines.append(f"📝 {reason}")
+        prewritten = self._prewritten_buttons() if coalesced else []
+        keyboard = []
+        for number, session in enumerate(sessions, 1):
+            if session.status == SessionStatus.COMPLETED:
+                lines.append(f"\n✅ {number}. {session.message}\n➡️ {session.response}")
+                continue
+            if not session.is_active:
+                lines.append(f"\n⏰ {number}. {session.message}\n(no answer)")
+                continue
+            lines.append(f"\n{number}. {session.message}")
+            options = (session.metadata or {}).get("options") or []
+            # Batch questions answer with their own options, coalesced your_turn
+            # questions with the pre-written messages
+            buttons = [(option, f"opt:{index}") for index, option in enumerate(options)]
+            buttons += [(item['label'], f"pre:{index}") for index, item in enumerate(prewritten)]
+            row = []
+            for label, response_type in buttons:
+                row.append(InlineKeyboardButton(
+                    f"{number} · {label}"[:64],
+                    callback_data=f"response:{session.session_id}:{response_type}"
+                ))
+                # Limit to 2 per row for readability
+                if len(row) == 2:
+                    keyboard.append(row); row = []
+            if row:
+                keyboard.append(row)
+
+        lines.append(f"\n🆔 Batch: {first.session_id[:8]}...")
+        timeout_minutes = first.timeout_seconds // 60
+        if timeout_minutes > 0 and not coalesced and any(session.is_active for session in sessions):
+            lines.append(f"⏱️ Timeout: {timeout_minutes} minutes")
+        if any(session.is_active for session in sessions):
+            lines.append("\n💬 Tap an answer, or reply \"2: your answer\" to answer question 2. "
+                         "A reply without a number answers the first open question.")
+        return "\n".join(lines), InlineKeyboardMarkup(keyboard)
+
+    async def send_batch_question(self, sessions: List["InteractiveSession"]) -> bool:
+        """
+        Send the questions of a batch as a single Telegram message.
+
+        Each question gets its own answer buttons (its "options"); replies
+        to the message are routed by route_batch_reply.
+
+        Args:
+            sessions: The batch's child sessions, in question order
+
+        Returns:
+            bool: True if the message was sent
+        """
+        if not self.enabled or not self.bot or not sessions:
+            return False
+
+        try:
+            text, reply_markup = self._render_batch(sessions)
+            sent = await asyncio.wait_for(
+                self.bot.send_message(chat_id=self.chat_id, text=text, reply_markup=reply_markup),
+                timeout=10.0
+            )
+            message_id = getattr(sent, 'message_id', None)
+            if message_id is not None:
+                session_manager = get_session_manager()
+                for session in sessions:
+                    session_manager.bind_message(session.session_id, message_id)
+            # Question texts are kept: the message is redrawn as answers come in
+            self._log_info(f"Batch of {len(sessions)} questions sent ({sessions[0].session_id[:8]}...)")
+            return True
+        except Exception as e:
+            self._log_error(f"Failed to send batch question: {e}")
+            return False
+
+    async def refresh_batch_message(self, session: "InteractiveSession") -> bool:
+        """
+        Redraw the batch message a session belongs to (answered questions lose their buttons).
+
+        Returns:
+            bool: True if the message was edited; False for sessions outside a batch
+        """
+        if not (session.metadata or {}).get("batch") or not session.telegram_message_id or not self.bot:
+            return False
+        try:
+            text, reply_markup = self._render_batch(get_session_manager().get_batch(session))
+            await asyncio.wait_for(
+                self.bot.edit_message_text(
+                    chat_id=self.chat_id,
+                    message_id=session.telegram_message_id,
+                    text=text,
+                    reply_markup=reply_markup
+                ),
+                timeout=10.0
+            )
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to update batch message: {e}")
+            return False
+
+    async def mark_question_cancelled(self, session: "InteractiveSession") -> bool:
+        """
+        Edit a sent interactive question to show it is no longer pending.
+
+        Args:
+            session: The cancelled session whose question was sent
+
+        Returns:
+            bool: True if the Telegram message was edited
+        """
+        message_id = session.telegram_message_id
+        if not self.enabled or not self.bot or not message_id:
+            return False
+
+        try:
+            # Editing without reply_markup also removes the quick-reply buttons
+            await asyncio.wait_for(
+                self.bot.edit_message_text(
+                    chat_id=self.chat_id,
+                    message_id=message_id,
+                    text=f"🚫 Question withdrawn - the agent is no longer waiting for a reply.\n\n"
+                         f"🆔 Session {session.session_id[:8]}... cancelled."
+                ),
+                timeout=10.0
+            )
+            logger.info(f"🚫 Marked Telegram question for session {session.session_id} as cancelled")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to mark question as cancelled: {e}")
+            return False
+
     async def send_notification(self, reason: Optional[str] = None) -> bool:
         """
         Send a notification via Telegram.
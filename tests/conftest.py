@@ -0,0 +1,21 @@
+"""Shared fixtures: the server modules live at the repository root."""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import interactive_session  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_session_manager(monkeypatch):
+    """Give every test its own global session manager and no Telegram credentials."""
+    monkeypatch.setattr(interactive_session, "_session_manager", None)
+    for name in ("TELEGRAM_BOT_TOKEN", "TELEGRAM_CHAT_ID", "SESSION_STORE_PATH"):
+        monkeypatch.delenv(name, raising=False)
+    yield
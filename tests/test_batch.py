@@ -0,0 +1,121 @@
+"""your_turn_batch: several questions in one message, answered one by one."""
+
+import asyncio
+
+import pytest
+
+from interactive_session import InteractiveSessionManager, SessionStatus, get_session_manager
+from mcp_your_turn_server import MCPServer
+
+QUESTIONS = [{"question": "Which database?", "options": ["SQLite", "Postgres"]},
+             {"question": "Ship today?"},
+             {"question": "Anything else?"}]
+
+
+@pytest.fixture
+def batch():
+    manager = InteractiveSessionManager()
+    return manager, manager.create_batch(QUESTIONS, chat_id="123456789", timeout_seconds=60, reason="release")
+
+
+def test_create_batch_links_the_children(batch):
+    manager, sessions = batch
+    ids = [session.session_id for session in sessions]
+    for index, session in enumerate(sessions):
+        assert session.metadata["batch"] == ids
+        assert session.metadata["index"] == index
+        assert session.metadata["reason"] == "release"
+        assert session.metadata["auto_default"] is False
+    assert sessions[0].metadata["options"] == ["SQLite", "Postgres"]
+    assert "options" not in sessions[1].metadata
+    assert manager.get_batch(sessions[2]) == sessions
+
+
+def test_numbered_reply_answers_that_question(batch):
+    manager, sessions = batch
+    assert manager.route_batch_reply(sessions[0], "2: yes, after lunch") == (sessions[1], "yes, after lunch")
+    assert manager.route_batch_reply(sessions[0], " 3) nope") == (sessions[2], "nope")
+
+
+def test_plain_reply_answers_the_first_open_question(batch):
+    manager, sessions = batch
+    manager.submit_response(sessions[0].session_id, "SQLite")
+    assert manager.route_batch_reply(sessions[0], "yes") == (sessions[1], "yes")
+
+
+def test_out_of_range_number_is_a_plain_reply(batch):
+    manager, sessions = batch
+    assert manager.route_batch_reply(sessions[2], "7: sure") == (sessions[0], "7: sure")
+
+
+def test_session_outside_a_batch_is_unchanged():
+    manager = InteractiveSessionManager()
+    session = manager.create_session("Done?", chat_id="1")
+    assert manager.route_batch_reply(session, "2: yes") == (session, "2: yes")
+
+
+class FakeNotifier:
+    """Records the batches sent instead of talking to Telegram."""
+
+    chat_id = "123456789"
+
+    def __init__(self):
+        self.batches = []
+        self.refreshed = []
+
+    def is_enabled(self):
+        return True
+
+    async def send_batch_question(self, sessions):
+        self.batches.append(sessions)
+        return True
+
+    async def refresh_batch_message(self, session):
+        self.refreshed.append(session)
+        return True
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = MCPServer()
+    server.telegram_notifier = FakeNotifier()
+
+    async def telegram_ready():
+        return True
+
+    monkeypatch.setattr(server, "_wait_for_telegram", telegram_ready)
+    monkeypatch.setattr(server, "play_notification_sound", lambda: None)
+    return server
+
+
+@pytest.mark.asyncio
+async def test_batch_tool_returns_every_answer(server):
+    call = asyncio.create_task(server.dispatch({
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+        "params": {"name": "your_turn_batch", "arguments": {"questions": QUESTIONS, "timeout_seconds": 60}}}))
+    while not server.telegram_notifier.batches:
+        await asyncio.sleep(0)
+    sessions = server.telegram_notifier.batches[0]
+    manager = get_session_manager()
+    for answer in ("Postgres", "yes"):
+        # Plain replies fill the questions in order
+        target, text = manager.route_batch_reply(sessions[0], answer)
+        manager.submit_response(target.session_id, text)
+    await asyncio.sleep(0)
+    assert not call.done()
+
+    manager.submit_response(sessions[2].session_id, "no")
+    response = await asyncio.wait_for(call, 1)
+    text = response["result"]["content"][0]["text"]
+    assert "Which database?\n   → \"Postgres\"" in text
+    assert "Ship today?\n   → \"yes\"" in text
+    assert "Anything else?\n   → \"no\"" in text
+    assert all(session.status == SessionStatus.COMPLETED and session.delivered for session in sessions)
+
+
+@pytest.mark.asyncio
+async def test_batch_tool_rejects_empty_questions(server):
+    response = await server.dispatch({
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+        "params": {"name": "your_turn_batch", "arguments": {"questions": []}}})
+    assert response["error"]["code"] == -32602
@@ -0,0 +1,93 @@
+"""notifications/cancelled: aborting an in-flight your_turn withdraws its question."""
+
+import asyncio
+
+import pytest
+
+from interactive_session import SessionStatus, get_session_manager
+from mcp_your_turn_server import MCPServer
+
+
+class FakeNotifier:
+    """Records the questions sent and withdrawn instead of talking to Telegram."""
+
+    chat_id = "123456789"
+
+    def __init__(self):
+        self.questions = []
+        self.cancelled = []
+
+    def is_enabled(self):
+        return True
+
+    async def send_interactive_question(self, session):
+        self.questions.append(session)
+        return True
+
+    async def mark_question_cancelled(self, session):
+        self.cancelled.append(session)
+        return True
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = MCPServer()
+    server.telegram_notifier = FakeNotifier()
+
+    async def telegram_ready():
+        return True
+
+    monkeypatch.setattr(server, "_wait_for_telegram", telegram_ready)
+    monkeypatch.setattr(server, "play_notification_sound", lambda: None)
+    return server
+
+
+def _your_turn(request_id):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": "your_turn", "arguments": {"reason": "done", "timeout_seconds": 60}}}
+
+
+def _cancel(request_id):
+    return {"jsonrpc": "2.0", "method": "notifications/cancelled",
+            "params": {"requestId": request_id, "reason": "user pressed stop"}}
+
+
+async def _start(server, request, in_flight):
+    """Run a request the way the transports do: as a task registered under its id."""
+    task = asyncio.create_task(server.dispatch(request, in_flight))
+    in_flight[request["id"]] = task
+    while not server.telegram_notifier.questions:
+        await asyncio.sleep(0)
+    return task
+
+
+@pytest.mark.asyncio
+async def test_cancel_aborts_wait_and_withdraws_question(server):
+    in_flight = {}
+    task = await _start(server, _your_turn(1), in_flight)
+
+    assert await server.dispatch(_cancel(1), in_flight) is None
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    session = server.telegram_notifier.questions[0]
+    assert session.status == SessionStatus.CANCELLED
+    assert not get_session_manager().get_active_sessions()
+    await asyncio.sleep(0)
+    assert server.telegram_notifier.cancelled == [session]
+
+
+@pytest.mark.asyncio
+async def test_cancel_for_unknown_request_is_ignored(server):
+    in_flight = {}
+    task = await _start(server, _your_turn(1), in_flight)
+
+    assert await server.dispatch(_cancel(2), in_flight) is None
+    await asyncio.sleep(0)
+    assert not task.done()
+
+    session = server.telegram_notifier.questions[0]
+    get_session_manager().submit_response(session.session_id, "ship it")
+    response = await asyncio.wait_for(task, 1)
+    assert "ship it" in response["result"]["content"][0]["text"]
+    assert not server.telegram_notifier.cancelled
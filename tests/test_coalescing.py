@@ -0,0 +1,106 @@
+"""Coalescing of questions from several agents into one Telegram message."""
+
+import asyncio
+
+import pytest
+
+from interactive_session import get_session_manager
+from telegram_notifier import TelegramNotifier
+
+WINDOW = 0.2
+
+
+@pytest.fixture
+def notifier(monkeypatch):
+    """An enabled notifier whose sends are recorded instead of reaching Telegram."""
+    notifier = TelegramNotifier(None, None)
+    notifier.enabled = True
+    notifier.bot = object()
+    notifier.coalesce_window = WINDOW
+    notifier.sent = []
+
+    async def send_single(session):
+        notifier.sent.append([session.message])
+        return True
+
+    async def send_batch(sessions):
+        notifier.sent.append([session.message for session in sessions])
+        return True
+
+    monkeypatch.setattr(notifier, "_send_single_question", send_single)
+    monkeypatch.setattr(notifier, "send_batch_question", send_batch)
+    return notifier
+
+
+def _ask(message):
+    return get_session_manager().create_session(message, chat_id="42", timeout_seconds=600)
+
+
+@pytest.mark.asyncio
+async def test_lone_question_is_sent_without_waiting(notifier):
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await notifier.send_interactive_question(_ask("a"))
+    assert loop.time() - started < WINDOW / 2
+    assert notifier.sent == [["a"]]
+
+
+@pytest.mark.asyncio
+async def test_burst_after_a_question_shares_one_message(notifier):
+    sessions = [_ask(name) for name in ("a", "b", "c")]
+    results = await asyncio.gather(*(notifier.send_interactive_question(s) for s in sessions))
+    assert results == [True, True, True]
+    assert notifier.sent == [["a"], ["b", "c"]]
+    assert sessions[1].metadata["batch"] == sessions[2].metadata["batch"]
+    assert sessions[1].metadata["coalesced"]
+
+
+@pytest.mark.asyncio
+async def test_question_after_the_window_is_sent_at_once(notifier):
+    await notifier.send_interactive_question(_ask("a"))
+    await asyncio.sleep(WINDOW * 1.5)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await notifier.send_interactive_question(_ask("b"))
+    assert loop.time() - started < WINDOW / 2
+    assert notifier.sent == [["a"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_withdrawn_question_is_left_out_of_the_batch(notifier):
+    first, second, third = _ask("a"), _ask("b"), _ask("c")
+    await notifier.send_interactive_question(first)
+    pending = [asyncio.create_task(notifier.send_interactive_question(s)) for s in (second, third)]
+    await asyncio.sleep(0)
+    get_session_manager().cancel_session(second.session_id, "Request cancelled by client")
+    assert await asyncio.gather(*pending) == [False, True]
+    assert notifier.sent == [["a"], ["c"]]
+
+
+@pytest.mark.asyncio
+async def test_cancelling_a_coalesced_question_redraws_the_shared_message():
+    from mcp_your_turn_server import MCPServer
+
+    calls = []
+
+    class FakeNotifier:
+        chat_id = "42"
+
+        async def refresh_batch_message(self, session):
+            calls.append(("refresh", session.session_id))
+
+        async def mark_question_cancelled(self, session):
+            calls.append(("withdrawn", session.session_id))
+
+    server = MCPServer()
+    server.telegram_notifier = FakeNotifier()
+    first, second = _ask("a"), _ask("b")
+    batch = [first.session_id, second.session_id]
+    for index, session in enumerate((first, second)):
+        session.metadata = {"batch": batch, "index": index, "coalesced": True}
+
+    server._withdraw_session(first)
+    await asyncio.sleep(0)
+    assert calls == [("refresh", first.session_id)]
+    assert not first.is_active
+    assert second.is_active
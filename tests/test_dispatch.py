@@ -0,0 +1,109 @@
+"""Concurrent dispatch under the per-connection request limit."""
+
+import asyncio
+
+import pytest
+
+import mcp_your_turn_server
+from mcp_your_turn_server import MCPServer
+
+
+def _call(request_id, name="your_turn"):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": name, "arguments": {"reason": "done"}}}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """A server whose your_turn blocks until the test releases it, with room for 2 requests."""
+    release = asyncio.Event()
+    running = []
+
+    async def blocking_your_turn(self, request, arguments, notify=None):
+        running.append(request["id"])
+        await release.wait()
+        return self._tool_result(request, "answered")
+
+    monkeypatch.setattr(MCPServer, "_handle_your_turn_tool", blocking_your_turn)
+    server = MCPServer(max_concurrent_requests=2)
+    server.release = release
+    server.running = running
+    return server
+
+
+@pytest.mark.asyncio
+async def test_ping_answers_with_empty_result(server):
+    response = await server.dispatch({"jsonrpc": "2.0", "id": 7, "method": "ping"})
+    assert response == {"jsonrpc": "2.0", "id": 7, "result": {}}
+
+
+@pytest.mark.asyncio
+async def test_quick_methods_skip_a_full_limit(server):
+    waits = [asyncio.create_task(server.dispatch(_call(i))) for i in range(2)]
+    await asyncio.sleep(0)
+    for method in ("initialize", "tools/list", "ping"):
+        response = await asyncio.wait_for(server.dispatch({"jsonrpc": "2.0", "id": method, "method": method}), 1)
+        assert "result" in response
+    server.release.set()
+    await asyncio.gather(*waits)
+
+
+@pytest.mark.asyncio
+async def test_batch_elements_each_take_a_slot(server):
+    batch = asyncio.create_task(server.dispatch([_call(i) for i in range(4)]))
+    await asyncio.sleep(0.05)
+    assert len(server.running) == 2
+    server.release.set()
+    responses = await asyncio.wait_for(batch, 1)
+    assert sorted(response["id"] for response in responses) == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_unhashable_id_is_rejected(server):
+    response = await server.dispatch({"jsonrpc": "2.0", "id": [1], "method": "ping"})
+    assert response["id"] is None
+    assert response["error"]["code"] == -32600
+
+
+@pytest.mark.asyncio
+async def test_start_request_rejects_unhashable_id(server, monkeypatch):
+    sent = []
+    monkeypatch.setattr(server, "_send_response", sent.append)
+    server._start_request({"jsonrpc": "2.0", "id": {"a": 1}, "method": "ping"})
+    assert sent and sent[0]["error"]["code"] == -32600
+    assert not server._in_flight
+
+
+@pytest.mark.asyncio
+async def test_eof_cancels_requests_after_grace_period(server, monkeypatch):
+    monkeypatch.setattr(mcp_your_turn_server, "SHUTDOWN_GRACE_SECONDS", 0.05)
+    frames = [mcp_your_turn_server.json_codec.dumps(_call(1)), None]
+
+    class FakeReader:
+        def __init__(self, max_frame_bytes=None):
+            pass
+
+        async def start(self):
+            pass
+
+        async def read_frame(self):
+            return frames.pop(0)
+
+        def close(self):
+            pass
+
+    class FakeWriter:
+        def start(self):
+            pass
+
+        def send(self, response):
+            return 0
+
+        async def close(self):
+            pass
+
+    monkeypatch.setattr(mcp_your_turn_server, "StdioReader", FakeReader)
+    monkeypatch.setattr(mcp_your_turn_server, "StdioWriter", FakeWriter)
+    await asyncio.wait_for(server.run(), 2)
+    assert server.running == [1]
+    assert not server._in_flight
@@ -0,0 +1,58 @@
+"""Memory held by retained sessions, measured with tracemalloc (see benchmarks/bench_session_memory.py)."""
+
+import asyncio
+import gc
+import sys
+import tracemalloc
+
+import pytest
+
+from interactive_session import InteractiveSessionManager
+
+QUESTION = "🔔 Notification: " + "Refactored the session manager, need a decision on the retention policy. " * 4
+ANSWER = "Looks good, go ahead with the count limit."
+
+RETAINED = 500
+CHURN = 4000
+MAX_BYTES_PER_SESSION = 1500
+STEADY_STATE_TOLERANCE = 0.02
+
+
+async def _run_sessions(manager, count, first_message_id):
+    """Create, deliver and answer sessions like a Telegram round trip does."""
+    for i in range(count):
+        await asyncio.sleep(0)
+        session = manager.create_session(QUESTION, chat_id="123456789", timeout_seconds=300)
+        manager.bind_message(session.session_id, first_message_id + i)
+        session.release_message()
+        manager.submit_response(session.session_id, ANSWER)
+
+
+def _traced_bytes():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+@pytest.mark.asyncio
+async def test_retained_sessions_stay_small_and_bounded():
+    manager = InteractiveSessionManager(retention_seconds=10 ** 9, max_retained=RETAINED)
+    await manager.start()
+    tracemalloc.start()
+    try:
+        baseline = _traced_bytes()
+        await _run_sessions(manager, RETAINED, 0)
+        filled = _traced_bytes() - baseline
+        await _run_sessions(manager, CHURN // 2, RETAINED)
+        middle = _traced_bytes() - baseline
+        await _run_sessions(manager, CHURN - CHURN // 2, RETAINED + CHURN // 2)
+        end = _traced_bytes() - baseline
+    finally:
+        tracemalloc.stop()
+        await manager.stop()
+
+    assert len(manager.sessions) == RETAINED
+    # Count limit reached: churn must not keep growing the footprint
+    assert end <= middle * (1 + STEADY_STATE_TOLERANCE)
+    if sys.version_info >= (3, 10):
+        # Slotted sessions (dataclass slots need 3.10)
+        assert filled / RETAINED <= MAX_BYTES_PER_SESSION
@@ -0,0 +1,109 @@
+"""Sessions persisted to SQLite and re-hydrated after a restart."""
+
+import pytest
+
+from interactive_session import InteractiveSessionManager, SessionStatus
+from session_store import SessionStore
+
+QUESTION = "🔔 Notification: mission completed"
+
+
+def _restart(path):
+    """A fresh manager attached to the store at path, as after a server restart."""
+    manager = InteractiveSessionManager()
+    store = SessionStore(str(path))
+    manager.attach_store(store)
+    return manager, store
+
+
+@pytest.mark.asyncio
+async def test_unanswered_question_is_resumed_after_restart(tmp_path):
+    path = tmp_path / "sessions.db"
+    manager, store = _restart(path)
+    session = manager.create_session(QUESTION, chat_id="42", timeout_seconds=600)
+    store.close()
+
+    manager, store = _restart(path)
+    claimed = manager.claim_restored_session(QUESTION, "42", 600)
+    assert claimed is not None
+    assert claimed.session_id == session.session_id
+    assert claimed.is_active
+    # Claimed at most once
+    assert manager.claim_restored_session(QUESTION, "42", 600) is None
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_claim_matches_chat_and_timeout(tmp_path):
+    path = tmp_path / "sessions.db"
+    manager, store = _restart(path)
+    manager.create_session(QUESTION, chat_id="42", timeout_seconds=600)
+    store.close()
+
+    manager, store = _restart(path)
+    assert manager.claim_restored_session(QUESTION, "43", 600) is None
+    assert manager.claim_restored_session(QUESTION, "42", 60) is None
+    assert manager.claim_restored_session(QUESTION, "42", 600) is not None
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_answer_given_while_down_is_handed_out_once(tmp_path):
+    path = tmp_path / "sessions.db"
+    manager, store = _restart(path)
+    session = manager.create_session(QUESTION, chat_id="42", timeout_seconds=600)
+    manager.submit_response(session.session_id, "NEW ANSWER")
+    store.close()
+
+    manager, store = _restart(path)
+    claimed = manager.claim_restored_session(QUESTION, "42", 600)
+    assert claimed is not None
+    assert claimed.status == SessionStatus.COMPLETED
+    assert claimed.response == "NEW ANSWER"
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_delivered_answer_is_not_replayed_after_restart(tmp_path):
+    path = tmp_path / "sessions.db"
+    manager, store = _restart(path)
+    session = manager.create_session(QUESTION, chat_id="42", timeout_seconds=600)
+    manager.submit_response(session.session_id, "OLD ANSWER")
+    manager.mark_delivered(session)
+    store.close()
+
+    manager, store = _restart(path)
+    assert manager.claim_restored_session(QUESTION, "42", 600) is None
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_question_text_survives_release_within_one_flush(tmp_path):
+    path = tmp_path / "sessions.db"
+    manager, store = _restart(path)
+    # create, send (release) and answer before the batched flush runs
+    session = manager.create_session(QUESTION, chat_id="42", timeout_seconds=600)
+    session.release_message()
+    manager.bind_message(session.session_id, 101)
+    manager.submit_response(session.session_id, "yes")
+    store.close()
+
+    rows = SessionStore(str(path)).load_sessions()
+    assert [row["message"] for row in rows] == [QUESTION]
+    assert rows[0]["telegram_message_id"] == 101
+
+
+def test_old_database_gains_the_delivered_column(tmp_path):
+    import sqlite3
+
+    path = tmp_path / "sessions.db"
+    db = sqlite3.connect(str(path))
+    db.execute("CREATE TABLE sessions (session_id TEXT PRIMARY KEY, chat_id TEXT, message TEXT, "
+               "created_at REAL NOT NULL, timeout_seconds INTEGER NOT NULL, status TEXT NOT NULL, "
+               "response TEXT, error_message TEXT, telegram_message_id INTEGER, finished_at REAL)")
+    db.execute("INSERT INTO sessions VALUES ('s1', '42', 'q', 1.0, 60, 'completed', 'a', NULL, NULL, 2.0)")
+    db.commit()
+    db.close()
+
+    rows = SessionStore(str(path)).load_sessions()
+    assert rows[0]["delivered"] == 0
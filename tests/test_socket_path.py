@@ -0,0 +1,35 @@
+"""Daemon socket naming: the resolved bot token picks the daemon."""
+
+import mcp_your_turn_server
+from daemon_transport import default_socket_path
+from mcp_your_turn_server import resolve_telegram_credentials
+
+
+class FakeConfig:
+    def __init__(self, token, chat_id):
+        self.token = token
+        self.chat_id = chat_id
+
+    def get_telegram_config(self):
+        return self.token, self.chat_id
+
+
+def _use_config(monkeypatch, token, chat_id="42"):
+    monkeypatch.setattr(mcp_your_turn_server, "get_config", lambda: FakeConfig(token, chat_id))
+
+
+def test_env_beats_args_beats_config(monkeypatch):
+    _use_config(monkeypatch, "config-token")
+    assert resolve_telegram_credentials() == ("config-token", "42")
+    assert resolve_telegram_credentials("arg-token") == ("arg-token", "42")
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "env-token")
+    assert resolve_telegram_credentials("arg-token") == ("env-token", "42")
+
+
+def test_config_file_bots_get_separate_sockets(monkeypatch):
+    _use_config(monkeypatch, "bot-a")
+    socket_a = default_socket_path(resolve_telegram_credentials()[0])
+    _use_config(monkeypatch, "bot-b")
+    socket_b = default_socket_path(resolve_telegram_credentials()[0])
+    assert socket_a != socket_b
+    assert socket_a != default_socket_path(None)
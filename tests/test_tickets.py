@@ -0,0 +1,102 @@
+"""your_turn_start / your_turn_poll / your_turn_await tickets."""
+
+import asyncio
+import re
+
+import pytest
+
+from interactive_session import SessionStatus, get_session_manager
+from mcp_your_turn_server import MCPServer
+
+
+class FakeNotifier:
+    """Records the questions sent instead of talking to Telegram."""
+
+    chat_id = "123456789"
+
+    def __init__(self):
+        self.questions = []
+
+    def is_enabled(self):
+        return True
+
+    async def send_interactive_question(self, session):
+        self.questions.append(session)
+        return True
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = MCPServer()
+    server.telegram_notifier = FakeNotifier()
+
+    async def telegram_ready():
+        return True
+
+    monkeypatch.setattr(server, "_wait_for_telegram", telegram_ready)
+    monkeypatch.setattr(server, "play_notification_sound", lambda: None)
+    return server
+
+
+async def _call(server, name, **arguments):
+    response = await server.dispatch({"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                                      "params": {"name": name, "arguments": arguments}})
+    if "error" in response:
+        return response["error"]
+    return response["result"]["content"][0]["text"]
+
+
+async def _start_ticket(server):
+    text = await _call(server, "your_turn_start", reason="pick a name", timeout_seconds=60)
+    return re.search(r"Ticket: (\S+)", text).group(1)
+
+
+@pytest.mark.asyncio
+async def test_start_returns_a_waiting_ticket(server):
+    ticket = await _start_ticket(server)
+    session = server.telegram_notifier.questions[0]
+    assert ticket == session.session_id
+    assert session.status == SessionStatus.WAITING
+
+    text = await _call(server, "your_turn_poll", ticket=ticket)
+    assert "waiting for the user" in text
+
+
+@pytest.mark.asyncio
+async def test_poll_returns_the_answer(server):
+    ticket = await _start_ticket(server)
+    get_session_manager().submit_response(ticket, "call it tern")
+
+    text = await _call(server, "your_turn_poll", ticket=ticket)
+    assert "Status: completed" in text
+    assert "call it tern" in text
+
+
+@pytest.mark.asyncio
+async def test_await_timeout_keeps_the_question_open(server, monkeypatch):
+    ticket = await _start_ticket(server)
+    # Shorter than the 10s minimum an await call can ask for; the question keeps its 60s
+    monkeypatch.setattr(MCPServer, "_parse_timeout", staticmethod(lambda arguments, default=300: 0.05))
+
+    text = await _call(server, "your_turn_await", ticket=ticket)
+    assert "waiting for the user" in text
+    assert get_session_manager().get_session(ticket).is_active
+
+
+@pytest.mark.asyncio
+async def test_await_returns_once_answered(server):
+    ticket = await _start_ticket(server)
+    waiting = asyncio.create_task(_call(server, "your_turn_await", ticket=ticket, timeout_seconds=30))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    get_session_manager().submit_response(ticket, "go")
+    text = await asyncio.wait_for(waiting, 1)
+    assert "Status: completed" in text
+
+
+@pytest.mark.asyncio
+async def test_unknown_ticket_is_an_invalid_params_error(server):
+    error = await _call(server, "your_turn_poll", ticket="nope")
+    assert error["code"] == -32602
+    assert "nope" in error["message"]